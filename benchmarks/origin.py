@@ -0,0 +1,292 @@
+# Licensed to the Apache Software Foundation (ASF) under one
+# or more contributor license agreements.  See the NOTICE file
+# distributed with this work for additional information
+# regarding copyright ownership.  The ASF licenses this file
+# to you under the Apache License, Version 2.0 (the
+# "License"); you may not use this file except in compliance
+# with the License.  You may obtain a copy of the License at
+#
+#   http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing,
+# software distributed under the License is distributed on an
+# "AS IS" BASIS, WITHOUT WARRANTIES OR CONDITIONS OF ANY
+# KIND, either express or implied.  See the License for the
+# specific language governing permissions and limitations
+# under the License.
+"""
+Origin load path benchmarks.
+
+Using a synthetic local stand-in for the Avazu Kaggle file, the benchmark measures the latency of
+the cold (parse and cache), warm (disk cache), hot (memory tier) and projected (columns and
+predicate push-down) loads, the throughput of concurrent loaders, the peak RSS of each case and
+the cache size on disk. Each case runs in a fresh process so its peak RSS is not polluted by the
+others.
+
+Usage::
+
+    python -m benchmarks.origin --rows 10000 1000000 --output results.json
+    python -m benchmarks.origin --rows 10000 1000000 --compare results.json
+"""
+import argparse
+import collections
+import datetime
+import gzip
+import json
+import logging
+import multiprocessing
+import pathlib
+import platform
+import resource
+import sys
+import tempfile
+import time
+import typing
+from concurrent import futures
+
+import numpy
+import pandas
+import pyarrow
+from openschema import kaggle as schema
+
+import openlake
+from openlake import cache
+from openlake.provider import kaggle
+
+LOGGER = logging.getLogger(__name__)
+
+CASES = ('cold', 'warm', 'hot', 'projected', 'concurrent')
+CATEGORICAL = (
+    'site_id',
+    'site_domain',
+    'site_category',
+    'app_id',
+    'app_domain',
+    'app_category',
+    'device_id',
+    'device_ip',
+    'device_model',
+)
+NUMERICAL = ('device_type', 'device_conn_type', 'C14', 'C15', 'C16', 'C17', 'C18', 'C19', 'C20', 'C21')
+PROJECTION = (schema.Avazu.click, schema.Avazu.C1, schema.Avazu.site_id)
+#: Predicate selecting the last day of the (three days long) synthetic data.
+PREDICATE = schema.Avazu.hour >= datetime.datetime(2014, 10, 23)
+
+
+class Result(collections.namedtuple('Result', 'case, rows, seconds, throughput, rss, disk')):
+    """Benchmark case result."""
+
+    case: str
+    rows: int
+    seconds: float
+    """Best wall-clock time of the case repetitions."""
+    throughput: float
+    """Number of rows loaded per second."""
+    rss: int
+    """Peak resident set size of the case process (in bytes)."""
+    disk: int
+    """Size of the cache on disk after the case (in bytes)."""
+
+
+class Avazu(kaggle.Avazu):
+    """Avazu origin reading the synthetic file instead of fetching it from Kaggle."""
+
+    PATH: typing.Optional[pathlib.Path] = None
+
+    def fetch(self, partition: typing.Optional[kaggle.Partition]) -> typing.IO:
+        return open(self.PATH, 'rb')
+
+
+def synthesize(path: pathlib.Path, rows: int, chunksize: int = 1_000_000, seed: int = 0) -> pathlib.Path:
+    """Generate (unless existing) the gzipped CSV file with the Avazu-like content.
+
+    Args:
+        path: Target file path.
+        rows: Number of rows to generate.
+        chunksize: Number of rows to be generated at once.
+        seed: Random generator seed.
+
+    Returns:
+        The target file path.
+    """
+    if path.exists():
+        return path
+    LOGGER.info('Synthesizing %d rows into %s', rows, path)
+    rng = numpy.random.default_rng(seed)
+    hours = pandas.date_range('2014-10-21', periods=72, freq='H').strftime('%y%m%d%H').to_numpy()
+    staging = path.with_suffix('.part')
+    with gzip.open(staging, 'wt', newline='') as file:
+        for offset in range(0, rows, chunksize):
+            size = min(chunksize, rows - offset)
+            frame = pandas.DataFrame(
+                {
+                    'id': rng.integers(0, numpy.iinfo('uint64').max, size, dtype='uint64', endpoint=True),
+                    'click': rng.integers(0, 2, size),
+                    'hour': numpy.sort(rng.choice(hours, size)),
+                    'C1': rng.integers(1001, 1012, size),
+                    'banner_pos': rng.integers(0, 7, size),
+                }
+            )
+            for column in CATEGORICAL:
+                frame[column] = rng.integers(0, 1000, size).astype(str)
+                frame[column] = column + frame[column]
+            for column in NUMERICAL:
+                frame[column] = rng.integers(0, 5000, size)
+            frame.to_csv(file, header=not offset, index=False)
+    staging.rename(path)
+    return path
+
+
+def footprint(directory: pathlib.Path) -> int:
+    """Get the total size of the files in the given directory tree."""
+    return sum(f.stat().st_size for f in directory.rglob('*') if f.is_file())
+
+
+def peak() -> int:
+    """Get the peak resident set size of the current process (in bytes).
+
+    On Linux, the ``VmHWM`` is preferred as the ``ru_maxrss`` survives the ``exec`` of the spawned
+    process, reporting the peak of its parent instead.
+    """
+    status = pathlib.Path('/proc/self/status')
+    if status.exists():
+        for line in status.read_text(encoding='utf-8').splitlines():
+            if line.startswith('VmHWM:'):
+                return int(line.split()[1]) * 1024
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * (1 if sys.platform == 'darwin' else 1024)
+
+
+def measure(case: str, source: pathlib.Path, cachedir: pathlib.Path, repeat: int, workers: int) -> Result:
+    """Run the benchmark case (expected to be executed in a dedicated process).
+
+    Args:
+        case: Name of the benchmark case.
+        source: Path to the synthetic Avazu file.
+        cachedir: Cache directory (expected to be empty for the cold case and filled for the others).
+        repeat: Number of the case repetitions.
+        workers: Number of the concurrent loaders.
+
+    Returns:
+        The case result.
+    """
+    cache.DIR = cachedir
+    Avazu.PATH = source
+    Avazu.CACHE_MEMORY = cache.Memory(1 << 32) if case == 'hot' else None
+    origin = Avazu()
+    columns, predicate = (PROJECTION, PREDICATE) if case in {'projected', 'concurrent'} else (None, None)
+
+    def load() -> int:
+        """Load the selected partitions returning the number of rows."""
+        partitions = origin.partitions(columns or schema.Avazu.features, predicate)
+        return origin.table(partitions, columns, predicate).num_rows
+
+    if case == 'hot':
+        load()
+    elapsed = []
+    for _ in range(repeat):
+        if case == 'cold':
+            cache.purge(cachedir)
+        start = time.perf_counter()
+        if case == 'concurrent':
+            with futures.ThreadPoolExecutor(workers) as pool:
+                rows = sum(pool.map(lambda _: load(), range(workers * 4)))
+        else:
+            rows = load()
+        elapsed.append(time.perf_counter() - start)
+    return Result(case, rows, min(elapsed), rows / min(elapsed), peak(), footprint(cachedir))
+
+
+def run(
+    sizes: typing.Iterable[int], workdir: pathlib.Path, repeat: int = 3, workers: int = 4
+) -> list[dict[str, typing.Any]]:
+    """Run all the benchmark cases for each of the given data sizes.
+
+    Args:
+        sizes: Numbers of rows of the synthetic data.
+        workdir: Directory for the synthetic data and the cache.
+        repeat: Number of each case repetitions.
+        workers: Number of the concurrent loaders.
+
+    Returns:
+        List of the case results (as dictionaries) labeled by the data size.
+    """
+    context = multiprocessing.get_context('spawn')
+    results = []
+    for size in sizes:
+        source = synthesize(workdir / f'avazu-{size}.csv.gz', size)
+        with tempfile.TemporaryDirectory(dir=workdir) as cachedir:
+            for case in CASES:  # the cold case comes first to fill the cache for the others
+                with futures.ProcessPoolExecutor(1, mp_context=context) as process:
+                    result = process.submit(measure, case, source, pathlib.Path(cachedir), repeat, workers).result()
+                LOGGER.info('%s', result)
+                results.append({'size': size, **result._asdict()})
+    return results
+
+
+def compare(
+    results: typing.Sequence[typing.Mapping[str, typing.Any]],
+    baseline: typing.Sequence[typing.Mapping[str, typing.Any]],
+    tolerance: float,
+) -> list[str]:
+    """Compare the results against the baseline.
+
+    Args:
+        results: Current results.
+        baseline: Baseline results.
+        tolerance: Maximum acceptable ratio of the current to the baseline time and memory.
+
+    Returns:
+        List of the regressions found.
+    """
+    reference = {(r['size'], r['case']): r for r in baseline}
+    regressions = []
+    for current in results:
+        if not (base := reference.get((current['size'], current['case']))):
+            continue
+        for metric in 'seconds', 'rss', 'disk':
+            ratio = current[metric] / base[metric] if base[metric] else 1
+            print(f'{current["case"]:>10} {current["size"]:>10} {metric:>7}: {ratio:6.2f}x', file=sys.stderr)
+            if ratio > tolerance:
+                regressions.append(f'{current["case"]}@{current["size"]} {metric} regressed {ratio:.2f}x')
+    return regressions
+
+
+def main(argv: typing.Optional[typing.Sequence[str]] = None) -> int:
+    """Benchmark command-line entrypoint."""
+    cli = argparse.ArgumentParser(description=__doc__.split('\n\n', 1)[0].strip())
+    cli.add_argument('--rows', type=lambda v: int(float(v)), nargs='+', default=[10_000, 100_000], help='e.g. 1e6')
+    cli.add_argument('--repeat', type=int, default=3)
+    cli.add_argument('--workers', type=int, default=4)
+    cli.add_argument('--workdir', type=pathlib.Path, default=pathlib.Path(tempfile.gettempdir()) / 'openlake-bench')
+    cli.add_argument('--output', type=pathlib.Path, help='file to store the results into')
+    cli.add_argument('--compare', type=pathlib.Path, help='baseline results file to compare against')
+    cli.add_argument('--tolerance', type=float, default=1.2, help='maximum acceptable regression ratio')
+    args = cli.parse_args(argv)
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s %(message)s')
+    args.workdir.mkdir(parents=True, exist_ok=True)
+    report = {
+        'environment': {
+            'openlake': openlake.__version__,
+            'python': platform.python_version(),
+            'pandas': pandas.__version__,
+            'pyarrow': pyarrow.__version__,
+            'platform': platform.platform(),
+            'cpus': multiprocessing.cpu_count(),
+            'timestamp': datetime.datetime.now(datetime.timezone.utc).isoformat(),
+        },
+        'results': run(args.rows, args.workdir, args.repeat, args.workers),
+    }
+    if args.output:
+        args.output.write_text(json.dumps(report, indent=2))
+    else:
+        print(json.dumps(report, indent=2))
+    if args.compare:
+        regressions = compare(report['results'], json.loads(args.compare.read_text())['results'], args.tolerance)
+        for regression in regressions:
+            print(regression, file=sys.stderr)
+        return 1 if regressions else 0
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,86 @@
+# Licensed to the Apache Software Foundation (ASF) under one
+# or more contributor license agreements.  See the NOTICE file
+# distributed with this work for additional information
+# regarding copyright ownership.  The ASF licenses this file
+# to you under the Apache License, Version 2.0 (the
+# "License"); you may not use this file except in compliance
+# with the License.  You may obtain a copy of the License at
+#
+#   http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing,
+# software distributed under the License is distributed on an
+# "AS IS" BASIS, WITHOUT WARRANTIES OR CONDITIONS OF ANY
+# KIND, either express or implied.  See the License for the
+# specific language governing permissions and limitations
+# under the License.
+"""
+Package import time benchmark.
+
+Measures the time of ``import openlake`` in fresh interpreters - both the total and the overhead
+on top of the ForML feed it is built on (which is imported first so that only the openlake own
+share gets measured). Fails if the overhead exceeds the budget or if any of the provider modules
+(supposed to be imported lazily) gets imported.
+
+Usage::
+
+    python -m benchmarks.startup --repeat 5 --budget 0.2
+"""
+import argparse
+import json
+import statistics
+import subprocess
+import sys
+import typing
+
+#: Modules that must not be imported by the plain ``import openlake``.
+LAZY = ('openlake.provider.kaggle', 'openlake.provider.sklearn', 'openlake.fetcher', 'kaggle', 'sklearn.datasets')
+PROBE = '''
+import json, sys, time
+{baseline}
+start = time.perf_counter()
+import openlake
+print(json.dumps({{'seconds': time.perf_counter() - start, 'modules': sorted(sys.modules)}}))
+'''
+
+
+def measure(baseline: bool) -> dict[str, typing.Any]:
+    """Import the package in a fresh interpreter.
+
+    Args:
+        baseline: Whether to import the ForML feed dependencies first.
+
+    Returns:
+        The import time and the list of the modules imported.
+    """
+    code = PROBE.format(baseline='import forml.provider.feed.lazy' if baseline else '')
+    return json.loads(subprocess.run([sys.executable, '-c', code], check=True, capture_output=True).stdout)
+
+
+def main(argv: typing.Optional[typing.Sequence[str]] = None) -> int:
+    """Benchmark command-line entrypoint."""
+    cli = argparse.ArgumentParser(description=__doc__.split('\n\n', 1)[0].strip())
+    cli.add_argument('--repeat', type=int, default=5)
+    cli.add_argument('--budget', type=float, default=0.2, help='maximum import overhead in seconds')
+    args = cli.parse_args(argv)
+    total = [measure(False) for _ in range(args.repeat)]
+    overhead = [measure(True) for _ in range(args.repeat)]
+    eager = sorted(set(LAZY).intersection(total[0]['modules']))
+    report = {
+        'total': statistics.median(r['seconds'] for r in total),
+        'overhead': statistics.median(r['seconds'] for r in overhead),
+        'budget': args.budget,
+        'eager': eager,
+    }
+    print(json.dumps(report, indent=2))
+    if report['overhead'] > args.budget:
+        print(f'Import overhead {report["overhead"]:.3f}s exceeds the budget of {args.budget:.3f}s', file=sys.stderr)
+        return 1
+    if eager:
+        print(f'Eagerly imported: {", ".join(eager)}', file=sys.stderr)
+        return 1
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -19,14 +19,101 @@
 
 __version__ = '0.6'
 
+import collections
+import contextlib
+import contextvars
+import hashlib
+import logging
+import os
+import pathlib
+import threading
+import time
 import typing
+from concurrent import futures
 
-from forml.provider.feed import lazy
+import forml
+import pandas
+import pyarrow
+import sqlalchemy
+from forml.io import dsl, layout
+from forml.provider.feed import alchemy, lazy
+from pyarrow import parquet
+from sqlalchemy import sql
 
-from openlake.provider import kaggle, sklearn
+from openlake import cache, metrics, provider
 
-#: Default list of origin integrations.
-ORIGINS: typing.Collection[lazy.Origin] = {kaggle.Avazu(), kaggle.Titanic(), sklearn.BreastCancer(), sklearn.Iris()}
+LOGGER = logging.getLogger(__name__)
+
+#: Default list of origin integrations (registered lazily so that their provider modules get only imported once used).
+ORIGINS: typing.Collection[lazy.Origin] = {
+    provider.Lazy('openlake.provider.kaggle:Avazu', 'openschema.kaggle:Avazu'),
+    provider.Lazy('openlake.provider.kaggle:Titanic', 'openschema.kaggle:Titanic'),
+    provider.Lazy('openlake.provider.sklearn:BreastCancer', 'openschema.sklearn:BreastCancer'),
+    provider.Lazy('openlake.provider.sklearn:Iris', 'openschema.sklearn:Iris'),
+}
+#: Disk budget (in bytes) of the feed query result cache (None for unbounded).
+RESULTS_BUDGET: typing.Optional[int] = int(os.getenv('OPENLAKE_RESULTS_BUDGET', str(1 << 30))) or None
+
+
+class Results(alchemy.Results):
+    """Feed query result cache keyed by the statement together with the versions of the origins it reads.
+
+    Unlike the plain ForML result cache (keyed just by the statement), the results get invalidated
+    whenever any of the underlying origin cache entries changes. The results are stored as Parquet
+    cache entries evicted in the least recently used order to stay within the disk budget. The
+    recently used results are also kept in memory (as Arrow tables) up to the given capacity.
+    """
+
+    def __init__(self, path: pathlib.Path, budget: typing.Optional[int] = None, capacity: int = 1 << 28):
+        super().__init__(path)
+        self.budget: typing.Optional[int] = budget
+        self._memory: cache.Memory = cache.Memory(capacity)
+        self._versions: contextvars.ContextVar[tuple[str, ...]] = contextvars.ContextVar('versions', default=())
+
+    @contextlib.contextmanager
+    def versioned(self, versions: typing.Iterable[str]) -> typing.Iterator[None]:
+        """Context manager for addressing the results derived from the given origin versions.
+
+        Args:
+            versions: Versions of the origins read by the statements.
+
+        Returns:
+            Context manager scoping the versions.
+        """
+        token = self._versions.set(tuple(versions))
+        try:
+            yield
+        finally:
+            self._versions.reset(token)
+
+    def _statement2key(self, statement: sql.Selectable) -> str:
+        text = str(statement.compile(compile_kwargs={'literal_binds': True}))
+        return hashlib.sha256(repr((text, self._versions.get())).encode()).hexdigest()
+
+    def exists(self, statement: sql.Selectable) -> bool:
+        path = self._key2path(self._statement2key(statement))
+        return self._memory.get(cache.Memory.Key(path, None, None, None, None)) is not None or path.exists()
+
+    def get_or_exec(
+        self, statement: sql.Selectable, loader: typing.Callable[[sql.Selectable], pandas.DataFrame]
+    ) -> pandas.DataFrame:
+        path = self._key2path(self._statement2key(statement))
+        selection = cache.Memory.Key(path, None, None, None, None)
+        if (table := self._memory.get(selection)) is None:
+            try:
+                table = parquet.read_table(path)
+            except FileNotFoundError:
+                LOGGER.debug('Result cache miss for %s', statement)
+                frame = loader(statement)
+                staging = path.with_name(f'.{path.name}.{os.getpid()}-{threading.get_ident()}.tmp')
+                frame.to_parquet(staging, index=False)
+                cache.publish(staging, path)
+                if self.budget is not None:
+                    cache.purge(self._path, budget=self.budget, keep=[path], memory=self._memory)
+                table = pyarrow.Table.from_pandas(frame, preserve_index=False)
+            table = self._memory.put(selection, table)
+        cache.touch(path)
+        return table.to_pandas()
 
 
 class Lite(lazy.Feed):
@@ -43,12 +130,270 @@ class Lite(lazy.Feed):
         [FEED.openlake]
         provider = "openlake:Lite"
 
+    For fast iteration, the feed can be limited to the first ``head`` rows or a deterministic
+    ``fraction`` of each of the origins (the samples are cached as separate entries):
+
+    .. code-block:: toml
+       :caption: config.toml
+
+        [FEED.openlake-sample]
+        provider = "openlake:Lite"
+        fraction = 0.01
+
     Important:
         Select the relevant :ref:`extras to install <install-extras>` OpenLake together with the
         particular integrations (e.g. Kaggle, Scikit-learn, etc.).
     """
 
-    def __init__(self, *origins: lazy.Origin):
+    class Reader(lazy.Feed.Reader):
+        """Extending the lazy reader with the column projection and predicate push-down.
+
+        Since the registered origin data are specific to the selection of the particular reader,
+        each reader instance uses its own backend with the registration and the query serialized
+        under its lock.
+        """
+
+        RESULTS: Results = Results(cache.DIR / '_results', RESULTS_BUDGET)
+
+        def __init__(
+            self,
+            sources: typing.Mapping[dsl.Source, sql.Selectable],
+            features: typing.Mapping[dsl.Feature, sql.ColumnElement],
+            origins: typing.Iterable[lazy.Origin],
+        ):
+            self.BACKEND = self.Backend()  # pylint: disable=invalid-name
+            self._selections: dict[lazy.Origin, tuple[frozenset, frozenset[dsl.Column], int, typing.Any, str]] = {}
+            self._lock: threading.Lock = threading.Lock()
+            super().__init__(sources, features, origins)
+
+        @staticmethod
+        def _pushdown(statement: dsl.Statement, table: dsl.Table) -> typing.Optional[dsl.Predicate]:
+            """Get the predicate that can be pushed down to the origin of the given table.
+
+            Only the prefilter of a plain query directly over the given table qualifies.
+
+            Args:
+                statement: Query statement to be examined.
+                table: Table the predicate should apply to.
+
+            Returns:
+                Predicate applicable to the table origin or None.
+            """
+            if isinstance(statement, dsl.Query) and statement.source == table and statement.prefilter is not None:
+                return statement.prefilter
+            return None
+
+        def __call__(self, statement: dsl.Statement, entry: typing.Optional[layout.Entry] = None) -> layout.Tabular:
+            if entry and self._match_entry(statement.schema, entry.schema)[0]:
+                return super(lazy.Feed.Reader, self).__call__(statement, entry)  # pylint: disable=bad-super-call
+            selections = {}
+            for table, columns in lazy._Columns.extract(statement):  # pylint: disable=protected-access
+                LOGGER.debug('Request for %s using columns: %s', table, columns)
+                if table not in self._origins:
+                    raise forml.MissingError(f'Unknown origin for table {table}')
+                origin = provider.resolve(self._origins[table])
+                predicate = self._pushdown(statement, table)
+                selections[origin] = frozenset(origin.partitions(columns, predicate)), columns, predicate
+            versions = self._versions(selections)
+            with self.RESULTS.versioned(versions.values()):
+                cached = self.RESULTS.exists(self._parse_statement(statement))
+            with self._lock:
+                if not cached:
+                    for origin, (partitions, columns, predicate) in selections.items():
+                        selection = partitions, columns, hash(predicate), getattr(origin, '_sample', None)
+                        if self._selections.get(origin) != (*selection, versions[origin]):
+                            with metrics.stage('materialize', origin.key) as span:
+                                span.rows = self._register(origin, partitions, columns, predicate)
+                        self._selections[origin] = selection
+                    versions = self._versions(selections)  # the cache entries might have just been (re)built
+                    for origin, version in versions.items():
+                        self._selections[origin] += (version,)
+                with self.RESULTS.versioned(versions.values()), metrics.stage('query', self.__class__.__qualname__):
+                    return super(lazy.Feed.Reader, self).__call__(statement, entry)  # pylint: disable=bad-super-call
+
+        @staticmethod
+        def _versions(
+            selections: typing.Mapping[
+                lazy.Origin, tuple[typing.Collection[lazy.Partition], typing.Collection[dsl.Column], typing.Any]
+            ]
+        ) -> dict[lazy.Origin, str]:
+            """Get the versions of the selected origin content (just the origin keys for non-provider origins).
+
+            Args:
+                selections: Origins with their selected partitions, columns and the push-down predicate.
+
+            Returns:
+                Versions of the origins.
+            """
+            return {o: o.version(p) if isinstance(o, provider.Origin) else o.key for o, (p, _, _) in selections.items()}
+
+        def _register(
+            self,
+            origin: lazy.Origin,
+            partitions: typing.Collection[lazy.Partition],
+            columns: typing.Collection[dsl.Column],
+            predicate: typing.Optional[dsl.Predicate],
+        ) -> int:
+            """Make the selected origin data available in the backend under the origin key.
+
+            Args:
+                origin: Origin to be registered.
+                partitions: Selected origin partitions.
+                columns: Required columns.
+                predicate: Optional push-down row filter.
+
+            Returns:
+                Number of the registered rows.
+            """
+            if isinstance(origin, provider.Origin):  # registering Arrow directly without conversion
+                frame = origin.table(partitions, columns, predicate)
+            else:
+                frame = origin(partitions)
+            self.BACKEND.execute(sqlalchemy.text('register(:key, :origin)'), {'key': origin.key, 'origin': frame})
+            return len(frame)
+
+    def __init__(
+        self, *origins: lazy.Origin, head: typing.Optional[int] = None, fraction: typing.Optional[float] = None
+    ):
         if not origins:
             origins = ORIGINS
+        if head is not None or fraction is not None:
+            sample = cache.Sample(head, fraction)
+            origins = [o.sampled(sample) if isinstance(o, (provider.Origin, provider.Lazy)) else o for o in origins]
         super().__init__(*origins)
+
+
+class Duck(Lite):
+    """Alternative to the :class:`Lite` feed running the queries directly over the cached files.
+
+    Rather than materializing the origin data in the SQL backend, the cached Parquet files get
+    exposed as (temporary) DuckDB views so that the queries run using the vectorized, multithreaded
+    and out-of-core DuckDB scan with its own projection and predicate push-down. The origins are
+    only loaded to populate any missing cache entries (origins not using the Parquet cache format
+    fall back to the :class:`Lite` materialization).
+
+    The provider can be enabled using the following :ref:`platform configuration
+    <forml:platform-config>`:
+
+    .. code-block:: toml
+       :caption: config.toml
+
+        [FEED.openlake]
+        provider = "openlake:Duck"
+    """
+
+    class Reader(Lite.Reader):
+        """Lite reader registering the cached files as DuckDB views."""
+
+        #: DuckDB types of the source schema fields to cast the compacted columns back to.
+        TYPES: typing.Mapping[pyarrow.DataType, str] = {
+            pyarrow.bool_(): 'BOOLEAN',
+            pyarrow.int64(): 'BIGINT',
+            pyarrow.float64(): 'DOUBLE',
+            pyarrow.string(): 'VARCHAR',
+            pyarrow.timestamp('ns'): 'TIMESTAMP',
+        }
+
+        def _register(
+            self,
+            origin: lazy.Origin,
+            partitions: typing.Collection[lazy.Partition],
+            columns: typing.Collection[dsl.Column],
+            predicate: typing.Optional[dsl.Predicate],
+        ) -> int:
+            if not isinstance(origin, provider.Origin) or origin.CACHE_FORMAT is not cache.PARQUET:
+                return super()._register(origin, partitions, columns, predicate)
+            files = origin.cachefiles(partitions)
+            casts = {}
+            for file in files:  # compaction is storage-only - the view exposes the source types
+                stored = parquet.read_schema(file)
+                conformed = origin._conformed(stored)  # pylint: disable=protected-access
+                casts.update(
+                    (s.name, self.TYPES[c.type])
+                    for s, c in zip(stored, conformed)
+                    if s.type != c.type and c.type in self.TYPES
+                )
+            replace = ', '.join(f'CAST({quote(n)} AS {t}) AS {quote(n)}' for n, t in casts.items())
+            paths = ', '.join("'" + str(f).replace("'", "''") + "'" for f in files)
+            self.BACKEND.execute(
+                sqlalchemy.text(
+                    f'CREATE OR REPLACE TEMP VIEW {quote(origin.key)} AS SELECT * '
+                    + (f'REPLACE ({replace}) ' if replace else '')
+                    + f'FROM read_parquet([{paths}], union_by_name=true, hive_partitioning=false)'
+                )
+            )
+            return 0  # not materialized
+
+
+def quote(identifier: str) -> str:
+    """Quote the SQL identifier.
+
+    Args:
+        identifier: Name to be quoted.
+
+    Returns:
+        Quoted identifier.
+    """
+    return '"' + identifier.replace('"', '""') + '"'
+
+
+class Progress(collections.namedtuple('Progress', 'origin, partition, done, total, seconds, error')):
+    """Cache warm-up progress report of a single partition."""
+
+    origin: provider.Origin
+    partition: typing.Optional[provider.Partition]
+    done: int
+    """Number of the partitions processed so far."""
+    total: int
+    seconds: float
+    error: typing.Optional[Exception]
+
+    def __str__(self):
+        name = self.origin.key + (f':{self.partition.key}' if self.partition else '')
+        status = f'failed: {self.error}' if self.error else 'cached'
+        return f'[{self.done}/{self.total}] {name} {status} ({self.seconds:.1f}s)'
+
+
+def warm(
+    origins: typing.Optional[typing.Iterable[provider.Origin]] = None,
+    partitions: typing.Optional[typing.Collection[str]] = None,
+    concurrency: int = 4,
+    progress: typing.Optional[typing.Callable[[Progress], None]] = None,
+) -> list[Progress]:
+    """Pre-populate the cache of the given origins in parallel.
+
+    Args:
+        origins: Origins to be cached (all the default ``ORIGINS`` if not specified).
+        partitions: Optional keys of the partitions to be cached (all of them if not specified).
+        concurrency: Maximum number of the partitions to be cached in parallel.
+        progress: Optional callback to be called upon completion of each of the partitions.
+
+    Returns:
+        Progress reports of all the partitions in the order of completion.
+    """
+
+    def populate(origin: provider.Origin, partition: typing.Optional[provider.Partition]) -> Progress:
+        """Cache the single partition capturing any error."""
+        start = time.perf_counter()
+        try:
+            origin.warm([partition], concurrency=1)
+        except Exception as err:  # pylint: disable=broad-except
+            LOGGER.exception('Warming up %s failed', origin.key)
+            return Progress(origin, partition, 0, 0, time.perf_counter() - start, err)
+        return Progress(origin, partition, 0, 0, time.perf_counter() - start, None)
+
+    origins = [provider.resolve(o) for o in (ORIGINS if origins is None else origins)]
+    tasks = [
+        (o, p)
+        for o in origins
+        if isinstance(o, provider.Origin)
+        for p in o.inventory()
+        if partitions is None or (p is not None and p.key in partitions)
+    ]
+    reports = []
+    with futures.ThreadPoolExecutor(concurrency, thread_name_prefix='openlake-warm') as pool:
+        for report in futures.as_completed([pool.submit(populate, o, p) for o, p in tasks]):
+            reports.append(report.result()._replace(done=len(reports) + 1, total=len(tasks)))
+            if progress:
+                progress(reports[-1])
+    return reports
@@ -0,0 +1,88 @@
+# Licensed to the Apache Software Foundation (ASF) under one
+# or more contributor license agreements.  See the NOTICE file
+# distributed with this work for additional information
+# regarding copyright ownership.  The ASF licenses this file
+# to you under the Apache License, Version 2.0 (the
+# "License"); you may not use this file except in compliance
+# with the License.  You may obtain a copy of the License at
+#
+#   http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing,
+# software distributed under the License is distributed on an
+# "AS IS" BASIS, WITHOUT WARRANTIES OR CONDITIONS OF ANY
+# KIND, either express or implied.  See the License for the
+# specific language governing permissions and limitations
+# under the License.
+"""
+Openlake cache management command-line interface.
+
+Usage::
+
+    python -m openlake warm [ORIGIN ...] [--partition KEY ...] [--concurrency N]
+    python -m openlake export BUNDLE [ORIGIN ...]
+    python -m openlake import BUNDLE
+"""
+import argparse
+import logging
+import pathlib
+import sys
+import typing
+
+import openlake
+from openlake import cache, provider
+
+
+def select(names: typing.Collection[str]) -> list[provider.Origin]:
+    """Select the default origins by their (case-insensitive) class names.
+
+    Args:
+        names: Origin names (all origins if empty).
+
+    Returns:
+        Selected origins.
+
+    Raises:
+        SystemExit: If any of the names is unknown.
+    """
+    origins = {
+        (o.name if isinstance(o, provider.Lazy) else o.__class__.__name__).lower(): o
+        for o in openlake.ORIGINS
+        if isinstance(o, (provider.Origin, provider.Lazy))
+    }
+    if unknown := {n.lower() for n in names}.difference(origins):
+        raise SystemExit(f'Unknown origin(s): {", ".join(sorted(unknown))} (available: {", ".join(sorted(origins))})')
+    selected = [origins[n.lower()] for n in names] if names else origins.values()
+    return [provider.resolve(o) for o in selected]  # importing just the selected providers
+
+
+def main(argv: typing.Optional[typing.Sequence[str]] = None) -> int:
+    """Command-line entrypoint."""
+    cli = argparse.ArgumentParser(prog='openlake', description='Openlake cache management.')
+    commands = cli.add_subparsers(dest='command', required=True)
+    warm = commands.add_parser('warm', help='pre-populate the cache')
+    warm.add_argument('origins', nargs='*', metavar='ORIGIN', help='origins to be cached (default all)')
+    warm.add_argument('-p', '--partition', action='append', help='partition keys to be cached (default all)')
+    warm.add_argument('-j', '--concurrency', type=int, default=4, help='number of partitions cached in parallel')
+    export = commands.add_parser('export', help='pack the cache into a bundle')
+    export.add_argument('bundle', type=pathlib.Path, help='target bundle (.tar, .tar.gz, .tar.bz2 or .tar.xz)')
+    export.add_argument('origins', nargs='*', metavar='ORIGIN', help='origins to be exported (default all)')
+    restore = commands.add_parser('import', help='unpack a cache bundle')
+    restore.add_argument('bundle', type=pathlib.Path, help='source bundle')
+    args = cli.parse_args(argv)
+    logging.basicConfig(level=logging.WARNING)
+
+    if args.command == 'warm':
+        reports = openlake.warm(select(args.origins), args.partition, args.concurrency, progress=print)
+        return 1 if any(r.error for r in reports) else 0
+    if args.command == 'export':
+        entries = cache.export(args.bundle, cache.DIR, [e for o in select(args.origins) for e in o.cached()])
+        print(f'Exported {len(entries)} entries ({sum(e.size for e in entries)} bytes) into {args.bundle}')
+    else:
+        restored = cache.restore(args.bundle, cache.DIR)
+        print(f'Imported {len(restored)} entries into {cache.DIR}')
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
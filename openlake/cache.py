@@ -17,28 +17,1542 @@
 """
 Openlake caching.
 """
+import asyncio
+import atexit
+import collections
+import contextlib
+import datetime
+import hashlib
+import json
 import logging
+import os
 import pathlib
+import queue
+import shutil
+import sys
+import tarfile
+import tempfile
+import threading
 import typing
+import uuid
+from urllib import parse
 
+import numpy
 import pandas
+import pyarrow
 from forml import setup
+from pyarrow import compute, dataset, fs, ipc, parquet
+
+from openlake import metrics
+from openlake import predicate as predmod
+
+try:
+    import fcntl
+except ImportError:  # Windows
+    fcntl = None
+
+if typing.TYPE_CHECKING:
+    from forml.io import dsl
 
 DIR = setup.USRDIR / '.cache' / 'openlake'
+MMAP = fs.LocalFileSystem(use_mmap=True)
+
+Content = typing.Union[pandas.DataFrame, pyarrow.Table]
+Writer = typing.Union[parquet.ParquetWriter, ipc.RecordBatchFileWriter]
 
 LOGGER = logging.getLogger(__name__)
 
+#: Integer types available for the compaction in order of preference.
+INTEGERS: typing.Mapping[pyarrow.DataType, tuple[int, int]] = {
+    pyarrow.int8(): (-(1 << 7), (1 << 7) - 1),
+    pyarrow.int16(): (-(1 << 15), (1 << 15) - 1),
+    pyarrow.int32(): (-(1 << 31), (1 << 31) - 1),
+}
+#: Subdirectory of the origin cache holding the raw (downloaded) artifacts.
+ARTIFACTS = '_artifacts'
+#: Disk budget (in bytes) of the entire cache enforced by evicting the least recently used entries (None for unbounded).
+BUDGET: typing.Optional[int] = int(os.getenv('OPENLAKE_CACHE_BUDGET', '0')) or None
+#: Capacity (in bytes) of the host-level shared memory cache to be used as the default one (None for in-process only).
+SHARED: typing.Optional[int] = int(os.getenv('OPENLAKE_CACHE_SHARED', '0')) or None
+#: JSON tag of the encoded temporal values in the metadata records.
+TEMPORAL = '$temporal'
+#: Maximum ratio of distinct values for a string column to get dictionary encoded.
+REPETITION = 0.5
+
+
+class Format(collections.namedtuple('Format', 'suffix, dataset, writer')):
+    """Cache storage format specification."""
+
+    suffix: str
+    dataset: str
+    writer: typing.Callable[[pathlib.Path, pyarrow.Schema], Writer]
+
+    def path(self, key: str, cachedir: pathlib.Path = DIR) -> pathlib.Path:
+        """Get the path of the cache entry stored in this format.
+
+        Args:
+            key: Cache entry key.
+            cachedir: Cache root directory.
+
+        Returns:
+            Cache entry path.
+        """
+        return cachedir / f'{key}.{self.suffix}'
+
+
+#: Compressed columnar format - compact on disk but requiring decoding on each read.
+PARQUET = Format('parquet', 'parquet', lambda p, s: parquet.ParquetWriter(p, s, flavor='spark'))
+#: Uncompressed Arrow IPC (Feather V2) format - memory-mapped for zero-copy reading shared across processes.
+ARROW = Format('arrow', 'ipc', ipc.new_file)
+
+
+class Stats(dict[str, tuple[typing.Any, typing.Any]]):
+    """Running min/max statistics of the table columns."""
+
+    ORDERABLE: tuple[typing.Callable[[pyarrow.DataType], bool]] = (
+        pyarrow.types.is_integer,
+        pyarrow.types.is_floating,
+        pyarrow.types.is_temporal,
+        pyarrow.types.is_string,
+    )
+
+    def __init__(self):
+        super().__init__()
+        self.rows: int = 0
+
+    @classmethod
+    def from_record(cls, record: typing.Mapping[str, typing.Any]) -> 'Stats':
+        """Restore the statistics from the manifest record.
+
+        Args:
+            record: Manifest record (row) to restore from.
+
+        Returns:
+            Statistics instance.
+        """
+        stats = cls()
+        stats.rows = record['rows']
+        for column in (c[4:] for c in record.keys() if c.startswith('min.')):
+            low, high = record[f'min.{column}'], record[f'max.{column}']
+            stats[column] = None if pandas.isna(low) else low, None if pandas.isna(high) else high
+        return stats
+
+    def to_record(self) -> dict[str, typing.Any]:
+        """Serialize the statistics to the (manifest) record.
+
+        Returns:
+            Record with the row count and the min/max values of each column.
+        """
+        return {
+            'rows': self.rows,
+            **{f'min.{c}': s[0] for c, s in self.items()},
+            **{f'max.{c}': s[1] for c, s in self.items()},
+        }
+
+    def update(self, table: pyarrow.Table) -> None:  # pylint: disable=arguments-differ
+        """Merge the row count and the min/max values of the given table columns into this statistics.
+
+        Args:
+            table: Table to be merged.
+        """
+        self.rows += table.num_rows
+        for field in table.schema:
+            if not any(t(field.type) for t in self.ORDERABLE):
+                continue
+            bounds = compute.min_max(table[field.name])
+            self._include(field.name, bounds['min'].as_py(), bounds['max'].as_py())
+
+    def merge(self, other: 'Stats') -> None:
+        """Merge the other statistics into this one.
+
+        Args:
+            other: Statistics to be merged.
+        """
+        self.rows += other.rows
+        for column, (low, high) in other.items():
+            self._include(column, low, high)
+
+    def _include(self, column: str, low: typing.Any, high: typing.Any) -> None:
+        """Extend the column bounds to include the given min/max values."""
+        if column in self:
+            current = self[column]
+            low = current[0] if low is None or (current[0] is not None and current[0] <= low) else low
+            high = current[1] if high is None or (current[1] is not None and current[1] >= high) else high
+        self[column] = low, high
+
+
+class Hive(collections.namedtuple('Hive', 'column, unit')):
+    """Hive-style cache layout splitting the entry into separate files by values of the given
+    column (optionally floored to the given temporal unit).
+
+    The entry is stored as a directory of the ``<name>=<value>/part-0.parquet`` files accompanied by
+    a manifest with the per-file min/max column statistics.
+    """
+
+    MANIFEST = '_manifest.parquet'
+    NULL = '__HIVE_DEFAULT_PARTITION__'
+
+    column: str
+    unit: typing.Optional[str]
+
+    def __new__(cls, column: str, unit: typing.Optional[str] = None):
+        return super().__new__(cls, column, unit)
+
+    @property
+    def name(self) -> str:
+        """Name of the partitioning key."""
+        return f'{self.column}_{self.unit}' if self.unit else self.column
+
+    @classmethod
+    def _format(cls, value: typing.Any) -> str:
+        """Format the partitioning value for the directory name."""
+        if value is None:
+            return cls.NULL
+        if isinstance(value, datetime.datetime) and value.time() == datetime.time():
+            value = value.date()
+        if isinstance(value, datetime.date):
+            value = value.isoformat()
+        return parse.quote(str(value), safe='')
+
+    def split(self, table: pyarrow.Table) -> typing.Iterable[tuple[str, pyarrow.Table]]:
+        """Split the table into the fragments according to this partitioning.
+
+        Args:
+            table: Table to be split.
+
+        Returns:
+            Iterable of fragment names and their tables.
+        """
+        values = table[self.column]
+        if pyarrow.types.is_dictionary(values.type):  # compacted entries
+            values = values.cast(values.type.value_type)
+        if self.unit:
+            values = compute.floor_temporal(values, unit=self.unit)
+        for value in compute.unique(values):
+            mask = compute.equal(values, value) if value.is_valid else compute.is_null(values)
+            yield f'{self.name}={self._format(value.as_py())}', table.filter(mask)
+
+
+class Sample(collections.namedtuple('Sample', 'limit, fraction')):
+    """Sampling specification - either the first ``limit`` rows (head) or the deterministic
+    pseudo-random ``fraction`` of the rows selected by hashing their identity.
+
+    The sample is always taken from the entire cache entry (never from its individual hive-style
+    fragments) so that it is the same regardless of how the entry is partitioned when loading.
+    """
+
+    limit: typing.Optional[int]
+    fraction: typing.Optional[float]
+
+    def __new__(cls, limit: typing.Optional[int] = None, fraction: typing.Optional[float] = None):
+        if (limit is None) == (fraction is None):
+            raise ValueError('Exactly one of the sample limit or fraction required')
+        if limit is not None and limit <= 0:
+            raise ValueError(f'Invalid sample limit: {limit}')
+        if fraction is not None and not 0 < fraction <= 1:
+            raise ValueError(f'Invalid sample fraction: {fraction}')
+        return super().__new__(cls, limit, fraction)
+
+    def __str__(self):
+        return f'head{self.limit}' if self.limit is not None else f'sample{self.fraction}'
+
+    def key(self, key: str) -> str:
+        """Get the key of the cache entry derived from the given one by this sampling.
+
+        Args:
+            key: Key of the full cache entry.
+
+        Returns:
+            Derived cache entry key.
+        """
+        return f'{key}~{self}'
+
+    @staticmethod
+    def _salt(fragment: typing.Optional[str]) -> int:
+        """Hash seed of the rows of the given fragment."""
+        if not fragment:
+            return 0
+        return int.from_bytes(hashlib.blake2b(fragment.encode(), digest_size=8).digest(), 'little')
+
+    def _mask(self, offset: int, rows: int, salt: int = 0) -> numpy.ndarray:
+        """Selection mask of the rows at the given positions (using the splitmix64 hash)."""
+        with numpy.errstate(over='ignore'):
+            value = numpy.arange(offset, offset + rows, dtype=numpy.uint64) + numpy.uint64(
+                (salt + 0x9E3779B97F4A7C15) % (1 << 64)
+            )
+            value = (value ^ (value >> numpy.uint64(30))) * numpy.uint64(0xBF58476D1CE4E5B9)
+            value = (value ^ (value >> numpy.uint64(27))) * numpy.uint64(0x94D049BB133111EB)
+            value ^= value >> numpy.uint64(31)
+        return (value >> numpy.uint64(11)) < numpy.uint64(self.fraction * (1 << 53))
+
+    def apply(
+        self, chunks: typing.Iterable[Content], layout: typing.Optional[Hive] = None
+    ) -> typing.Iterator[pyarrow.Table]:
+        """Sample the stream of chunks.
+
+        The head ``limit`` applies to the whole stream and the upstream iteration stops as soon as
+        it is reached. The ``fraction`` selection hashes the row position within its hive-style
+        fragment (if the layout is given) salted by the fragment name so that the same rows get
+        selected regardless of whether the chunks come in the loader order or fragment by fragment.
+
+        Args:
+            chunks: Stream of dataframe (or Arrow table) chunks.
+            layout: Optional hive-style partitioning of the sampled entry.
+
+        Returns:
+            Stream of sampled Arrow table chunks.
+        """
+        offsets: dict[typing.Optional[str], int] = collections.defaultdict(int)
+        for chunk in chunks:
+            if isinstance(chunk, pandas.DataFrame):
+                chunk = pyarrow.Table.from_pandas(chunk, preserve_index=False)
+            if self.limit is not None:
+                yield chunk.slice(0, self.limit - offsets[None])
+                offsets[None] += chunk.num_rows
+                if offsets[None] >= self.limit:
+                    return
+                continue
+            for fragment, part in layout.split(chunk) if layout else [(None, chunk)]:
+                yield part.filter(self._mask(offsets[fragment], part.num_rows, self._salt(fragment)))
+                offsets[fragment] += part.num_rows
+
+
+class Memory:
+    """In-process LRU cache of the loaded Arrow tables bounded by their total size in bytes.
+
+    Arrow tables are immutable so the cached instances can be safely shared by all the consumers.
+    """
+
+    class Key(collections.namedtuple('Key', 'stored, fragment, columns, predicate, fingerprint')):
+        """Memory cache key."""
+
+        stored: pathlib.Path
+        fragment: typing.Optional[str]
+        columns: typing.Optional[frozenset[str]]
+        predicate: typing.Optional['dsl.Predicate']
+        fingerprint: typing.Optional[str]
+
+    def __init__(self, capacity: int):
+        self.capacity: int = capacity
+        self._size: int = 0
+        self._tables: collections.OrderedDict[Memory.Key, pyarrow.Table] = collections.OrderedDict()
+        self._lock: threading.Lock = threading.Lock()
+
+    def __len__(self):
+        return len(self._tables)
+
+    @property
+    def size(self) -> int:
+        """Total size of the cached tables in bytes."""
+        return self._size
+
+    def get(self, key: 'Memory.Key') -> typing.Optional[pyarrow.Table]:
+        """Get the cached table marking it as the most recently used.
+
+        Args:
+            key: Memory cache key.
+
+        Returns:
+            The cached table or None if not cached.
+        """
+        with self._lock:
+            if key not in self._tables:
+                return None
+            self._tables.move_to_end(key)
+            return self._tables[key]
+
+    def put(self, key: 'Memory.Key', value: pyarrow.Table) -> pyarrow.Table:
+        """Cache the table evicting the least recently used ones to stay within the capacity.
+
+        Tables bigger than the total capacity are not cached at all.
+
+        Args:
+            key: Memory cache key.
+            value: Table to be cached.
+
+        Returns:
+            The cached table instance.
+        """
+        if value.nbytes > self.capacity:
+            return value
+        with self._lock:
+            if key in self._tables:
+                self._size -= self._tables.pop(key).nbytes
+            self._tables[key] = value
+            self._size += value.nbytes
+            while self._size > self.capacity:
+                _, evicted = self._tables.popitem(last=False)
+                self._size -= evicted.nbytes
+        return value
+
+    def discard(self, stored: pathlib.Path) -> None:
+        """Drop all tables loaded from the given cache entry.
+
+        Args:
+            stored: Path of the (modified) cache entry.
+        """
+        with self._lock:
+            for key in [k for k in self._tables if k.stored == stored]:
+                self._size -= self._tables.pop(key).nbytes
+
+    def clear(self) -> None:
+        """Drop all the cached tables."""
+        with self._lock:
+            self._tables.clear()
+            self._size = 0
+
+
+def alive(pid: int) -> bool:
+    """Check the process with the given id is running.
+
+    Args:
+        pid: Process id.
+
+    Returns:
+        True if running (or if it can't be determined).
+    """
+    if sys.platform == 'win32':  # os.kill would terminate it
+        return True
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:  # owned by another user
+        pass
+    return True
+
+
+class Shared(Memory):
+    """Host-level memory cache of the loaded Arrow tables shared by all processes on the same host.
+
+    The first process loading a table publishes it as an (uncompressed) Arrow IPC segment in a
+    shared-memory directory (``/dev/shm`` if available) and any other process (i.e. parallel
+    workers) attaches to it read-only by memory-mapping it - so there is just one copy of the table
+    in the physical memory regardless of the number of processes using it.
+
+    Each attaching process holds a reference to the segment which gets released at its exit (or
+    explicitly using the :meth:`release` method). Segments no longer referenced by any live process
+    are the first to be evicted when the capacity is exceeded and are removed once the last
+    referencing process releases them.
+    """
+
+    SUFFIX = 'arrow'
+
+    def __init__(self, capacity: int, directory: typing.Optional[pathlib.Path] = None):
+        super().__init__(capacity)
+        if directory is None:
+            shm = pathlib.Path('/dev/shm')
+            directory = (shm if shm.is_dir() else pathlib.Path(tempfile.gettempdir())) / 'openlake'
+        self.directory: pathlib.Path = directory
+        self.directory.mkdir(parents=True, exist_ok=True)
+        atexit.register(self.release)
+
+    @staticmethod
+    def _digest(*values: typing.Any) -> str:
+        """Get a digest of the values stable across processes."""
+        return hashlib.sha256(json.dumps(values, default=str).encode()).hexdigest()[:16]
+
+    def _segment(self, key: 'Memory.Key') -> pathlib.Path:
+        """Get the path of the shared segment holding the table for the given key.
+
+        The name is prefixed with the digest of the stored entry so that all the segments derived
+        from it can be discarded together.
+        """
+        columns = sorted(key.columns) if key.columns is not None else None
+        predicate = str(key.predicate) if key.predicate is not None else None
+        selection = self._digest(key.fragment, columns, predicate, key.fingerprint)
+        return self.directory / f'{self._digest(str(key.stored))}-{selection}.{self.SUFFIX}'
+
+    def _reference(self, segment: pathlib.Path, pid: typing.Optional[int] = None) -> pathlib.Path:
+        """Get the path of the file representing the reference of the given process to the segment."""
+        return segment.with_name(f'{segment.name}.{pid or os.getpid()}.ref')
+
+    def references(self, segment: pathlib.Path) -> int:
+        """Count the live processes referencing the given segment (dropping references of the dead ones).
+
+        Args:
+            segment: Shared segment path.
+
+        Returns:
+            Number of the referencing processes.
+        """
+        count = 0
+        for reference in segment.parent.glob(f'{segment.name}.*.ref'):
+            if alive(int(reference.suffixes[-2][1:])):
+                count += 1
+            else:
+                reference.unlink(missing_ok=True)
+        return count
+
+    def _attach(self, key: 'Memory.Key', segment: pathlib.Path) -> typing.Optional[pyarrow.Table]:
+        """Memory-map the segment (if exists) registering the reference of this process."""
+        if not segment.exists():
+            return None
+        self._reference(segment).touch()  # before mapping so that the segment can't be released meanwhile
+        try:
+            table = ipc.open_file(pyarrow.memory_map(str(segment))).read_all()
+        except FileNotFoundError:
+            self._reference(segment).unlink(missing_ok=True)
+            return None
+        with self._lock:
+            if key not in self._tables:
+                self._tables[key] = table
+                self._size += table.nbytes
+            return self._tables[key]
+
+    def get(self, key: 'Memory.Key') -> typing.Optional[pyarrow.Table]:
+        """Get the table attached by this process or attach it if published by another one.
+
+        Args:
+            key: Memory cache key.
+
+        Returns:
+            The (memory-mapped) table or None if not cached.
+        """
+        if (table := super().get(key)) is not None:
+            return table
+        return self._attach(key, self._segment(key))
+
+    def put(self, key: 'Memory.Key', value: pyarrow.Table) -> pyarrow.Table:
+        """Publish the table to the shared memory (unless already published by another process).
+
+        Args:
+            key: Memory cache key.
+            value: Table to be published.
+
+        Returns:
+            The shared (memory-mapped) instance of the table to be used instead of the original one
+            (or the original one if it can't be published within the capacity).
+        """
+        segment = self._segment(key)
+        with lock(self.directory / '.lock'):
+            if not segment.exists():
+                if not self._reserve(value.nbytes):
+                    return value
+                staging = segment.with_name(f'.{segment.name}.{os.getpid()}.tmp')
+                with ipc.new_file(str(staging), value.schema) as writer:
+                    writer.write_table(value.unify_dictionaries())
+                os.replace(staging, segment)
+        return self._attach(key, segment) or value
+
+    def _reserve(self, size: int) -> bool:
+        """Evict the least recently published unreferenced segments to make room for the given size."""
+        if size > self.capacity:
+            return False
+        segments = sorted(self.directory.glob(f'*.{self.SUFFIX}'), key=lambda s: s.stat().st_mtime)
+        used = sum(s.stat().st_size for s in segments)
+        for segment in segments:
+            if used + size <= self.capacity:
+                break
+            if not self.references(segment):
+                used -= segment.stat().st_size
+                segment.unlink()
+        return used + size <= self.capacity
+
+    def discard(self, stored: pathlib.Path) -> None:
+        """Drop all tables loaded from the given cache entry (including the shared segments).
+
+        Processes already attached keep their mapping until they release it.
+
+        Args:
+            stored: Path of the (modified) cache entry.
+        """
+        super().discard(stored)
+        prefix = self._digest(str(stored))
+        with lock(self.directory / '.lock'):
+            for segment in self.directory.glob(f'{prefix}-*.{self.SUFFIX}'):
+                segment.unlink(missing_ok=True)
+            for reference in self.directory.glob(f'{prefix}-*.{self.SUFFIX}.{os.getpid()}.ref'):
+                reference.unlink()
+
+    def clear(self) -> None:
+        """Release all the tables attached by this process."""
+        self.release()
+
+    def release(self) -> None:
+        """Release all the tables attached by this process removing the segments no longer referenced."""
+        with self._lock:
+            keys = list(self._tables)
+            self._tables.clear()
+            self._size = 0
+        if not self.directory.exists():
+            return
+        with lock(self.directory / '.lock'):
+            for segment in {self._segment(k) for k in keys}:
+                self._reference(segment).unlink(missing_ok=True)
+                if not self.references(segment):
+                    segment.unlink(missing_ok=True)
+
+
+#: Default process-wide memory cache (the capacity can be adjusted or set to zero to disable it).
+MEMORY = Shared(SHARED) if SHARED else Memory(1 << 30)
+
+
+def manifest(stored: pathlib.Path) -> typing.Optional[pandas.DataFrame]:
+    """Get the manifest of the given hive-style cache entry.
+
+    The manifest contains the ``fragment``, ``path`` and ``rows`` columns followed by the
+    ``min.<column>`` and ``max.<column>`` statistics of each of the entry files.
+
+    Args:
+        stored: Path to the cache entry.
+
+    Returns:
+        Manifest dataframe or None if the entry doesn't exist or is not hive-style.
+    """
+    path = stored / Hive.MANIFEST
+    if not path.exists():
+        return None
+    return pandas.read_parquet(path)
+
+
+def remove(path: pathlib.Path) -> None:
+    """Remove the given file or directory (if exists).
+
+    Args:
+        path: Path to be removed.
+    """
+    if path.is_dir():
+        shutil.rmtree(path)
+    else:
+        path.unlink(missing_ok=True)
+
+
+@contextlib.contextmanager
+def lock(path: pathlib.Path) -> typing.Iterator[None]:
+    """Exclusive cross-process lock based on the given lock file.
+
+    On platforms without ``fcntl`` support (Windows) this is a no-op leaving the concurrent writers to
+    just race for the (atomic) publishing of their results.
+
+    Args:
+        path: Lock file path.
+
+    Returns:
+        Context manager holding the lock.
+    """
+    path.parent.mkdir(parents=True, exist_ok=True)
+    with open(path, 'a+b') as handle:
+        if fcntl:
+            fcntl.flock(handle, fcntl.LOCK_EX)
+        try:
+            yield
+        finally:
+            if fcntl:
+                fcntl.flock(handle, fcntl.LOCK_UN)
+
+
+def exists(
+    key: str,
+    cachedir: pathlib.Path = DIR,
+    layout: typing.Optional[Hive] = None,
+    fmt: Format = PARQUET,
+    fingerprint: typing.Optional[str] = None,
+) -> bool:
+    """Check the (complete) cache entry exists.
+
+    Args:
+        key: Cache entry key.
+        cachedir: Cache root directory.
+        layout: Optional hive-style partitioning of the cache entry.
+        fmt: Storage format of the cache entry.
+        fingerprint: Optional version of the content the entry must have been stored with.
+
+    Returns:
+        True if the (valid) entry exists.
+    """
+    stored = fmt.path(key, cachedir)
+    if not ((stored / Hive.MANIFEST).exists() if layout else stored.is_file()):
+        return False
+    if fingerprint is not None and (record := describe(stored)).get('fingerprint') != fingerprint:
+        LOGGER.info('[%s] stale cache entry (fingerprint %s)', key, record.get('fingerprint'))
+        return False
+    return True
+
+
+def metadata(stored: pathlib.Path) -> pathlib.Path:
+    """Get the path of the metadata record of the given cache entry (or artifact).
+
+    Args:
+        stored: Cache entry path.
+
+    Returns:
+        Metadata record path.
+    """
+    return stored.with_name(f'{stored.name}.json')
+
+
+def _encode(value: typing.Any) -> typing.Any:
+    """JSON encoder of the temporal values."""
+    if isinstance(value, (datetime.datetime, datetime.date)):
+        return {TEMPORAL: value.isoformat(), 'time': isinstance(value, datetime.datetime)}
+    raise TypeError(f'Not JSON serializable: {value!r}')
+
+
+def _decode(value: dict[str, typing.Any]) -> typing.Any:
+    """JSON decoder of the temporal values."""
+    if TEMPORAL not in value:
+        return value
+    return (datetime.datetime if value['time'] else datetime.date).fromisoformat(value[TEMPORAL])
+
+
+def describe(stored: pathlib.Path) -> dict[str, typing.Any]:
+    """Load the metadata record of the given cache entry (or artifact).
+
+    Args:
+        stored: Cache entry path.
+
+    Returns:
+        Metadata record (empty if missing).
+    """
+    try:
+        return json.loads(metadata(stored).read_text(), object_hook=_decode)
+    except (FileNotFoundError, json.JSONDecodeError):
+        return {}
+
+
+def touch(stored: pathlib.Path) -> None:
+    """Mark the cache entry (or artifact) as recently used.
+
+    Args:
+        stored: Cache entry path.
+    """
+    with contextlib.suppress(FileNotFoundError):
+        os.utime(metadata(stored))
+
+
+def publish(staging: pathlib.Path, stored: pathlib.Path, **record: typing.Any) -> None:
+    """Atomically replace the cache entry (or artifact) with the staged content followed by writing
+    its metadata record and enforcing the disk budget.
+
+    Args:
+        staging: Staged content.
+        stored: Target cache entry path.
+        record: Metadata to be stored for the entry.
+    """
+    if stored.is_dir() or staging.is_dir():  # incomplete hive entry (flat files get replaced atomically)
+        remove(stored)
+    os.replace(staging, stored)
+    metadata(stored).write_text(json.dumps({'created': datetime.datetime.now().isoformat(), **record}, default=_encode))
+    if BUDGET is not None:
+        purge(DIR if stored.is_relative_to(DIR) else stored.parent, budget=BUDGET, keep=[stored])
+
+
+def read(
+    stored: typing.Union[pathlib.Path, typing.Sequence[pathlib.Path]],
+    columns: typing.Optional[typing.Collection[str]] = None,
+    predicate: typing.Optional['dsl.Predicate'] = None,
+    fmt: Format = PARQUET,
+) -> pyarrow.Table:
+    """Read the cached file(s) projecting just the given columns and pushing down the predicate.
+
+    The files are memory-mapped rather than being read into private buffers.
+
+    Args:
+        stored: Path to the cached file (or a sequence of files).
+        columns: Optional subset of columns to be loaded (columns not present in the file are ignored).
+        predicate: Optional row filter - only its translatable subset gets pushed down so mismatching
+                   rows can still be returned.
+        fmt: Storage format of the cached files.
+
+    Returns:
+        The (partially) filtered Arrow table.
+    """
+    paths = [str(stored)] if isinstance(stored, pathlib.Path) else [str(p) for p in stored]
+    source = dataset.dataset(paths, format=fmt.dataset, filesystem=MMAP)
+    fields = source.schema.names
+    if columns is not None:
+        columns = [c for c in fields if c in columns]
+    filters = predmod.arrow(predicate, fields) if predicate is not None else None
+    return source.to_table(columns=columns, filter=filters)
+
+
+def compact(schema: pyarrow.Schema, stats: Stats, dictionary: typing.Collection[str] = frozenset()) -> pyarrow.Schema:
+    """Derive the compact version of the given schema.
+
+    Integer fields are narrowed to the smallest type able to hold their min/max values and the
+    selected (string) fields are dictionary encoded.
+
+    Args:
+        schema: Schema to be compacted.
+        stats: Column statistics of the data.
+        dictionary: Names of the fields to be dictionary encoded.
+
+    Returns:
+        Compacted schema.
+    """
+
+    def narrow(field: pyarrow.Field) -> pyarrow.Field:
+        """Get the compact version of the field."""
+        if field.name in dictionary:
+            return field.with_type(pyarrow.dictionary(pyarrow.int32(), field.type))
+        if pyarrow.types.is_signed_integer(field.type) and None not in stats.get(field.name, (None, None)):
+            low, high = stats[field.name]
+            for kind, (minimum, maximum) in INTEGERS.items():
+                if kind.bit_width < field.type.bit_width and minimum <= low and high <= maximum:
+                    return field.with_type(kind)
+        return field
+
+    return pyarrow.schema(narrow(f) for f in schema)
+
+
+def repetitive(table: pyarrow.Table) -> set[str]:
+    """Find the string columns with the ratio of distinct values low enough to benefit from the
+    dictionary encoding.
+
+    Args:
+        table: Sample data to be analyzed.
+
+    Returns:
+        Names of the repetitive string columns.
+    """
+    return {
+        f.name
+        for f in table.schema
+        if (pyarrow.types.is_string(f.type) or pyarrow.types.is_large_string(f.type))
+        and compute.count_distinct(table[f.name]).as_py() <= REPETITION * table.num_rows
+    }
+
+
+def recode(path: pathlib.Path, schema: pyarrow.Schema, fmt: Format = PARQUET) -> None:
+    """Rewrite the cache file casting its content to the given schema.
+
+    Args:
+        path: Cache file to be rewritten.
+        schema: Target schema.
+        fmt: Storage format of the cache file.
+    """
+
+    def cast(table: pyarrow.Table) -> pyarrow.Table:
+        """Cast the table to the target schema (dictionary encoding needs to be explicit)."""
+        for field in schema:
+            if pyarrow.types.is_dictionary(field.type) and not pyarrow.types.is_dictionary(table[field.name].type):
+                index = table.schema.get_field_index(field.name)
+                table = table.set_column(index, field.name, table[field.name].dictionary_encode())
+        return table.cast(schema)
+
+    source = dataset.dataset(str(path), format=fmt.dataset, filesystem=MMAP)
+    staging = path.with_name(f'.{path.name}.recode')
+    writer = fmt.writer(staging, schema)
+    try:
+        if isinstance(writer, ipc.RecordBatchFileWriter):  # single dictionary per field allowed in the IPC file
+            writer.write_table(cast(source.to_table()).unify_dictionaries())
+        else:
+            for batch in source.to_batches():
+                writer.write_table(cast(pyarrow.Table.from_batches([batch])))
+    finally:
+        writer.close()
+    os.replace(staging, path)
+
+
+def write(
+    stored: pathlib.Path,
+    chunks: typing.Iterable[typing.Union[pandas.DataFrame, pyarrow.Table]],
+    schema: typing.Optional[pyarrow.Schema] = None,
+    layout: typing.Optional[Hive] = None,
+    fmt: Format = PARQUET,
+    compaction: bool = False,
+) -> Stats:
+    """Write the stream of dataframe (or Arrow table) chunks into the cache file one by one.
+
+    All chunks are cast to the common schema which is made of the given ``schema`` fields (if
+    provided) complemented by the types of the first chunk (integer fields keep their actual type).
+
+    With the ``compaction`` enabled, the written files are eventually recoded using the compact
+    schema derived from the statistics of the whole content (narrowed integers) and of the first
+    chunk (dictionary encoding of the repetitive strings).
+
+    Args:
+        stored: Path to the target file (or directory in case of the hive layout).
+        chunks: Stream of dataframe chunks.
+        schema: Optional schema hint for the stored fields.
+        layout: Optional hive-style partitioning of the entry.
+        fmt: Storage format of the cache entry.
+        compaction: Whether to store the content using the compact schema.
+
+    Returns:
+        Statistics of the entire written content.
+    """
+    writers: dict[typing.Optional[str], Writer] = {}
+    stats: dict[typing.Optional[str], Stats] = collections.defaultdict(Stats)
+    dictionary: set[str] = set()
+
+    def merge(field: pyarrow.Field) -> pyarrow.Field:
+        """Get the field of the schema hint matching the given field of the actual data."""
+        if not schema or field.name not in schema.names:
+            return field
+        hint = schema.field(field.name)
+        if pyarrow.types.is_integer(field.type) and pyarrow.types.is_integer(hint.type):
+            return field  # keeping the actual width and signedness (i.e. uint64)
+        return hint
+
+    def path(fragment: typing.Optional[str]) -> pathlib.Path:
+        """Get the file path of the given fragment."""
+        return stored / fragment / f'part-0.{fmt.suffix}' if fragment else stored
+
+    def target(fragment: typing.Optional[str]) -> Writer:
+        """Get the (new) writer for the given fragment."""
+        if fragment not in writers:
+            if fragment:
+                path(fragment).parent.mkdir(parents=True)
+            writers[fragment] = fmt.writer(path(fragment), schema)
+        return writers[fragment]
+
+    try:
+        for chunk in chunks:
+            table = (
+                pyarrow.Table.from_pandas(chunk, preserve_index=False) if isinstance(chunk, pandas.DataFrame) else chunk
+            )
+            if not writers:
+                schema = pyarrow.schema(merge(f) for f in table.schema)
+                dictionary = repetitive(table) if compaction else set()
+            table = table.cast(schema)
+            for fragment, part in layout.split(table) if layout else [(None, table)]:
+                target(fragment).write_table(part)
+                stats[fragment].update(part)
+        if not writers:
+            raise ValueError(f'No data to write to {stored}')
+        for writer in writers.values():
+            writer.close()
+        total = Stats()
+        for fragment in writers:
+            total.merge(stats[fragment])
+        if compaction and (compacted := compact(schema, total, dictionary)) != schema:
+            for fragment in writers:
+                recode(path(fragment), compacted, fmt)
+        if layout:
+            pandas.DataFrame(
+                {'fragment': f, 'path': f'{f}/part-0.{fmt.suffix}', **stats[f].to_record()} for f in writers
+            ).to_parquet(stored / Hive.MANIFEST, index=False)
+    except BaseException:
+        for writer in writers.values():
+            writer.close()
+        remove(stored)
+        raise
+    return total
+
+
+def chunked(content: typing.Union[Content, typing.Iterable[Content]]) -> typing.Iterable[Content]:
+    """Normalize the loaded content to a stream of chunks.
+
+    Args:
+        content: Full content or a stream of its chunks.
+
+    Returns:
+        Stream of chunks.
+    """
+    return [content] if isinstance(content, (pandas.DataFrame, pyarrow.Table)) else content
+
+
+def files(
+    stored: pathlib.Path, layout: typing.Optional[Hive] = None, fragment: typing.Optional[str] = None
+) -> list[pathlib.Path]:
+    """Get the file path(s) of the given cache entry.
+
+    Args:
+        stored: Cache entry path.
+        layout: Optional hive-style partitioning of the cache entry.
+        fragment: Optional fragment of the hive-style cache entry.
+
+    Returns:
+        List of the entry files (the selected fragments in case of the hive layout).
+    """
+    if not layout:
+        return [stored]
+    index = manifest(stored)
+    return [stored / p for f, p in zip(index['fragment'], index['path']) if fragment in {None, f}]
+
+
+def footprint(path: pathlib.Path) -> int:
+    """Get the size of the given file (or directory tree) on disk.
+
+    Args:
+        path: File or directory path.
+
+    Returns:
+        Total size in bytes.
+    """
+    if not path.is_dir():
+        return path.stat().st_size
+    return sum(f.stat().st_size for f in path.rglob('*') if f.is_file())
+
+
+def table(
+    key: str,
+    loader: typing.Callable[[], typing.Union[Content, typing.Iterable[Content]]],
+    cachedir: pathlib.Path = DIR,
+    columns: typing.Optional[typing.Collection[str]] = None,
+    predicate: typing.Optional['dsl.Predicate'] = None,
+    schema: typing.Optional[pyarrow.Schema] = None,
+    layout: typing.Optional[Hive] = None,
+    fragment: typing.Optional[str] = None,
+    fmt: Format = PARQUET,
+    memory: typing.Optional[Memory] = MEMORY,
+    compaction: bool = False,
+    fingerprint: typing.Optional[str] = None,
+    sample: typing.Optional[Sample] = None,
+) -> pyarrow.Table:
+    """Return the Arrow table for the given key - either from cache or via the loader followed by caching the content.
+
+    The loader can either return the full dataframe (or Arrow table) or a stream of its chunks which
+    get written to the cache one by one (so that the memory footprint is bounded by the chunk size).
+    The result is then read back (memory-mapped) from the cache and kept in the in-process memory
+    tier so that repeated loads of the same selection are served without touching the disk.
+
+    Args:
+        key: Cache entry key.
+        loader: Callback for loading the full content (or its chunks) in case of a cache miss.
+        cachedir: Cache root directory.
+        columns: Optional subset of columns to be returned (more can be returned).
+        predicate: Optional push-down row filter (mismatching rows can still be returned).
+        schema: Optional schema hint for casting the streamed chunks.
+        layout: Optional hive-style partitioning of the cache entry.
+        fragment: Optional fragment of the hive-style cache entry to be returned.
+        fmt: Storage format of the cache entry.
+        memory: Optional in-process memory cache to be used in front of the persistent one.
+        compaction: Whether to store the content using the compact schema (see :func:`write`).
+        fingerprint: Optional version of the content - existing entry with a different version gets replaced.
+        sample: Optional sampling to be applied - the sample of the entire entry is cached as its own
+                (flat) entry derived either from the full entry (if exists) or directly from the
+                loader stream (fragments then get their share of the entire sample).
+
+    Returns:
+        The cached (shared and thus immutable) Arrow table.
+    """
+    stored = fmt.path(key, cachedir)
+    if sample is not None:
+
+        def derive() -> typing.Iterable[pyarrow.Table]:
+            """Loader of the sample from the full entry (if exists) or the original loader."""
+            if exists(key, cachedir, layout, fmt, fingerprint):
+                source = dataset.dataset([str(p) for p in files(stored, layout)], format=fmt.dataset, filesystem=MMAP)
+                return sample.apply((pyarrow.Table.from_batches([b]) for b in source.to_batches()), layout)
+            return sample.apply(chunked(loader()), layout)
+
+        if layout and fragment and columns is not None:
+            columns = {*columns, layout.column}
+        result = table(
+            sample.key(key),
+            derive,
+            cachedir,
+            columns,
+            predicate,
+            schema,
+            fmt=fmt,
+            memory=memory,
+            compaction=compaction,
+            fingerprint=fingerprint,
+        )
+        if layout and fragment:  # the fragment share of the entire entry sample
+            result = next((t for f, t in layout.split(result) if f == fragment), result.slice(0, 0))
+        return result
+    selection = Memory.Key(
+        stored, fragment, frozenset(columns) if columns is not None else None, predicate, fingerprint
+    )
+    if memory is not None and (cached := memory.get(selection)) is not None:
+        LOGGER.debug('[%s] memory hit', key)
+        metrics.REGISTRY.lookup(key, metrics.MEMORY)
+        return cached
+    if exists(key, cachedir, layout, fmt, fingerprint):
+        LOGGER.debug('[%s] cache hit', key)
+        metrics.REGISTRY.lookup(key, metrics.DISK)
+        touch(stored)
+    else:
+        metrics.REGISTRY.lookup(key, metrics.MISS)
+        with lock(cachedir / f'{key}.lock'):
+            if exists(key, cachedir, layout, fmt, fingerprint):
+                LOGGER.debug('[%s] cache filled concurrently', key)
+            else:
+                LOGGER.debug('[%s] cache miss', key)
+                staging = cachedir / f'.{key}.{fmt.suffix}.{os.getpid()}-{threading.get_ident()}.tmp'
+
+                def produce() -> typing.Iterator[Content]:
+                    """Stream of the loaded chunks (including the loader call itself)."""
+                    yield from chunked(loader())
+
+                with metrics.stage('write', key) as span:
+                    stats = write(staging, span.iterate('parse', produce()), schema, layout, fmt, compaction)
+                    span.rows, span.size = stats.rows, footprint(staging)
+                publish(staging, stored, fingerprint=fingerprint, stats=stats.to_record())
+                if memory is not None:
+                    memory.discard(stored)
+    with metrics.stage('read', key) as span:
+        result = read(files(stored, layout, fragment), columns, predicate, fmt)
+        span.rows, span.size = result.num_rows, result.nbytes
+    if memory is not None:
+        result = memory.put(selection, result)
+    return result
+
+
+def batches(
+    key: str,
+    loader: typing.Callable[[], typing.Union[Content, typing.Iterable[Content]]],
+    cachedir: pathlib.Path = DIR,
+    columns: typing.Optional[typing.Collection[str]] = None,
+    predicate: typing.Optional['dsl.Predicate'] = None,
+    schema: typing.Optional[pyarrow.Schema] = None,
+    layout: typing.Optional[Hive] = None,
+    fragment: typing.Optional[str] = None,
+    fmt: Format = PARQUET,
+    compaction: bool = False,
+    fingerprint: typing.Optional[str] = None,
+    size: int = 1 << 16,
+    memory: typing.Optional[Memory] = MEMORY,
+) -> typing.Iterator[pyarrow.RecordBatch]:
+    """Stream the record batches for the given key without ever materializing the full content.
+
+    On a cache hit, the batches are scanned (memory-mapped) from the cache entry. On a miss, the
+    loader chunks are passed through while being written to the cache in the background (see
+    :func:`tee`) so that the first batches are available before the loading completes. Fragments
+    of hive-style entries can only be selected from the complete entry so for these the cache gets
+    filled first. The entry lock is only held while materializing the entry - never during the
+    (consumer-paced) streaming.
+
+    Args:
+        key: Cache entry key.
+        loader: Callback for loading the full content (or its chunks) in case of a cache miss.
+        cachedir: Cache root directory.
+        columns: Optional subset of columns to be returned (more can be returned).
+        predicate: Optional push-down row filter (mismatching rows can still be returned).
+        schema: Optional schema hint for casting the streamed chunks.
+        layout: Optional hive-style partitioning of the cache entry.
+        fragment: Optional fragment of the hive-style cache entry to be returned.
+        fmt: Storage format of the cache entry.
+        compaction: Whether to store the content using the compact schema (see :func:`write`).
+        fingerprint: Optional version of the content - existing entry with a different version gets replaced.
+        size: Maximum number of rows per batch.
+        memory: Optional in-process memory cache to be invalidated when (re)building the entry.
+
+    Returns:
+        Iterator of the record batches (the types of the batches passed through on a miss are the
+        original loader types rather than the compacted ones).
+    """
+    stored = fmt.path(key, cachedir)
+    if exists(key, cachedir, layout, fmt, fingerprint):
+        LOGGER.debug('[%s] cache hit', key)
+        metrics.REGISTRY.lookup(key, metrics.DISK)
+    else:
+        metrics.REGISTRY.lookup(key, metrics.MISS)
+        if fragment is None:
+            LOGGER.debug('[%s] cache miss - streaming', key)
+            chunks = tee(key, chunked(loader()), cachedir, schema, layout, fmt, compaction, fingerprint, memory)
+            with contextlib.closing(chunks):
+                for chunk in chunks:
+                    if predicate is not None:
+                        if (expression := predmod.arrow(predicate, chunk.schema.names)) is not None:
+                            chunk = chunk.filter(expression)
+                    if columns is not None:
+                        chunk = chunk.select([c for c in chunk.schema.names if c in columns])
+                    yield from chunk.to_batches(max_chunksize=size)
+            return
+        with lock(cachedir / f'{key}.lock'):
+            if exists(key, cachedir, layout, fmt, fingerprint):
+                LOGGER.debug('[%s] cache filled concurrently', key)
+            else:
+                LOGGER.debug('[%s] cache miss', key)
+                staging = cachedir / f'.{key}.{fmt.suffix}.{os.getpid()}-{threading.get_ident()}.tmp'
+                stats = write(staging, chunked(loader()), schema, layout, fmt, compaction)
+                publish(staging, stored, fingerprint=fingerprint, stats=stats.to_record())
+                if memory is not None:
+                    memory.discard(stored)
+    touch(stored)
+    source = dataset.dataset([str(p) for p in files(stored, layout, fragment)], format=fmt.dataset, filesystem=MMAP)
+    if columns is not None:
+        columns = [c for c in source.schema.names if c in columns]
+    expression = predmod.arrow(predicate, source.schema.names) if predicate is not None else None
+    yield from source.to_batches(columns=columns, filter=expression, batch_size=size)
+
+
+def tee(
+    key: str,
+    chunks: typing.Iterable[Content],
+    cachedir: pathlib.Path = DIR,
+    schema: typing.Optional[pyarrow.Schema] = None,
+    layout: typing.Optional[Hive] = None,
+    fmt: Format = PARQUET,
+    compaction: bool = False,
+    fingerprint: typing.Optional[str] = None,
+    memory: typing.Optional[Memory] = MEMORY,
+    depth: int = 2,
+) -> typing.Iterator[pyarrow.Table]:
+    """Pass the chunks through while writing them to the cache entry in a background thread.
+
+    The entry is published only once the stream gets fully consumed - abandoning the iteration (or
+    any failure) discards the partially written content. The number of chunks buffered for the
+    writer is bounded so the consumer can't run away from it. Concurrent streams of the same entry
+    are not excluded (each writes its own staging file) - only the publishing happens under the
+    entry lock (and is skipped if the entry has been completed in the meantime).
+
+    Args:
+        key: Cache entry key.
+        chunks: Stream of the dataframe (or Arrow table) chunks.
+        cachedir: Cache root directory.
+        schema: Optional schema hint for casting the chunks.
+        layout: Optional hive-style partitioning of the cache entry.
+        fmt: Storage format of the cache entry.
+        compaction: Whether to store the content using the compact schema (see :func:`write`).
+        fingerprint: Optional version of the content to be recorded.
+        memory: Optional in-process memory cache to be invalidated when publishing the entry.
+        depth: Maximum number of chunks queued for the writer.
+
+    Returns:
+        Iterator of the chunks (as the immutable Arrow tables shared with the writer).
+    """
+    stored = fmt.path(key, cachedir)
+    staging = cachedir / f'.{key}.{fmt.suffix}.{os.getpid()}-{uuid.uuid4().hex}.tmp'
+    cachedir.mkdir(parents=True, exist_ok=True)
+    pipe = queue.Queue(maxsize=depth)
+    aborted = threading.Event()
+    result = {}
+
+    def drain() -> typing.Iterator[pyarrow.Table]:
+        """Writer side of the pipe."""
+        while (chunk := pipe.get()) is not None:
+            if aborted.is_set():
+                raise InterruptedError(f'Writing {key} aborted')
+            yield chunk
+
+    def persist() -> None:
+        """Writer thread body."""
+        try:
+            result['stats'] = write(staging, drain(), schema, layout, fmt, compaction)
+        except BaseException as err:  # pylint: disable=broad-except
+            result['error'] = err
+            while pipe.get() is not None:  # unblock the producer
+                pass
+
+    writer = threading.Thread(target=persist, name=f'openlake-tee-{key}', daemon=True)
+    writer.start()
+    try:
+        for chunk in chunks:
+            if isinstance(chunk, pandas.DataFrame):
+                chunk = pyarrow.Table.from_pandas(chunk, preserve_index=False)
+            pipe.put(chunk)
+            if error := result.get('error'):
+                raise error
+            yield chunk
+    except BaseException:
+        aborted.set()
+        raise
+    finally:
+        pipe.put(None)
+        writer.join()
+        if aborted.is_set() or 'error' in result:
+            remove(staging)
+    if error := result.get('error'):
+        raise error
+    with lock(cachedir / f'{key}.lock'):
+        if exists(key, cachedir, layout, fmt, fingerprint):
+            LOGGER.debug('[%s] cache filled concurrently', key)
+            remove(staging)
+            return
+        publish(staging, stored, fingerprint=fingerprint, stats=result['stats'].to_record())
+    if memory is not None:
+        memory.discard(stored)
+
 
 def dataframe(
-    key: str, loader: typing.Callable[[], pandas.DataFrame], cachedir: pathlib.Path = DIR
+    key: str,
+    loader: typing.Callable[[], typing.Union[Content, typing.Iterable[Content]]],
+    cachedir: pathlib.Path = DIR,
+    columns: typing.Optional[typing.Collection[str]] = None,
+    predicate: typing.Optional['dsl.Predicate'] = None,
+    **kwargs,
 ) -> pandas.DataFrame:
-    """Return the dataframe for the given key - either from cache or via the loader followed by caching the content."""
-    stored = cachedir / f'{key}.parquet'
-    if stored.exists():
-        LOGGER.debug('[%s] cache hit', key)
-        return pandas.read_parquet(stored)
-    LOGGER.debug('[%s] cache miss', key)
-    frame = loader()
+    """Return the dataframe for the given key - either from cache or via the loader followed by caching the content.
+
+    This is just a Pandas wrapper of the :func:`table` function. As the underlying table can be
+    shared via the memory cache, the (numeric) columns of the dataframe can be read-only zero-copy
+    views of the Arrow buffers.
+
+    Args:
+        key: Cache entry key.
+        loader: Callback for loading the full content (or its chunks) in case of a cache miss.
+        cachedir: Cache root directory.
+        columns: Optional subset of columns to be returned (more can be returned).
+        predicate: Optional push-down row filter (mismatching rows can still be returned).
+        kwargs: Additional options of the :func:`table` function.
+
+    Returns:
+        The cached dataframe.
+    """
+    return table(key, loader, cachedir, columns, predicate, **kwargs).to_pandas(split_blocks=True)
+
+
+def checksum(path: pathlib.Path, blocksize: int = 1 << 20) -> str:
+    """Calculate the SHA-256 checksum of the file content.
+
+    Args:
+        path: File to be checksummed.
+        blocksize: Size of the blocks to be read at once.
+
+    Returns:
+        Hex digest of the file content.
+    """
+    digest = hashlib.sha256()
+    with open(path, 'rb') as handle:
+        while block := handle.read(blocksize):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def intact(stored: pathlib.Path) -> bool:
+    """Check the raw artifact is complete and matches its recorded size and checksum.
+
+    The (expensive) checksum is only verified if the file modification time doesn't match the record.
+
+    Args:
+        stored: Artifact path.
+
+    Returns:
+        True if the artifact is intact.
+    """
+    record = describe(stored)
+    if not stored.is_file() or not record:
+        return False
+    stat = stored.stat()
+    if stat.st_size != record['size']:
+        return False
+    return stat.st_mtime_ns == record['mtime'] or checksum(stored) == record['sha256']
+
+
+def artifact(
+    name: str,
+    download: typing.Callable[[typing.BinaryIO, int], typing.Optional[typing.Mapping[str, typing.Any]]],
+    cachedir: pathlib.Path = DIR,
+    fresh: typing.Optional[typing.Callable[[typing.Mapping[str, typing.Any]], bool]] = None,
+) -> pathlib.Path:
+    """Return the path of the intact raw artifact - either from cache or via the (resumable) download.
+
+    The download callback receives the (binary) target file opened for appending together with the
+    offset of the data already downloaded by some previous (interrupted) attempt. It should
+    continue downloading from that offset (or truncate the file if resuming is not possible). It can
+    return additional metadata to be stored in the artifact record.
+
+    Args:
+        name: Artifact name (relative path within the artifacts directory).
+        download: Callback for downloading the artifact content into the given file starting at the given offset.
+        cachedir: Cache root directory.
+        fresh: Optional callback for revalidating the cached artifact (based on its metadata record)
+               against its source - stale artifact gets downloaded again.
+
+    Returns:
+        Path to the intact artifact file.
+    """
+    stored = cachedir / ARTIFACTS / name
+    if intact(stored) and (fresh is None or fresh(describe(stored))):
+        LOGGER.debug('[%s] artifact cache hit', name)
+        touch(stored)
+        return stored
+    with lock(stored.with_name(f'{stored.name}.lock')):
+        if intact(stored) and (fresh is None or fresh(describe(stored))):
+            LOGGER.debug('[%s] artifact downloaded concurrently', name)
+            return stored
+        partial = stored.with_name(f'.{stored.name}.part')
+        with metrics.stage('download', name) as span, open(partial, 'ab') as handle:
+            if offset := handle.tell():
+                LOGGER.info('[%s] resuming download from %d bytes', name, offset)
+            record = download(handle, offset)
+            span.size = handle.tell() - offset
+        stat = partial.stat()
+        if not isinstance(record, typing.Mapping):
+            record = {}
+        publish(partial, stored, **record, size=stat.st_size, mtime=stat.st_mtime_ns, sha256=checksum(partial))
+    return stored
+
+
+async def aartifact(
+    name: str,
+    download: typing.Callable[
+        [typing.BinaryIO, int], typing.Awaitable[typing.Optional[typing.Mapping[str, typing.Any]]]
+    ],
+    cachedir: pathlib.Path = DIR,
+    fresh: typing.Optional[typing.Callable[[typing.Mapping[str, typing.Any]], typing.Awaitable[bool]]] = None,
+) -> pathlib.Path:
+    """Asynchronous version of the :func:`artifact` function using the awaitable callbacks.
+
+    Only the acquisition of the (blocking) artifact lock and the checksumming of the downloaded
+    content are offloaded to a thread.
+
+    Args:
+        name: Artifact name (relative path within the artifacts directory).
+        download: Coroutine function downloading the artifact content into the given file starting at the given offset.
+        cachedir: Cache root directory.
+        fresh: Optional coroutine function revalidating the cached artifact (based on its metadata
+               record) against its source - stale artifact gets downloaded again.
+
+    Returns:
+        Path to the intact artifact file.
+    """
+    stored = cachedir / ARTIFACTS / name
+    if intact(stored) and (fresh is None or await fresh(describe(stored))):
+        LOGGER.debug('[%s] artifact cache hit', name)
+        touch(stored)
+        return stored
+    async with contextlib.AsyncExitStack() as stack:
+        await asyncio.to_thread(stack.enter_context, lock(stored.with_name(f'{stored.name}.lock')))
+        if intact(stored) and (fresh is None or await fresh(describe(stored))):
+            LOGGER.debug('[%s] artifact downloaded concurrently', name)
+            return stored
+        partial = stored.with_name(f'.{stored.name}.part')
+        with metrics.stage('download', name) as span, open(partial, 'ab') as handle:
+            if offset := handle.tell():
+                LOGGER.info('[%s] resuming download from %d bytes', name, offset)
+            record = await download(handle, offset)
+            span.size = handle.tell() - offset
+        stat = partial.stat()
+        if not isinstance(record, typing.Mapping):
+            record = {}
+        digest = await asyncio.to_thread(checksum, partial)
+        publish(partial, stored, **record, size=stat.st_size, mtime=stat.st_mtime_ns, sha256=digest)
+    return stored
+
+
+class Entry(collections.namedtuple('Entry', 'path, size, accessed, record')):
+    """Cache entry (or artifact) information."""
+
+    path: pathlib.Path
+    size: int
+    accessed: datetime.datetime
+    record: typing.Mapping[str, typing.Any]
+
+
+def stats(cachedir: pathlib.Path = DIR) -> list[Entry]:
+    """List the cache entries (and artifacts) under the given directory.
+
+    Args:
+        cachedir: Cache root directory.
+
+    Returns:
+        Cache entries ordered from the least recently used.
+    """
+    entries = []
+    for record in cachedir.rglob('*.json'):
+        stored = record.with_name(record.name[: -len('.json')])
+        if not stored.exists():
+            continue
+        entries.append(
+            Entry(
+                stored,
+                footprint(stored),
+                datetime.datetime.fromtimestamp(record.stat().st_mtime),
+                describe(stored),
+            )
+        )
+    return sorted(entries, key=lambda e: e.accessed)
+
+
+def purge(
+    cachedir: pathlib.Path = DIR,
+    older: typing.Optional[datetime.timedelta] = None,
+    budget: typing.Optional[int] = None,
+    keep: typing.Collection[pathlib.Path] = (),
+    memory: typing.Optional[Memory] = MEMORY,
+) -> list[Entry]:
+    """Remove the cache entries (and artifacts) not used for longer than the given age and/or the
+    least recently used ones exceeding the given disk budget.
+
+    Without any criteria, all the entries get removed.
+
+    Args:
+        cachedir: Cache root directory.
+        older: Maximum age (since the last use) of the entries to be kept.
+        budget: Maximum total size (in bytes) of the entries to be kept.
+        keep: Entries to be spared from the removal.
+        memory: Optional in-process memory cache to drop the removed entries from.
+
+    Returns:
+        Removed entries.
+    """
+    entries = stats(cachedir)
+    candidates = [e for e in entries if e.path not in keep]
+    if older is None and budget is None:
+        expired = candidates
+    else:
+        cutoff = datetime.datetime.now() - older if older is not None else datetime.datetime.min
+        expired = [e for e in candidates if e.accessed < cutoff]
+        if budget is not None:
+            total = sum(e.size for e in entries) - sum(e.size for e in expired)
+            for entry in (e for e in candidates if e not in expired):
+                if total <= budget:
+                    break
+                expired.append(entry)
+                total -= entry.size
+    for entry in expired:
+        LOGGER.info('Purging %s (%d bytes)', entry.path, entry.size)
+        remove(entry.path)
+        remove(metadata(entry.path))
+        if memory is not None:
+            memory.discard(entry.path)
+    return expired
+
+
+def export(
+    bundle: pathlib.Path, cachedir: pathlib.Path = DIR, entries: typing.Optional[typing.Iterable[Entry]] = None
+) -> list[Entry]:
+    """Pack the cache entries (and artifacts) into a tar bundle to be restored on another node.
+
+    The bundle compression is chosen based on its suffix (``.gz``/``.tgz``, ``.bz2``, ``.xz`` or none).
+
+    Args:
+        bundle: Target bundle file path.
+        cachedir: Cache root directory.
+        entries: Entries (under the cache root) to be exported (all if not specified).
+
+    Returns:
+        Exported entries.
+    """
+    entries = stats(cachedir) if entries is None else list(entries)
+    compression = {'.gz': 'gz', '.tgz': 'gz', '.bz2': 'bz2', '.xz': 'xz'}.get(bundle.suffix, '')
+    staging = bundle.with_name(f'.{bundle.name}.part')
+    with tarfile.open(staging, f'w:{compression}') as archive:
+        for entry in entries:
+            for path in entry.path, metadata(entry.path):
+                archive.add(path, path.relative_to(cachedir).as_posix())
+    os.replace(staging, bundle)
+    return entries
+
+
+def restore(
+    bundle: pathlib.Path, cachedir: pathlib.Path = DIR, memory: typing.Optional[Memory] = MEMORY
+) -> list[pathlib.Path]:
+    """Unpack the cache bundle created using :func:`export` replacing any existing entries.
+
+    Args:
+        bundle: Source bundle file path.
+        cachedir: Cache root directory.
+        memory: Optional in-process memory cache to drop the replaced entries from.
+
+    Returns:
+        Restored entries.
+
+    Raises:
+        ValueError: If the bundle contains members that could escape the cache root.
+    """
     cachedir.mkdir(parents=True, exist_ok=True)
-    frame.to_parquet(stored, index=False, engine='pyarrow', flavor='spark')
-    return frame
+    staging = pathlib.Path(tempfile.mkdtemp(prefix='.restore-', dir=cachedir))
+    restored = []
+    try:
+        with tarfile.open(bundle) as archive:
+            members = archive.getmembers()
+            for member in members:
+                path = pathlib.PurePosixPath(member.name)
+                if path.is_absolute() or '..' in path.parts or not (member.isfile() or member.isdir()):
+                    raise ValueError(f'Unsafe bundle member: {member.name}')
+            archive.extractall(staging, members)
+        for record in sorted(staging.rglob('*.json')):
+            stored = record.with_name(record.name[: -len('.json')])
+            if not stored.exists():
+                continue
+            target = cachedir / stored.relative_to(staging)
+            target.parent.mkdir(parents=True, exist_ok=True)
+            remove(target)
+            os.replace(stored, target)
+            os.replace(record, metadata(target))
+            touch(target)
+            if memory is not None:
+                memory.discard(target)
+            restored.append(target)
+    finally:
+        remove(staging)
+    return restored
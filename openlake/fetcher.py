@@ -18,11 +18,33 @@
 Fetcher implementations.
 """
 import abc
+import asyncio
+import collections
+import functools
+import hashlib
+import logging
+import pathlib
 import typing
+import urllib.parse
+import urllib.request
+from concurrent import futures
 
+import forml
 from forml.io import dsl
 
-from openlake import provider
+from openlake import cache, provider
+
+try:
+    import urllib3
+except Exception as err:  # pylint: disable=broad-except
+    urllib3 = provider.Unavailable('urllib3', err)
+
+try:
+    import aiohttp
+except Exception as err:  # pylint: disable=broad-except
+    aiohttp = provider.Unavailable('aiohttp', err)
+
+LOGGER = logging.getLogger(__name__)
 
 
 class Mixin(typing.Generic[provider.PartitionT, provider.PayloadT], abc.ABC):
@@ -52,3 +74,297 @@ class Mixin(typing.Generic[provider.PartitionT, provider.PayloadT], abc.ABC):
         Returns:
             Data content object in a generic PayloadT to be parsed.
         """
+
+
+@functools.cache
+def pool() -> 'urllib3.PoolManager':
+    """Get the shared HTTP connection pool (keeping the connections alive across the requests).
+
+    Returns:
+        The pool manager instance.
+    """
+    return urllib3.PoolManager(
+        num_pools=16,
+        maxsize=8,
+        retries=urllib3.Retry(total=3, backoff_factor=0.5),
+        timeout=urllib3.Timeout(connect=10, read=60),
+    )
+
+
+#: HTTP client sessions shared within the event loops (together with the generators holding them open).
+_SESSIONS: dict[asyncio.AbstractEventLoop, tuple['aiohttp.ClientSession', typing.AsyncIterator]] = {}
+
+
+async def session() -> 'aiohttp.ClientSession':
+    """Get the HTTP client session shared within the running event loop (keeping the connections alive
+    across the requests).
+
+    The session gets closed upon the loop shutdown as part of finalizing its asynchronous generators.
+
+    Returns:
+        The client session instance.
+    """
+
+    async def hold() -> typing.AsyncIterator['aiohttp.ClientSession']:
+        """Asynchronous generator holding the session open until being finalized."""
+        try:
+            async with aiohttp.ClientSession(timeout=aiohttp.ClientTimeout(sock_connect=10, sock_read=60)) as client:
+                yield client
+        finally:
+            del _SESSIONS[loop]
+
+    loop = asyncio.get_running_loop()
+    if loop not in _SESSIONS:
+        holder = hold()
+        _SESSIONS[loop] = await anext(holder), holder
+    return _SESSIONS[loop][0]
+
+
+class URL(Mixin[provider.PartitionT, typing.IO], metaclass=abc.ABCMeta):
+    """Generic fetcher of HTTP(S) or local file URLs.
+
+    Remote content is downloaded into the raw artifact cache - resuming any interrupted download and
+    fetching the content in parallel ranges if supported by the server. The cached copy is
+    revalidated against its ETag/Last-Modified validators upon each fetch. Local ``file:`` URLs
+    are opened directly without caching (handy for testing).
+
+    The asynchronous :meth:`afetch` performs the HTTP requests natively using ``aiohttp`` (if
+    installed) rather than offloading the blocking fetch to a thread.
+    """
+
+    #: Size of the range requests (up to ``HTTP_PARALLEL`` of them are held in memory).
+    HTTP_BLOCKSIZE: int = 16 << 20
+    #: Maximum number of the range requests in flight.
+    HTTP_PARALLEL: int = 4
+    #: Whether to revalidate the cached copy against the source upon each fetch.
+    HTTP_REVALIDATE: bool = True
+
+    @abc.abstractmethod
+    def url(self, partition: provider.PartitionT) -> str:
+        """Get the URL of the given partition content.
+
+        Args:
+            partition: Partition identifier.
+
+        Returns:
+            The partition content URL.
+        """
+
+    def fetch(self, partition: provider.PartitionT) -> typing.IO:
+        url = self.url(partition)
+        parsed = urllib.parse.urlparse(url)
+        if parsed.scheme == 'file':
+            return open(urllib.request.url2pathname(parsed.path), 'rb')
+        path = cache.artifact(
+            self._artifact(parsed),
+            functools.partial(self._download, url),
+            self._cachedir,  # pylint: disable=no-member
+            functools.partial(self._fresh, url) if self.HTTP_REVALIDATE else None,
+        )
+        return open(path, 'rb')
+
+    async def afetch(self, partition: provider.PartitionT) -> typing.IO:
+        """Asynchronous version of the :meth:`fetch` method.
+
+        Args:
+            partition: Partition identifiers to be fetched.
+
+        Returns:
+            Data content object to be parsed.
+        """
+        url = self.url(partition)
+        parsed = urllib.parse.urlparse(url)
+        if parsed.scheme == 'file':
+            return open(urllib.request.url2pathname(parsed.path), 'rb')
+        if isinstance(aiohttp, provider.Unavailable):
+            return await asyncio.to_thread(self.fetch, partition)
+        client = await session()
+        path = await cache.aartifact(
+            self._artifact(parsed),
+            functools.partial(self._adownload, client, url),
+            self._cachedir,  # pylint: disable=no-member
+            functools.partial(self._afresh, client, url) if self.HTTP_REVALIDATE else None,
+        )
+        return open(path, 'rb')
+
+    @staticmethod
+    def _artifact(parsed: urllib.parse.ParseResult) -> str:
+        """Get the artifact name of the given URL."""
+        if parsed.query:  # keeping the file name (with its compression suffix) intact
+            return f'{parsed.netloc}/~{hashlib.sha256(parsed.query.encode()).hexdigest()[:16]}{parsed.path}'
+        return f'{parsed.netloc}{parsed.path}'
+
+    @staticmethod
+    def _validators(response: 'urllib3.BaseHTTPResponse') -> dict[str, typing.Optional[str]]:
+        """Extract the content validators from the response headers."""
+        return {'etag': response.headers.get('ETag'), 'modified': response.headers.get('Last-Modified')}
+
+    @staticmethod
+    def _conditions(url: str, record: typing.Mapping[str, typing.Any]) -> typing.Optional[dict[str, str]]:
+        """Get the headers of the conditional request revalidating the cached copy (described by its
+        metadata record) or None if there is nothing to revalidate against.
+        """
+        if record.get('url') != url or not (record.get('etag') or record.get('modified')):
+            return None
+        headers = {'If-None-Match': record.get('etag'), 'If-Modified-Since': record.get('modified')}
+        return {k: v for k, v in headers.items() if v}
+
+    def _revalidated(self, record: typing.Mapping[str, typing.Any], response: 'urllib3.BaseHTTPResponse') -> bool:
+        """Check the response to the conditional request confirms the cached copy is still fresh."""
+        if response.status == 304:
+            return True
+        actual = self._validators(response)
+        return response.status < 400 and any(record.get(k) and v == record.get(k) for k, v in actual.items())
+
+    def _fresh(self, url: str, record: typing.Mapping[str, typing.Any]) -> bool:
+        """Revalidate the cached copy (described by its metadata record) against the source."""
+        if (headers := self._conditions(url, record)) is None:
+            return record.get('url') == url
+        try:
+            response = pool().request('HEAD', url, headers=headers)
+        except urllib3.exceptions.HTTPError as err:
+            LOGGER.warning('Unable to revalidate %s (%s) - using the cached copy', url, err)
+            return True
+        return self._revalidated(record, response)
+
+    async def _afresh(
+        self, session: 'aiohttp.ClientSession', url: str, record: typing.Mapping[str, typing.Any]
+    ) -> bool:
+        """Asynchronous version of the :meth:`_fresh` method."""
+        if (headers := self._conditions(url, record)) is None:
+            return record.get('url') == url
+        try:
+            async with session.head(url, headers=headers, allow_redirects=True) as response:
+                return self._revalidated(record, response)
+        except aiohttp.ClientError as err:
+            LOGGER.warning('Unable to revalidate %s (%s) - using the cached copy', url, err)
+            return True
+
+    def _probe(self, head: 'urllib3.BaseHTTPResponse') -> tuple[dict[str, typing.Optional[str]], typing.Optional[int]]:
+        """Get the content validators and its length (if it can be downloaded in ranges) from the HEAD response."""
+        if head.status >= 400:
+            return {'etag': None, 'modified': None}, None
+        length = head.headers.get('Content-Length')
+        return self._validators(head), int(length) if head.headers.get('Accept-Ranges') == 'bytes' and length else None
+
+    @staticmethod
+    def _resume(url: str, target: typing.BinaryIO, offset: int, validator: str, ranged: bool) -> int:
+        """Check the partial content can be resumed (truncating it otherwise) and record its validator."""
+        marker = pathlib.Path(f'{target.name}.validator')  # validator of the partial content
+        if offset and not (ranged and validator and marker.exists() and marker.read_text('utf-8') == validator):
+            LOGGER.warning('Resuming %s download not possible - restarting', url)
+            target.truncate(0)
+            offset = 0
+        marker.write_text(validator, 'utf-8')
+        return offset
+
+    def _download(self, url: str, target: typing.BinaryIO, offset: int) -> dict[str, typing.Any]:
+        """Download the URL content (or its remainder starting at the given offset) into the target file."""
+        LOGGER.info('Fetching %s', url)
+        validators, length = self._probe(pool().request('HEAD', url))
+        validator = validators['etag'] or validators['modified'] or ''
+        offset = self._resume(url, target, offset, validator, length is not None)
+        if length is not None:
+            self._ranges(url, target, offset, length, validator)
+        else:
+            validators = self._stream(url, target)
+        pathlib.Path(f'{target.name}.validator').unlink()
+        return {'url': url, **validators}
+
+    async def _adownload(
+        self, session: 'aiohttp.ClientSession', url: str, target: typing.BinaryIO, offset: int
+    ) -> dict[str, typing.Any]:
+        """Asynchronous version of the :meth:`_download` method."""
+        LOGGER.info('Fetching %s', url)
+        async with session.head(url, allow_redirects=True) as head:
+            validators, length = self._probe(head)
+        validator = validators['etag'] or validators['modified'] or ''
+        offset = self._resume(url, target, offset, validator, length is not None)
+        if length is not None:
+            await self._aranges(session, url, target, offset, length, validator)
+        else:
+            validators = await self._astream(session, url, target)
+        pathlib.Path(f'{target.name}.validator').unlink()
+        return {'url': url, **validators}
+
+    def _ranges(self, url: str, target: typing.BinaryIO, offset: int, length: int, validator: str) -> None:
+        """Download the content in parallel range requests appending them to the target in order."""
+
+        def get(start: int, end: int) -> bytes:
+            """Fetch the single range."""
+            headers = {'Range': f'bytes={start}-{end - 1}'}
+            if validator:
+                headers['If-Range'] = validator
+            response = pool().request('GET', url, headers=headers)
+            if response.status != 206:
+                raise ConnectionError(f'Range request for {url} not satisfied (HTTP {response.status})')
+            return response.data
+
+        with futures.ThreadPoolExecutor(self.HTTP_PARALLEL, thread_name_prefix='openlake-range') as executor:
+            pending = collections.deque()
+            for start in range(offset, length, self.HTTP_BLOCKSIZE):
+                pending.append(executor.submit(get, start, min(start + self.HTTP_BLOCKSIZE, length)))
+                if len(pending) >= self.HTTP_PARALLEL:
+                    target.write(pending.popleft().result())
+            while pending:
+                target.write(pending.popleft().result())
+
+    async def _aranges(
+        self,
+        session: 'aiohttp.ClientSession',
+        url: str,
+        target: typing.BinaryIO,
+        offset: int,
+        length: int,
+        validator: str,
+    ) -> None:
+        """Asynchronous version of the :meth:`_ranges` method."""
+
+        async def get(start: int, end: int) -> bytes:
+            """Fetch the single range."""
+            headers = {'Range': f'bytes={start}-{end - 1}'}
+            if validator:
+                headers['If-Range'] = validator
+            async with session.get(url, headers=headers) as response:
+                if response.status != 206:
+                    raise ConnectionError(f'Range request for {url} not satisfied (HTTP {response.status})')
+                return await response.read()
+
+        pending = collections.deque()
+        try:
+            for start in range(offset, length, self.HTTP_BLOCKSIZE):
+                pending.append(asyncio.ensure_future(get(start, min(start + self.HTTP_BLOCKSIZE, length))))
+                if len(pending) >= self.HTTP_PARALLEL:
+                    target.write(await pending.popleft())
+            while pending:
+                target.write(await pending.popleft())
+        finally:
+            for request in pending:
+                request.cancel()
+
+    def _stream(self, url: str, target: typing.BinaryIO) -> dict[str, typing.Optional[str]]:
+        """Download the content using a single streaming request returning its validators."""
+        response = pool().request('GET', url, preload_content=False)
+        try:
+            if response.status == 404:
+                raise forml.MissingError(f'Content not found: {url}')
+            if response.status >= 400:
+                raise ConnectionError(f'Fetching {url} failed (HTTP {response.status})')
+            for chunk in response.stream(self.HTTP_BLOCKSIZE):
+                target.write(chunk)
+        finally:
+            response.release_conn()
+        return self._validators(response)
+
+    async def _astream(
+        self, session: 'aiohttp.ClientSession', url: str, target: typing.BinaryIO
+    ) -> dict[str, typing.Optional[str]]:
+        """Asynchronous version of the :meth:`_stream` method."""
+        async with session.get(url) as response:
+            if response.status == 404:
+                raise forml.MissingError(f'Content not found: {url}')
+            if response.status >= 400:
+                raise ConnectionError(f'Fetching {url} failed (HTTP {response.status})')
+            async for chunk in response.content.iter_chunked(self.HTTP_BLOCKSIZE):
+                target.write(chunk)
+            return self._validators(response)
@@ -0,0 +1,305 @@
+# Licensed to the Apache Software Foundation (ASF) under one
+# or more contributor license agreements.  See the NOTICE file
+# distributed with this work for additional information
+# regarding copyright ownership.  The ASF licenses this file
+# to you under the Apache License, Version 2.0 (the
+# "License"); you may not use this file except in compliance
+# with the License.  You may obtain a copy of the License at
+#
+#   http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing,
+# software distributed under the License is distributed on an
+# "AS IS" BASIS, WITHOUT WARRANTIES OR CONDITIONS OF ANY
+# KIND, either express or implied.  See the License for the
+# specific language governing permissions and limitations
+# under the License.
+"""
+Instrumentation of the loading stages.
+
+The individual stages (fetch, download, parse, write, read, materialize, query) report their
+events to the registry which aggregates them per cache key and stage and passes them to any
+subscribed callbacks. The aggregates can be dumped in JSON or Prometheus text format (the
+``OPENLAKE_METRICS`` environment variable can point to a file to dump them into at exit).
+"""
+import atexit
+import collections
+import contextlib
+import contextvars
+import json
+import logging
+import os
+import pathlib
+import sys
+import threading
+import time
+import typing
+
+LOGGER = logging.getLogger(__name__)
+
+#: Cache lookup results.
+MEMORY = 'memory'
+DISK = 'disk'
+MISS = 'miss'
+
+
+def peak() -> int:
+    """Get the peak resident set size of the process (in bytes - 0 if not available)."""
+    try:
+        import resource  # pylint: disable=import-outside-toplevel
+    except ImportError:  # not available on Windows
+        return 0
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * (1 if sys.platform == 'darwin' else 1024)
+
+
+class Event(collections.namedtuple('Event', 'stage, key, seconds, rows, size, peak')):
+    """Record of a single stage execution."""
+
+    stage: str
+    key: str
+    """Cache key (or artifact name) the stage relates to."""
+    seconds: float
+    rows: int
+    size: int
+    """Number of bytes read or written by the stage."""
+    peak: int
+    """Peak resident set size of the process at the end of the stage (in bytes)."""
+
+
+class Span:
+    """Mutable handle of a stage being measured allowing to set its rows and size.
+
+    Spans running within other spans (in the same thread or asyncio task) get their time excluded
+    from their parents so that each stage accounts just for its own time.
+    """
+
+    _ACTIVE: contextvars.ContextVar[tuple['Span', ...]] = contextvars.ContextVar('spans', default=())
+
+    def __init__(self, stage: str, key: str):
+        self.stage: str = stage
+        self.key: str = key
+        self.rows: int = 0
+        self.size: int = 0
+        self.seconds: float = 0.0
+        self.excluded: float = 0.0
+
+    @contextlib.contextmanager
+    def running(self) -> typing.Iterator[None]:
+        """Context manager measuring a period of this span running nested in the currently active one."""
+        stack = self._ACTIVE.get()
+        parent = stack[-1] if stack else None
+        token = self._ACTIVE.set((*stack, self))
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            elapsed = time.perf_counter() - start
+            self._ACTIVE.reset(token)
+            self.seconds += elapsed
+            if parent is not None:
+                parent.excluded += elapsed
+
+    def iterate(self, name: str, chunks: typing.Iterable[typing.Any]) -> typing.Iterator[typing.Any]:
+        """Measure the consumption of the given iterable as a separate (nested) stage.
+
+        Time spent producing the chunks gets excluded from this span and reported under the given
+        stage along with the number of rows of the chunks.
+
+        Args:
+            name: Name of the nested stage.
+            chunks: Iterable (of tables or dataframes) to be measured.
+
+        Returns:
+            Iterator of the original chunks.
+        """
+        nested = Span(name, self.key)
+        try:
+            chunks = iter(chunks)
+            while True:
+                with nested.running():
+                    try:
+                        chunk = next(chunks)
+                    except StopIteration:
+                        return
+                nested.rows += len(chunk)
+                yield chunk
+        finally:
+            nested.record()
+
+    def record(self) -> None:
+        """Report the span to the registry."""
+        REGISTRY.record(Event(self.stage, self.key, self.seconds - self.excluded, self.rows, self.size, peak()))
+
+
+class Registry:
+    """Thread-safe aggregator of the stage events and the cache lookups."""
+
+    class Stage(collections.namedtuple('Stage', 'count, seconds, rows, size, peak')):
+        """Aggregated stage statistics."""
+
+        count: int
+        seconds: float
+        rows: int
+        size: int
+        peak: int
+
+        def __add__(self, event: Event) -> 'Registry.Stage':
+            return self.__class__(
+                self.count + 1,
+                self.seconds + event.seconds,
+                self.rows + event.rows,
+                self.size + event.size,
+                max(self.peak, event.peak),
+            )
+
+    def __init__(self):
+        self._lock: threading.Lock = threading.Lock()
+        self._stages: dict[tuple[str, str], Registry.Stage] = {}
+        self._lookups: dict[tuple[str, str], int] = collections.Counter()
+        self._callbacks: list[typing.Callable[[Event], None]] = []
+
+    def subscribe(self, callback: typing.Callable[[Event], None]) -> None:
+        """Register the callback to be called (synchronously) with every recorded event.
+
+        Args:
+            callback: Event handler (any of its exceptions are logged and ignored).
+        """
+        with self._lock:
+            self._callbacks.append(callback)
+
+    def unsubscribe(self, callback: typing.Callable[[Event], None]) -> None:
+        """Remove the previously registered callback.
+
+        Args:
+            callback: Event handler to be removed.
+        """
+        with self._lock:
+            self._callbacks.remove(callback)
+
+    def record(self, event: Event) -> None:
+        """Aggregate the event and pass it to the subscribed callbacks.
+
+        Args:
+            event: Stage event to be recorded.
+        """
+        with self._lock:
+            index = event.key, event.stage
+            self._stages[index] = self._stages.get(index, self.Stage(0, 0.0, 0, 0, 0)) + event
+            callbacks = tuple(self._callbacks)
+        for callback in callbacks:
+            try:
+                callback(event)
+            except Exception as err:  # pylint: disable=broad-except
+                LOGGER.warning('Metrics callback %s failed: %s', callback, err)
+
+    def lookup(self, key: str, result: str) -> None:
+        """Count the cache lookup result.
+
+        Args:
+            key: Cache key.
+            result: One of the ``MEMORY``, ``DISK`` (hits) or ``MISS``.
+        """
+        with self._lock:
+            self._lookups[key, result] += 1
+
+    def reset(self) -> None:
+        """Drop all the aggregates (keeping the callbacks)."""
+        with self._lock:
+            self._stages.clear()
+            self._lookups.clear()
+
+    def snapshot(self) -> dict[str, dict[str, typing.Any]]:
+        """Get the aggregates per cache key.
+
+        Returns:
+            Mapping of cache keys to their stage statistics and cache lookup counts including the
+            hit ratio.
+        """
+        result = collections.defaultdict(lambda: {'stages': {}, 'lookups': {MEMORY: 0, DISK: 0, MISS: 0}})
+        with self._lock:
+            for (key, stage), stats in self._stages.items():
+                result[key]['stages'][stage] = stats._asdict()
+            for (key, outcome), count in self._lookups.items():
+                result[key]['lookups'][outcome] = count
+        for metrics in result.values():
+            lookups = metrics['lookups']
+            total = sum(lookups.values())
+            metrics['lookups']['ratio'] = (lookups[MEMORY] + lookups[DISK]) / total if total else None
+        return dict(result)
+
+    def to_json(self) -> str:
+        """Dump the aggregates in JSON format.
+
+        Returns:
+            JSON representation of the snapshot.
+        """
+        return json.dumps(self.snapshot(), indent=2, sort_keys=True)
+
+    def to_prometheus(self) -> str:
+        """Dump the aggregates in Prometheus text exposition format.
+
+        Returns:
+            Prometheus text representation of the snapshot.
+        """
+        metrics = {
+            'count': ('openlake_stage_calls_total', 'counter', 'Number of the stage executions.'),
+            'seconds': ('openlake_stage_seconds_total', 'counter', 'Wall time spent in the stage.'),
+            'rows': ('openlake_stage_rows_total', 'counter', 'Number of rows processed by the stage.'),
+            'size': ('openlake_stage_bytes_total', 'counter', 'Number of bytes read or written by the stage.'),
+            'peak': ('openlake_stage_peak_rss_bytes', 'gauge', 'Peak process RSS observed at the end of the stage.'),
+        }
+        snapshot = self.snapshot()
+        lines = []
+        for attribute, (name, kind, description) in metrics.items():
+            lines.extend((f'# HELP {name} {description}', f'# TYPE {name} {kind}'))
+            for key, stats in sorted(snapshot.items()):
+                for stage, values in sorted(stats['stages'].items()):
+                    lines.append(f'{name}{{key={json.dumps(key)},stage="{stage}"}} {values[attribute]}')
+        lines.extend(
+            (
+                '# HELP openlake_cache_lookups_total Number of the cache lookups by their result.',
+                '# TYPE openlake_cache_lookups_total counter',
+            )
+        )
+        for key, stats in sorted(snapshot.items()):
+            for outcome in MEMORY, DISK, MISS:
+                count = stats['lookups'][outcome]
+                lines.append(f'openlake_cache_lookups_total{{key={json.dumps(key)},result="{outcome}"}} {count}')
+        return '\n'.join(lines) + '\n'
+
+    def dump(self, path: pathlib.Path) -> None:
+        """Write the aggregates into the given file (Prometheus format for the ``.prom`` suffix, JSON otherwise).
+
+        Args:
+            path: Target file path.
+        """
+        path = pathlib.Path(path)
+        path.write_text(self.to_prometheus() if path.suffix == '.prom' else self.to_json(), encoding='utf-8')
+
+
+REGISTRY = Registry()
+
+
+@contextlib.contextmanager
+def stage(name: str, key: str) -> typing.Iterator[Span]:
+    """Context manager measuring the wall time of the enclosed stage.
+
+    The yielded span can be used to set the number of rows and bytes the stage processed.
+
+    Args:
+        name: Stage name.
+        key: Cache key (or artifact name) the stage relates to.
+
+    Returns:
+        Span of the stage being measured.
+    """
+    span = Span(name, key)
+    try:
+        with span.running():
+            yield span
+    finally:
+        span.record()
+
+
+if DUMP := os.getenv('OPENLAKE_METRICS'):
+    atexit.register(REGISTRY.dump, pathlib.Path(DUMP))
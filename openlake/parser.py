@@ -18,10 +18,22 @@
 """Parser implementations."""
 
 import abc
+import bz2
+import collections
+import copy
+import gzip
+import io
+import lzma
+import queue
+import threading
 import types
 import typing
+from concurrent import futures
 
+import numpy
 import pandas
+import pyarrow
+from pyarrow import csv
 
 from openlake import provider
 
@@ -30,7 +42,9 @@ class Mixin(typing.Generic[provider.PartitionT, provider.PayloadT], abc.ABC):
     """Parser mixin base class."""
 
     @abc.abstractmethod
-    def parse(self, partition: typing.Optional[provider.PartitionT], content: provider.PayloadT) -> pandas.DataFrame:
+    def parse(
+        self, partition: typing.Optional[provider.PartitionT], content: provider.PayloadT
+    ) -> typing.Union[pandas.DataFrame, pyarrow.Table]:
         """Parse the origin dataset.
 
         Args:
@@ -38,16 +52,131 @@ class Mixin(typing.Generic[provider.PartitionT, provider.PayloadT], abc.ABC):
             content: The data content object as returned by `.fetch()`.
 
         Returns:
-            Data in Pandas DataFrame format.
+            Data in Pandas DataFrame (or Arrow table) format.
         """
 
+    def stream(
+        self, partition: typing.Optional[provider.PartitionT], content: provider.PayloadT
+    ) -> typing.Iterable[typing.Union[pandas.DataFrame, pyarrow.Table]]:
+        """Parse the origin dataset as a stream of chunks.
+
+        Unless overridden, the entire dataset is parsed in a single chunk.
+
+        Args:
+            partition: Partition identifier representing the content.
+            content: The data content object as returned by `.fetch()`.
+
+        Returns:
+            Iterable of data chunks in Pandas DataFrame (or Arrow table) format.
+        """
+        yield self.parse(partition, content)
+
+
+class Decompressor(io.RawIOBase):
+    """Readable stream decompressing the source content in a background thread.
+
+    The decompression is pipelined through a bounded queue of blocks so that it runs concurrently
+    with the consumer (parser) of this stream. Closing the stream closes also the source.
+    """
+
+    CODECS: typing.Mapping[str, typing.Callable[[typing.IO], typing.IO]] = types.MappingProxyType(
+        {'gzip': lambda s: gzip.GzipFile(fileobj=s), 'bz2': bz2.BZ2File, 'xz': lzma.LZMAFile}
+    )
+
+    def __init__(self, source: typing.IO, codec: str, blocksize: int = 1 << 20, depth: int = 16):
+        super().__init__()
+        self._source: typing.IO = source
+        self._queue: queue.Queue[typing.Union[bytes, BaseException, None]] = queue.Queue(depth)
+        self._block: memoryview = memoryview(b'')
+        self._stopped: threading.Event = threading.Event()
+        self._producer: threading.Thread = threading.Thread(
+            target=self._produce,
+            args=(self.CODECS[codec](source), blocksize),
+            name='openlake-inflate',
+            daemon=True,
+        )
+        self._producer.start()
+
+    def _produce(self, stream: typing.IO, blocksize: int) -> None:
+        """Producer thread decompressing the stream block by block."""
+
+        def put(item: typing.Union[bytes, BaseException, None]) -> bool:
+            while not self._stopped.is_set():
+                try:
+                    self._queue.put(item, timeout=0.1)
+                    return True
+                except queue.Full:
+                    continue
+            return False
+
+        try:
+            with stream:
+                while (block := stream.read(blocksize)) and put(block):
+                    pass
+        except Exception as err:  # pylint: disable=broad-except
+            put(err)
+        else:
+            put(None)
+
+    def readable(self) -> bool:
+        return True
+
+    def readinto(self, buffer: bytearray) -> int:
+        while not self._block:
+            if (block := self._queue.get()) is None:
+                self._queue.put(None)  # keep signalling the end for any subsequent reads
+                return 0
+            if isinstance(block, BaseException):
+                self._queue.put(block)  # keep signalling the error for any subsequent reads
+                raise block
+            self._block = memoryview(block)
+        size = min(len(buffer), len(self._block))
+        buffer[:size] = self._block[:size]
+        self._block = self._block[size:]
+        return size
+
+    def close(self) -> None:
+        self._stopped.set()
+        self._producer.join()
+        self._source.close()
+        super().close()
+
 
 class CSV(Mixin[provider.PartitionT, typing.IO], metaclass=abc.ABCMeta):
-    """CSV parser mixin."""
+    """CSV parser mixin.
+
+    The parsing is done either using the (single-threaded) ``pandas`` engine or the multithreaded
+    block-parallel ``arrow`` engine (based on ``pyarrow.csv``) with the common subset of the
+    ``CSV_PARAMS`` translated to its native options. When chunked, the arrow engine reads the
+    content in line-aligned blocks of ``CSV_BLOCKSIZE`` bytes parsing them in a thread pool.
+    """
 
     CSV_PARAMS: typing.Mapping = types.MappingProxyType({})
+    CSV_CHUNKSIZE: typing.Optional[int] = None
+    CSV_ENGINE: str = 'pandas'
+    #: Size of the blocks parsed in parallel by the chunked arrow engine.
+    CSV_BLOCKSIZE: int = 16 << 20
+    VERSIONED: tuple[str] = ('CSV_PARAMS', 'CSV_CHUNKSIZE', 'CSV_ENGINE')
 
-    def parse(self, partition: typing.Optional[provider.PartitionT], content: typing.IO) -> pandas.DataFrame:
+    #: Pandas parameters mapped to the (read/parse/convert) pyarrow.csv options.
+    ARROW_PARAMS: typing.Mapping[str, tuple[str, str]] = types.MappingProxyType(
+        {
+            'sep': ('parse', 'delimiter'),
+            'delimiter': ('parse', 'delimiter'),
+            'quotechar': ('parse', 'quote_char'),
+            'escapechar': ('parse', 'escape_char'),
+            'names': ('read', 'column_names'),
+            'skiprows': ('read', 'skip_rows'),
+            'usecols': ('convert', 'include_columns'),
+            'na_values': ('convert', 'null_values'),
+            'true_values': ('convert', 'true_values'),
+            'false_values': ('convert', 'false_values'),
+        }
+    )
+
+    def parse(
+        self, partition: typing.Optional[provider.PartitionT], content: typing.IO
+    ) -> typing.Union[pandas.DataFrame, pyarrow.Table]:
         """Parse the origin dataset.
 
         Args:
@@ -55,6 +184,184 @@ class CSV(Mixin[provider.PartitionT, typing.IO], metaclass=abc.ABCMeta):
             content: The data content object as returned by `.fetch()`.
 
         Returns:
-            Data in Pandas DataFrame format.
+            Data in Pandas DataFrame (or Arrow table) format.
+        """
+        if self.CSV_ENGINE == 'arrow':
+            source, options = self.arrow(content, self.CSV_PARAMS)
+            with content:
+                return csv.read_csv(source, **options)
+        content, params = self.decompress(content)
+        with content:
+            return pandas.read_csv(content, **params)
+
+    def stream(
+        self, partition: typing.Optional[provider.PartitionT], content: typing.IO
+    ) -> typing.Iterable[typing.Union[pandas.DataFrame, pyarrow.Table]]:
+        """Parse the origin dataset in chunks of ``CSV_CHUNKSIZE`` rows (if set).
+
+        Args:
+            partition: Partition identifier representing the content.
+            content: The data content object as returned by `.fetch()`.
+
+        Returns:
+            Iterable of data chunks in Pandas DataFrame (or Arrow table) format.
+        """
+        if not self.CSV_CHUNKSIZE:
+            yield from super().stream(partition, content)
+            return
+        if self.CSV_ENGINE == 'arrow':
+            source, options = self.arrow(content, self.CSV_PARAMS)
+            tables, rows = [], 0
+            with content:
+                for table in self.blocks(source, options):  # regrouping the blocks into the chunks
+                    tables.append(table)
+                    rows += table.num_rows
+                    if rows >= self.CSV_CHUNKSIZE:
+                        yield pyarrow.concat_tables(tables, promote=True)
+                        tables, rows = [], 0
+                if tables:
+                    yield pyarrow.concat_tables(tables, promote=True)
+            return
+        content, params = self.decompress(content)
+        with content, pandas.read_csv(content, chunksize=self.CSV_CHUNKSIZE, **params) as reader:
+            yield from reader
+
+    def blocks(self, source: typing.Any, options: typing.Mapping[str, typing.Any]) -> typing.Iterator[pyarrow.Table]:
+        """Parse the CSV content in line-aligned blocks in parallel (yielding them in order).
+
+        The first block is parsed using the given options determining the column types of all the
+        subsequent blocks which are then parsed in a thread pool (each prefixed with the header
+        line). Content with newlines in the quoted values can't be split so it falls back to the
+        (single-threaded) streaming reader.
+
+        Args:
+            source: The (decompressed) content stream.
+            options: The ``read_options``, ``parse_options`` and ``convert_options`` keyword arguments.
+
+        Returns:
+            Iterator of the parsed blocks.
+        """
+        if options['parse_options'].newlines_in_values:
+            for batch in csv.open_csv(source, **options):
+                yield pyarrow.Table.from_batches([batch])
+            return
+        lines = self._lines(source)
+        if (first := next(lines, None)) is None:
+            return
+        table = csv.read_csv(pyarrow.py_buffer(first), **options)
+        yield table
+        read = copy.copy(options['read_options'])
+        start = 0
+        for _ in range(read.skip_rows):
+            start = first.index(b'\n', start) + 1
+        end = start if read.column_names or read.autogenerate_column_names else first.index(b'\n', start) + 1
+        header = first[start:end]
+        read.skip_rows, read.skip_rows_after_names, read.use_threads = 0, 0, False
+        convert = copy.copy(options['convert_options'])
+        convert.column_types = {f.name: f.type for f in table.schema if not pyarrow.types.is_null(f.type)}
+
+        def parse(block: bytes) -> pyarrow.Table:
+            """Parse the single block."""
+            return csv.read_csv(
+                pyarrow.py_buffer(header + block),
+                read_options=read,
+                parse_options=options['parse_options'],
+                convert_options=convert,
+            )
+
+        workers = pyarrow.cpu_count()
+        with futures.ThreadPoolExecutor(workers, thread_name_prefix='openlake-csv') as executor:
+            pending = collections.deque()
+            try:
+                for block in lines:
+                    pending.append(executor.submit(parse, block))
+                    if len(pending) > workers:
+                        yield pending.popleft().result()
+                while pending:
+                    yield pending.popleft().result()
+            finally:
+                for parsing in pending:
+                    parsing.cancel()
+
+    def _lines(self, source: typing.Any) -> typing.Iterator[bytes]:
+        """Read the content in blocks of whole lines."""
+        remainder = b''
+        while block := source.read(self.CSV_BLOCKSIZE):
+            if not (end := block.rfind(b'\n') + 1):
+                remainder += block
+                continue
+            yield remainder + block[:end]
+            remainder = block[end:]
+        if remainder:
+            yield remainder
+
+    @staticmethod
+    def compression(content: typing.IO, compression: typing.Optional[str] = 'infer') -> typing.Optional[str]:
+        """Resolve the compression of the content (inferring it from the file name if requested).
+
+        Args:
+            content: The data content object to be parsed.
+            compression: Explicit compression or ``infer``.
+
+        Returns:
+            Compression codec name or None.
+        """
+        if compression != 'infer':
+            return compression
+        try:
+            return pyarrow.Codec.detect(str(getattr(content, 'name', ''))).name
+        except (TypeError, ValueError):  # not a known compression extension
+            return None
+
+    def decompress(self, content: typing.IO) -> tuple[typing.IO, typing.Mapping[str, typing.Any]]:
+        """Wrap the compressed content in the pipelined decompressor (for the pandas engine).
+
+        The arrow engine is not affected as it already decompresses using its background I/O threads.
+
+        Args:
+            content: The data content object to be parsed.
+
+        Returns:
+            Tuple of the (decompressed) content and the CSV parameters adjusted accordingly.
+        """
+        compression = self.compression(content, self.CSV_PARAMS.get('compression', 'infer'))
+        if self.CSV_ENGINE == 'arrow' or compression not in Decompressor.CODECS:
+            return content, self.CSV_PARAMS
+        return io.BufferedReader(Decompressor(content, compression)), {**self.CSV_PARAMS, 'compression': None}
+
+    @classmethod
+    def arrow(
+        cls, content: typing.IO, params: typing.Mapping[str, typing.Any]
+    ) -> tuple[typing.Any, dict[str, typing.Any]]:
+        """Translate the Pandas CSV parameters to the pyarrow.csv options.
+
+        Args:
+            content: The data content object to be parsed.
+            params: Pandas ``read_csv`` parameters.
+
+        Returns:
+            Tuple of the (decompressed) content stream and the ``read_options``, ``parse_options``
+            and ``convert_options`` keyword arguments.
+
+        Raises:
+            ValueError: If any of the parameters is not supported.
         """
-        return pandas.read_csv(content, **self.CSV_PARAMS)
+        params = dict(params)
+        options = {'read': {}, 'parse': {}, 'convert': {}}
+        if compression := cls.compression(content, params.pop('compression', 'infer')):
+            content = pyarrow.CompressedInputStream(content, compression)
+        columns = options['convert']['column_types'] = {}
+        columns.update({c: pyarrow.from_numpy_dtype(numpy.dtype(t)) for c, t in params.pop('dtype', {}).items()})
+        columns.update({c: pyarrow.timestamp('ns') for c in params.pop('parse_dates', [])})
+        if date_format := params.pop('date_format', None):
+            options['convert']['timestamp_parsers'] = [date_format]
+        if unsupported := set(params).difference(cls.ARROW_PARAMS):
+            raise ValueError(f'Unsupported CSV parameters for the arrow engine: {", ".join(sorted(unsupported))}')
+        for param, value in params.items():
+            kind, option = cls.ARROW_PARAMS[param]
+            options[kind][option] = value
+        return content, {
+            'read_options': csv.ReadOptions(**options['read']),
+            'parse_options': csv.ParseOptions(**options['parse']),
+            'convert_options': csv.ConvertOptions(**options['convert']),
+        }
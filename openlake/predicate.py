@@ -0,0 +1,215 @@
+# Licensed to the Apache Software Foundation (ASF) under one
+# or more contributor license agreements.  See the NOTICE file
+# distributed with this work for additional information
+# regarding copyright ownership.  The ASF licenses this file
+# to you under the Apache License, Version 2.0 (the
+# "License"); you may not use this file except in compliance
+# with the License.  You may obtain a copy of the License at
+#
+#   http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing,
+# software distributed under the License is distributed on an
+# "AS IS" BASIS, WITHOUT WARRANTIES OR CONDITIONS OF ANY
+# KIND, either express or implied.  See the License for the
+# specific language governing permissions and limitations
+# under the License.
+"""
+Push-down predicate utilities.
+"""
+import operator
+import typing
+
+from forml.io import dsl
+from forml.io.dsl import function
+from pyarrow import compute
+
+COMPARISON: typing.Mapping[type[dsl.Predicate], typing.Callable[[typing.Any, typing.Any], typing.Any]] = {
+    function.Equal: operator.eq,
+    function.NotEqual: operator.ne,
+    function.LessThan: operator.lt,
+    function.LessEqual: operator.le,
+    function.GreaterThan: operator.gt,
+    function.GreaterEqual: operator.ge,
+}
+
+#: Operator to be used when swapping the operands (literal on the left).
+FLIPPED: typing.Mapping[type[dsl.Predicate], type[dsl.Predicate]] = {
+    function.Equal: function.Equal,
+    function.NotEqual: function.NotEqual,
+    function.LessThan: function.GreaterThan,
+    function.LessEqual: function.GreaterEqual,
+    function.GreaterThan: function.LessThan,
+    function.GreaterEqual: function.LessEqual,
+}
+
+
+#: Operator equivalent to the negation of the given comparison.
+NEGATED: typing.Mapping[type[dsl.Predicate], type[dsl.Predicate]] = {
+    function.Equal: function.NotEqual,
+    function.NotEqual: function.Equal,
+    function.LessThan: function.GreaterEqual,
+    function.LessEqual: function.GreaterThan,
+    function.GreaterThan: function.LessEqual,
+    function.GreaterEqual: function.LessThan,
+}
+
+#: Test whether a comparison can hold for some value within the given (low, high) bounds.
+OVERLAP: typing.Mapping[type[dsl.Predicate], typing.Callable[[typing.Any, typing.Any, typing.Any], bool]] = {
+    function.Equal: lambda low, high, value: low <= value <= high,
+    function.NotEqual: lambda low, high, value: not low == high == value,
+    function.LessThan: lambda low, high, value: low < value,
+    function.LessEqual: lambda low, high, value: low <= value,
+    function.GreaterThan: lambda low, high, value: high > value,
+    function.GreaterEqual: lambda low, high, value: high >= value,
+}
+
+
+class Untranslatable(ValueError):
+    """Error indicating the predicate (or its part) can't be translated."""
+
+
+def operands(comparison: dsl.Predicate) -> tuple[type[dsl.Predicate], dsl.Column, typing.Any]:
+    """Normalize the simple *column-to-literal* comparison to its ``(operator, column, value)`` form.
+
+    Args:
+        comparison: Comparison predicate to be dissected.
+
+    Returns:
+        Tuple of the comparison operator type, the column and the literal value.
+
+    Raises:
+        Untranslatable: If the predicate is not a simple comparison between a column and a literal.
+    """
+    kind = type(comparison)
+    if kind not in COMPARISON:
+        raise Untranslatable(f'Unsupported comparison: {comparison}')
+    left, right = comparison.left, comparison.right
+    if isinstance(left, dsl.Literal) and isinstance(right, dsl.Column):
+        kind, left, right = FLIPPED[kind], right, left
+    if not isinstance(left, dsl.Column) or not isinstance(right, dsl.Literal):
+        raise Untranslatable(f'Not a column-to-literal comparison: {comparison}')
+    return kind, left, right.value
+
+
+def members(predicate: dsl.Predicate) -> tuple[dsl.Column, list[typing.Any]]:
+    """Dissect an *IN*-like predicate represented as an *OR* chain of equalities on a single column.
+
+    Args:
+        predicate: Predicate to be dissected.
+
+    Returns:
+        Tuple of the column and the list of its accepted values.
+
+    Raises:
+        Untranslatable: If the predicate is not an *OR* chain of equalities on a single column.
+    """
+    if isinstance(predicate, function.Or):
+        lcol, lvals = members(predicate.left)
+        rcol, rvals = members(predicate.right)
+        if lcol.name != rcol.name:
+            raise Untranslatable(f'Not a single column membership: {predicate}')
+        return lcol, lvals + rvals
+    if not isinstance(predicate, function.Equal):
+        raise Untranslatable(f'Not a membership: {predicate}')
+    _, column, value = operands(predicate)
+    return column, [value]
+
+
+def arrow(
+    predicate: dsl.Predicate, fields: typing.Collection[str], exact: bool = False
+) -> typing.Optional[compute.Expression]:
+    """Translate the (subset of) DSL predicate to a PyArrow filter expression.
+
+    Supported are the simple column-to-literal comparisons, null checks and their logical
+    combinations. Unless requested to be ``exact``, any untranslatable part of a conjunction is
+    simply dropped making the result a (potentially) relaxed version of the original predicate -
+    sufficient for push-down filtering as the original predicate is expected to be applied again
+    downstream.
+
+    Args:
+        predicate: DSL predicate to be translated.
+        fields: Names of the fields available for filtering.
+        exact: Whether to fail rather than relax the predicate if it can't be fully translated.
+
+    Returns:
+        Arrow filter expression or None if no restriction could be derived.
+
+    Raises:
+        Untranslatable: If ``exact`` and the predicate can't be fully translated.
+    """
+
+    def field(column: dsl.Column) -> compute.Expression:
+        if column.name not in fields:
+            raise Untranslatable(f'Unknown field: {column.name}')
+        return compute.field(column.name)
+
+    try:
+        if isinstance(predicate, function.And):
+            left = arrow(predicate.left, fields, exact)
+            right = arrow(predicate.right, fields, exact)
+            if left is None or right is None:
+                return left if right is None else right
+            return left & right
+        if isinstance(predicate, function.Or):
+            try:
+                column, values = members(predicate)
+                return field(column).isin(values)
+            except Untranslatable:
+                pass
+            left = arrow(predicate.left, fields, exact)
+            right = arrow(predicate.right, fields, exact)
+            if left is None or right is None:
+                return None
+            return left | right
+        if isinstance(predicate, function.Not):
+            return ~arrow(predicate.operand, fields, exact=True)
+        if isinstance(predicate, (function.IsNull, function.NotNull)):
+            if not isinstance(predicate.operand, dsl.Column):
+                raise Untranslatable(f'Not a column null check: {predicate}')
+            column = field(predicate.operand)
+            return column.is_null() if isinstance(predicate, function.IsNull) else column.is_valid()
+        kind, column, value = operands(predicate)
+        return COMPARISON[kind](field(column), value)
+    except Untranslatable:
+        if exact:
+            raise
+        return None
+
+
+def satisfiable(
+    predicate: dsl.Predicate, stats: typing.Mapping[str, tuple[typing.Any, typing.Any]], negated: bool = False
+) -> bool:
+    """Check whether the predicate can possibly be satisfied by any row of a dataset with the given
+    min/max column statistics.
+
+    The evaluation is conservative - unless proven otherwise, the predicate is considered
+    satisfiable.
+
+    Args:
+        predicate: DSL predicate to be evaluated.
+        stats: Mapping of column names to their ``(min, max)`` values.
+        negated: Whether to evaluate the negation of the predicate.
+
+    Returns:
+        False if no row can match the predicate.
+    """
+    if isinstance(predicate, (function.And, function.Or)):
+        left = satisfiable(predicate.left, stats, negated)
+        right = satisfiable(predicate.right, stats, negated)
+        return (left and right) if isinstance(predicate, function.And) != negated else (left or right)
+    if isinstance(predicate, function.Not):
+        return satisfiable(predicate.operand, stats, not negated)
+    try:
+        kind, column, value = operands(predicate)
+    except Untranslatable:
+        return True
+    if negated:
+        kind = NEGATED[kind]
+    low, high = stats.get(column.name, (None, None))
+    if low is None or high is None or value is None:
+        return True
+    try:
+        return OVERLAP[kind](low, high, value)
+    except TypeError:  # incomparable types
+        return True
@@ -18,50 +18,645 @@
 Openlake providers.
 """
 import abc
+import asyncio
+import collections
+import copy
+import functools
+import hashlib
+import logging
 import pathlib
+import pkgutil
+import re
 import types
 import typing
+from concurrent import futures
 
 import forml
 import pandas
+import pyarrow
+from forml.io import dsl
 from forml.provider.feed import lazy
 
-from openlake import cache
+import openlake
+from openlake import cache, metrics
+from openlake import predicate as predmod
+
+LOGGER = logging.getLogger(__name__)
 
 
 class Partition(abc.ABC):
     """Provider specific representation of a data partition."""
 
     def __hash__(self):
-        return hash(self.key)
+        return hash((self.key, self.fragment))
 
     def __eq__(self, other):
-        return isinstance(other, self.__class__) and other.key == self.key
+        return isinstance(other, self.__class__) and other.key == self.key and other.fragment == self.fragment
 
     @property
     @abc.abstractmethod
     def key(self) -> str:
         """Get the partition identifier key."""
 
+    @property
+    def fragment(self) -> typing.Optional[str]:
+        """Get the optional identifier of a fragment within the (hive-style) partition cache entry."""
+        return None
+
+
+class Decision(collections.namedtuple('Decision', 'partition, selected, reason')):
+    """Partition pruning decision."""
+
+    partition: Partition
+    selected: bool
+    reason: str
+
+    def __str__(self):
+        fragment = f'[{self.partition.fragment}]' if self.partition.fragment else ''
+        return f'{"+" if self.selected else "-"} {self.partition.key}{fragment}: {self.reason}'
+
+
+class Plan(tuple):
+    """Partition pruning plan explaining why each of the partitions was selected or pruned."""
+
+    def __new__(cls, decisions: typing.Iterable[Decision]):
+        return super().__new__(cls, decisions)
+
+    def __str__(self):
+        return '\n'.join(str(d) for d in self)
+
+    @property
+    def partitions(self) -> tuple[Partition]:
+        """The selected partitions."""
+        return tuple(d.partition for d in self if d.selected)
+
 
 PayloadT = typing.TypeVar('PayloadT')
 PartitionT = typing.TypeVar('PartitionT', bound=Partition)
+ArrowT = typing.TypeVar('ArrowT', pyarrow.Table, pyarrow.RecordBatch)
 
 
 class Origin(typing.Generic[PartitionT, PayloadT], lazy.Origin[PartitionT], metaclass=abc.ABCMeta):
     """Abstract base class for OpenLake data-source integrations."""
 
+    #: Storage format of the cache entries (``cache.ARROW`` trades disk space for zero-copy reads of hot datasets).
+    CACHE_FORMAT: cache.Format = cache.PARQUET
+    CACHE_LAYOUT: typing.Optional[cache.Hive] = None
+    #: Whether to store the cached data using compact types (narrowed integers, dictionary encoded strings).
+    CACHE_COMPACTION: bool = True
+    #: In-process memory tier in front of the persistent cache (None to disable).
+    CACHE_MEMORY: typing.Optional[cache.Memory] = cache.MEMORY
+    CONCURRENCY: int = 4
+    #: Options of the Arrow to Pandas conversion (e.g. ``types_mapper=pandas.ArrowDtype``) - the tables can be shared
+    #: via the memory cache so the conversion must not be destructive.
+    TO_PANDAS: typing.Mapping[str, typing.Any] = types.MappingProxyType({'split_blocks': True})
+
+    #: Names of the class attributes affecting the cached content (collected across the class hierarchy).
+    VERSIONED: tuple[str] = ('ARROW', 'CACHE_LAYOUT', 'CACHE_COMPACTION')
+
+    ARROW: typing.Mapping[dsl.Any, pyarrow.DataType] = {
+        dsl.Boolean(): pyarrow.bool_(),
+        dsl.Integer(): pyarrow.int64(),
+        dsl.Float(): pyarrow.float64(),
+        dsl.String(): pyarrow.string(),
+        dsl.Date(): pyarrow.timestamp('ns'),
+        dsl.Timestamp(): pyarrow.timestamp('ns'),
+    }
+
+    _sample: typing.Optional[cache.Sample] = None
+
+    def sampled(self, sample: typing.Optional[cache.Sample]) -> 'Origin':
+        """Get a copy of this origin loading just the given sample of its data.
+
+        Args:
+            sample: Sampling specification (None for the full data).
+
+        Returns:
+            Sampled origin instance.
+        """
+        origin = copy.copy(self)
+        origin._sample = sample  # pylint: disable=protected-access
+        return origin
+
     @property
     def _cachedir(self) -> pathlib.Path:
         """Root directory for this origin cache."""
         return cache.DIR / self.__class__.__module__.rsplit('.', 1)[-1]
 
-    def load(self, partition: typing.Optional[lazy.Partition]) -> pandas.DataFrame:
-        """Caching loader."""
+    @property
+    def _schema(self) -> pyarrow.Schema:
+        """Arrow schema of the source features."""
+        features = self.source.features  # pylint: disable=not-an-iterable
+        return pyarrow.schema((f.name, self.ARROW[f.kind]) for f in features if f.kind in self.ARROW)
+
+    @property
+    def _fingerprint(self) -> str:
+        """Version of the cached content derived from the origin implementation and its settings."""
+        cls = self.__class__
+        versioned = sorted({a for c in cls.__mro__ for a in vars(c).get('VERSIONED', ())})
+        signature = repr(
+            (
+                f'{cls.__module__}.{cls.__qualname__}',
+                openlake.__version__,
+                str(self._schema),
+                [(a, getattr(self, a, None)) for a in versioned],
+            )
+        )
+        # dropping the memory addresses of any callables
+        return hashlib.sha256(re.sub(r' at 0x[0-9a-f]+', '', signature).encode()).hexdigest()[:16]
+
+    def _cachekey(self, partition: typing.Optional[lazy.Partition]) -> str:
+        """Cache entry key of the given partition."""
         key = self.key
         if partition:
             key += f':{partition.key}'
-        return cache.dataframe(key, lambda: self.parse(partition, self.fetch(partition)), self._cachedir)
+        return key
+
+    def inventory(self) -> typing.Sequence[typing.Optional[PartitionT]]:
+        """Get all the partitions of this origin (to be cached when warming up).
+
+        Returns:
+            Sequence of the origin partitions.
+        """
+        return list(self.partitions(self.source.features, None)) or [None]
+
+    def warm(
+        self,
+        partitions: typing.Optional[typing.Iterable[typing.Optional[PartitionT]]] = None,
+        concurrency: typing.Optional[int] = None,
+    ) -> list[typing.Optional[PartitionT]]:
+        """Populate the cache with the given (or all) partitions without actually loading their data.
+
+        Args:
+            partitions: Partitions to be cached (all of them if not specified).
+            concurrency: Maximum number of the partitions to be fetched and parsed in parallel.
+
+        Returns:
+            List of the cached partitions.
+        """
+        partitions = list(self.inventory() if partitions is None else partitions)
+        self._load_many(partitions, (), None, concurrency)  # no columns to read back
+        return partitions
+
+    def cachefiles(self, partitions: typing.Iterable[typing.Optional[PartitionT]]) -> list[pathlib.Path]:
+        """Get the cache files of the given partitions (populating any missing cache entries first).
+
+        Args:
+            partitions: Partitions to get the files for.
+
+        Returns:
+            List of the cache files holding the partitions data.
+        """
+        partitions = list(partitions) or [None]
+        entries = {p: self._locate(p) for p in partitions}
+        if missing := [
+            p
+            for p, (k, l, _) in entries.items()
+            if not cache.exists(k, self._cachedir, l, self.CACHE_FORMAT, self._fingerprint)
+        ]:
+            self.warm(missing)
+        files = []
+        for key, layout, fragment in dict.fromkeys(entries.values()):
+            stored = self.CACHE_FORMAT.path(key, self._cachedir)
+            cache.touch(stored)
+            files.extend(cache.files(stored, layout, fragment))
+        return files
+
+    def version(self, partitions: typing.Iterable[typing.Optional[PartitionT]]) -> str:
+        """Get the version of the cached content of the given partitions.
+
+        The version changes whenever any of the underlying cache entries gets (re)built so it can
+        be used for invalidating any results derived from the content.
+
+        Args:
+            partitions: Partitions to get the version for.
+
+        Returns:
+            Version digest.
+        """
+        keys = sorted({self._locate(p)[0] for p in list(partitions) or [None]})
+        created = [cache.describe(self.CACHE_FORMAT.path(k, self._cachedir)).get('created') for k in keys]
+        return hashlib.sha256(repr((self._fingerprint, keys, created)).encode()).hexdigest()[:16]
+
+    def _locate(
+        self, partition: typing.Optional[PartitionT]
+    ) -> tuple[str, typing.Optional[cache.Hive], typing.Optional[str]]:
+        """Get the cache key, layout and fragment of the partition entry (or its sample)."""
+        key, fragment = self._cachekey(partition), partition.fragment if partition else None
+        if self._sample is not None:  # fragments share the sample of the entire entry
+            return self._sample.key(key), None, None
+        return key, self.CACHE_LAYOUT, fragment
+
+    def cached(self) -> list[cache.Entry]:
+        """List the existing cache entries (including their samples) of this origin.
+
+        Returns:
+            Cache entries ordered from the least recently used.
+        """
+        pattern = re.compile(rf'{re.escape(self.key)}([:~.]|$)')
+        return [e for e in cache.stats(self._cachedir) if pattern.match(e.path.relative_to(self._cachedir).parts[0])]
+
+    def _prune(self, partition: PartitionT, predicate: typing.Optional[dsl.Predicate]) -> list[Decision]:
+        """Evaluate the predicate against the value ranges of the partition (or its hive-style
+        fragments) collected when building its cache entry.
+
+        Fragments are only applicable to origins using the hive-style ``CACHE_LAYOUT`` with partitions
+        implemented as named tuples having a ``fragment`` field. Unless cached, the partition is always
+        selected. If nothing can match, the first candidate is still selected to provide the schema.
+
+        Args:
+            partition: Partition to be evaluated.
+            predicate: Optional push-down row filter.
+
+        Returns:
+            Pruning decisions about the partition (or its fragments).
+        """
+        key = self._cachekey(partition)
+        if not cache.exists(key, self._cachedir, self.CACHE_LAYOUT, self.CACHE_FORMAT, self._fingerprint):
+            return [Decision(partition, True, 'not cached (no statistics)')]
+        stored = self.CACHE_FORMAT.path(key, self._cachedir)
+        if self.CACHE_LAYOUT:
+            candidates = [
+                (partition._replace(fragment=r['fragment']), cache.Stats.from_record(r))
+                for r in cache.manifest(stored).to_dict('records')
+            ]
+        else:
+            candidates = [(partition, cache.Stats.from_record(cache.describe(stored)['stats']))]
+        if predicate is None:
+            return [Decision(p, True, 'no predicate') for p, _ in candidates]
+        columns = {c.name for c in dsl.Column.dissect(predicate)}
+        decisions = []
+        for candidate, stats in candidates:
+            ranges = ', '.join(f'{c} in [{s[0]}, {s[1]}]' for c, s in stats.items() if c in columns) or 'no ranges'
+            if predmod.satisfiable(predicate, stats):
+                decisions.append(Decision(candidate, True, f'{ranges} may satisfy {predicate}'))
+            else:
+                decisions.append(Decision(candidate, False, f'{ranges} can not satisfy {predicate}'))
+        if not any(d.selected for d in decisions):
+            decisions[0] = decisions[0]._replace(selected=True, reason=f'{decisions[0].reason} (kept for the schema)')
+        return decisions
+
+    def __call__(
+        self,
+        partitions: typing.Iterable[lazy.Partition],
+        columns: typing.Optional[typing.Collection[dsl.Column]] = None,
+        predicate: typing.Optional[dsl.Predicate] = None,
+    ) -> pandas.DataFrame:
+        """Load the given partitions projecting just the selected columns and pushing down the predicate.
+
+        Args:
+            partitions: Partitions to load.
+            columns: Optional subset of columns to be loaded (more can be returned).
+            predicate: Optional push-down row filter (mismatching rows can still be returned).
+
+        Returns:
+            Data in Pandas DataFrame format.
+        """
+        frame = self.table(partitions, columns, predicate).to_pandas(**self.TO_PANDAS)  # already conformed
+        expected = {f.name for f in self.source.features}
+        assert (actual := set(frame.columns)).issubset(expected), f'Unexpected column(s): {actual.difference(expected)}'
+        return frame
+
+    def table(
+        self,
+        partitions: typing.Iterable[lazy.Partition],
+        columns: typing.Optional[typing.Collection[dsl.Column]] = None,
+        predicate: typing.Optional[dsl.Predicate] = None,
+    ) -> pyarrow.Table:
+        """Arrow-native version of the partitions loader.
+
+        The partition tables are cast from their compact storage types to the source schema and
+        concatenated without copying - only columns with types inconsistent across the partitions
+        get cast once more.
+
+        Args:
+            partitions: Partitions to load.
+            columns: Optional subset of columns to be loaded (more can be returned).
+            predicate: Optional push-down row filter (mismatching rows can still be returned).
+
+        Returns:
+            Data in Arrow table format.
+        """
+        LOGGER.info('Loading %s', self.key)
+        tables = [self._conform(t) for t in self._load_many(partitions or [None], columns, predicate)]
+        expected = self._schema
+
+        def unify(field: pyarrow.Field) -> pyarrow.Field:
+            """Get the common field for all the tables."""
+            if field.name not in expected.names:
+                return field
+            actual = {t.schema.field(field.name).type for t in tables if field.name in t.schema.names}
+            return field if len(actual) == 1 else expected.field(field.name)
+
+        schema = pyarrow.schema(unify(f) for f in tables[0].schema)
+        return pyarrow.concat_tables(t.cast(schema, safe=False) for t in tables)
+
+    def load(
+        self,
+        partition: typing.Optional[lazy.Partition],
+        columns: typing.Optional[typing.Collection[dsl.Column]] = None,
+        predicate: typing.Optional[dsl.Predicate] = None,
+    ) -> pandas.DataFrame:
+        """Caching loader.
+
+        Args:
+            partition: Partition to load.
+            columns: Optional subset of columns to be loaded (more can be returned).
+            predicate: Optional push-down row filter (mismatching rows can still be returned).
+
+        Returns:
+            Data in Pandas DataFrame format.
+        """
+        return self._pandas(self._load(partition, columns, predicate, functools.partial(self.fetch, partition)))
+
+    def load_many(
+        self,
+        partitions: typing.Iterable[typing.Optional[lazy.Partition]],
+        columns: typing.Optional[typing.Collection[dsl.Column]] = None,
+        predicate: typing.Optional[dsl.Predicate] = None,
+        concurrency: typing.Optional[int] = None,
+    ) -> list[pandas.DataFrame]:
+        """Caching loader of multiple partitions.
+
+        Partitions missing in the cache are fetched concurrently (within a thread pool limited by
+        the given concurrency) while the fetched payloads are being parsed and cached by another
+        pool of the same size as soon as they become available.
+
+        Args:
+            partitions: Partitions to load.
+            columns: Optional subset of columns to be loaded (more can be returned).
+            predicate: Optional push-down row filter (mismatching rows can still be returned).
+            concurrency: Maximum number of partitions being fetched (and parsed) at the same time
+                         (defaults to the ``CONCURRENCY`` attribute).
+
+        Returns:
+            List of data frames in the order of the requested partitions.
+        """
+        return [self._pandas(t) for t in self._load_many(partitions, columns, predicate, concurrency)]
+
+    def iter_batches(
+        self,
+        partition: typing.Optional[lazy.Partition] = None,
+        columns: typing.Optional[typing.Collection[dsl.Column]] = None,
+        predicate: typing.Optional[dsl.Predicate] = None,
+        batch_size: int = 1 << 16,
+    ) -> typing.Iterator[pandas.DataFrame]:
+        """Out-of-core loader streaming the partition in batches of bounded size.
+
+        Unlike the :meth:`load` method, the partition is never materialized as a whole - it is
+        streamed from the cache or, in case of a cache miss, directly from the parser while being
+        cached in the background (the cache entry is only published once the iteration completes).
+        The batches are cast to the source schema so that their types are the same regardless of
+        the cache state.
+
+        Args:
+            partition: Partition to load.
+            columns: Optional subset of columns to be loaded (more can be returned).
+            predicate: Optional push-down row filter (mismatching rows can still be returned).
+            batch_size: Maximum number of rows per batch.
+
+        Returns:
+            Iterator of data frames.
+        """
+        if self._sample is not None:  # samples are small enough to be loaded as a whole
+            batches = self._load(partition, columns, predicate, functools.partial(self.fetch, partition)).to_batches(
+                batch_size
+            )
+        else:
+            key = self._cachekey(partition)
+
+            def load() -> typing.Iterable[pandas.DataFrame]:
+                """Fetch and stream the partition content."""
+                with metrics.stage('fetch', key):
+                    payload = self.fetch(partition)
+                return self.stream(partition, payload)
+
+            batches = cache.batches(
+                key,
+                load,
+                self._cachedir,
+                {c.name for c in columns} if columns is not None else None,
+                predicate,
+                self._schema,
+                self.CACHE_LAYOUT,
+                partition.fragment if partition else None,
+                self.CACHE_FORMAT,
+                self.CACHE_COMPACTION,
+                self._fingerprint,
+                batch_size,
+                self.CACHE_MEMORY,
+            )
+        for batch in batches:
+            yield self._pandas(batch)
+
+    def _conformed(self, schema: pyarrow.Schema) -> pyarrow.Schema:
+        """Get the source schema matching the given (possibly compacted) one.
+
+        Compaction is just a storage optimization so the narrowed integers and dictionary encoded
+        strings are cast back to their source types (64-bit integers keep their signedness).
+        """
+        expected = self._schema
+
+        def conform(field: pyarrow.Field) -> pyarrow.Field:
+            """Get the source field matching the given stored field."""
+            if field.name not in expected.names:
+                return field
+            if pyarrow.types.is_integer(field.type) and field.type.bit_width == 64:
+                return field
+            return expected.field(field.name)
+
+        return pyarrow.schema(conform(f) for f in schema)
+
+    def _conform(self, data: ArrowT) -> ArrowT:
+        """Cast the (possibly compacted) table or batch to the source schema."""
+        schema = self._conformed(data.schema)
+        if schema == data.schema:
+            return data
+        if isinstance(data, pyarrow.Table):
+            return data.cast(schema, safe=False)
+        return pyarrow.RecordBatch.from_arrays(
+            [c.cast(f.type, safe=False) for c, f in zip(data.columns, schema)], schema=schema
+        )
+
+    def _pandas(self, data: ArrowT) -> pandas.DataFrame:
+        """Convert the (possibly compacted) table or batch to a Pandas DataFrame in the source schema."""
+        return self._conform(data).to_pandas(**self.TO_PANDAS)
+
+    async def aload(
+        self,
+        partition: typing.Optional[lazy.Partition],
+        columns: typing.Optional[typing.Collection[dsl.Column]] = None,
+        predicate: typing.Optional[dsl.Predicate] = None,
+    ) -> pandas.DataFrame:
+        """Asynchronous version of the :meth:`load` method.
+
+        Args:
+            partition: Partition to load.
+            columns: Optional subset of columns to be loaded (more can be returned).
+            predicate: Optional push-down row filter (mismatching rows can still be returned).
+
+        Returns:
+            Data in Pandas DataFrame format.
+        """
+        (frame,) = await self.aload_many([partition], columns, predicate)
+        return frame
+
+    async def aload_many(
+        self,
+        partitions: typing.Iterable[typing.Optional[lazy.Partition]],
+        columns: typing.Optional[typing.Collection[dsl.Column]] = None,
+        predicate: typing.Optional[dsl.Predicate] = None,
+        concurrency: typing.Optional[int] = None,
+    ) -> list[pandas.DataFrame]:
+        """Asynchronous version of the :meth:`load_many` method.
+
+        Partitions missing in the cache are fetched using the :meth:`afetch` method (once per cache
+        entry) while the CPU-bound parsing, caching and reading runs in the default executor.
+
+        Args:
+            partitions: Partitions to load.
+            columns: Optional subset of columns to be loaded (more can be returned).
+            predicate: Optional push-down row filter (mismatching rows can still be returned).
+            concurrency: Maximum number of the cache entries loaded at once (defaults to ``CONCURRENCY``).
+
+        Returns:
+            List of data frames in the order of the requested partitions.
+        """
+        partitions = list(partitions)
+        entries: dict[str, list[typing.Optional[lazy.Partition]]] = collections.defaultdict(list)
+        for partition in partitions:  # fragments of the same cache entry must not be filled concurrently
+            entries[self._cachekey(partition)].append(partition)
+        semaphore = asyncio.Semaphore(concurrency or self.CONCURRENCY)
+
+        async def load(key: str, group: typing.Sequence[typing.Optional[lazy.Partition]]) -> list[pandas.DataFrame]:
+            """Load the group of partitions sharing the same cache entry."""
+            async with semaphore:
+                if self._cached(key):
+                    return [await self._aload(p, columns, predicate, functools.partial(self.fetch, p)) for p in group]
+                payload, consumed = await self.afetch(group[0]), False
+
+                def fetch() -> PayloadT:
+                    """Provide the prefetched payload."""
+                    nonlocal consumed
+                    consumed = True
+                    return payload
+
+                try:
+                    return [await self._aload(p, columns, predicate, fetch) for p in group]
+                finally:
+                    if not consumed and callable(close := getattr(payload, 'close', None)):
+                        close()  # cache entry filled concurrently
+
+        loaded = await asyncio.gather(*(load(k, g) for k, g in entries.items()))
+        frames = {p: f for g, t in zip(entries.values(), loaded) for p, f in zip(g, t)}
+        return [frames[p] for p in partitions]
+
+    async def _aload(
+        self,
+        partition: typing.Optional[lazy.Partition],
+        columns: typing.Optional[typing.Collection[dsl.Column]],
+        predicate: typing.Optional[dsl.Predicate],
+        fetch: typing.Callable[[], PayloadT],
+    ) -> pandas.DataFrame:
+        """Run the caching loader in the default executor."""
+        return self._pandas(await asyncio.to_thread(self._load, partition, columns, predicate, fetch))
+
+    def _load_many(
+        self,
+        partitions: typing.Iterable[typing.Optional[lazy.Partition]],
+        columns: typing.Optional[typing.Collection[dsl.Column]] = None,
+        predicate: typing.Optional[dsl.Predicate] = None,
+        concurrency: typing.Optional[int] = None,
+    ) -> list[pyarrow.Table]:
+        """Arrow-native version of the ``load_many`` method."""
+        partitions = list(partitions)
+        concurrency = concurrency or self.CONCURRENCY
+        if len(partitions) < 2 or concurrency < 2:
+            return [self._load(p, columns, predicate, functools.partial(self.fetch, p)) for p in partitions]
+        entries: dict[str, list[typing.Optional[lazy.Partition]]] = collections.defaultdict(list)
+        for partition in partitions:  # fragments of the same cache entry must not be filled concurrently
+            entries[self._cachekey(partition)].append(partition)
+
+        def load(
+            group: typing.Sequence[typing.Optional[lazy.Partition]], payload: typing.Optional[futures.Future]
+        ) -> list[pyarrow.Table]:
+            """Load the group of partitions sharing the same cache entry (using the prefetched payload)."""
+            if not payload:
+                return [self._load(p, columns, predicate, functools.partial(self.fetch, p)) for p in group]
+            consumed = False
+
+            def fetch() -> PayloadT:
+                """Provide the prefetched payload."""
+                nonlocal consumed
+                consumed = True
+                return payload.result()
+
+            try:
+                return [self._load(p, columns, predicate, fetch) for p in group]
+            finally:
+                if (
+                    not consumed
+                    and not payload.exception()
+                    and callable(close := getattr(payload.result(), 'close', None))
+                ):
+                    close()  # cache entry filled concurrently
+
+        with futures.ThreadPoolExecutor(concurrency, thread_name_prefix='openlake-fetch') as fetchers:
+            with futures.ThreadPoolExecutor(concurrency, thread_name_prefix='openlake-parse') as parsers:
+                loading = []
+                for key, group in entries.items():
+                    payload = None
+                    if not self._cached(key):
+                        payload = fetchers.submit(self.fetch, group[0])
+                    loading.append((group, parsers.submit(load, group, payload)))
+                loaded = {p: f for g, t in loading for p, f in zip(g, t.result())}
+        return [loaded[p] for p in partitions]
+
+    def _cached(self, key: str) -> bool:
+        """Check the given cache entry (or its requested sample) exists so it needs no fetching."""
+        if cache.exists(key, self._cachedir, self.CACHE_LAYOUT, self.CACHE_FORMAT, self._fingerprint):
+            return True
+        return self._sample is not None and cache.exists(
+            self._sample.key(key), self._cachedir, None, self.CACHE_FORMAT, self._fingerprint
+        )
+
+    def _load(
+        self,
+        partition: typing.Optional[lazy.Partition],
+        columns: typing.Optional[typing.Collection[dsl.Column]],
+        predicate: typing.Optional[dsl.Predicate],
+        fetch: typing.Callable[[], PayloadT],
+    ) -> pyarrow.Table:
+        """Caching loader using the given fetch callback.
+
+        The table is returned in its (possibly compacted) storage types so that hits of the memory
+        tiers share the cached buffers - it gets cast to the source schema only by its consumers.
+        """
+        if columns is not None:
+            columns = {c.name for c in columns}
+        key = self._cachekey(partition)
+
+        def load() -> typing.Iterable[pandas.DataFrame]:
+            """Fetch and stream the partition content."""
+            with metrics.stage('fetch', key):
+                payload = fetch()
+            return self.stream(partition, payload)
+
+        return cache.table(
+            key,
+            load,
+            self._cachedir,
+            columns,
+            predicate,
+            self._schema,
+            self.CACHE_LAYOUT,
+            partition.fragment if partition else None,
+            self.CACHE_FORMAT,
+            self.CACHE_MEMORY,
+            self.CACHE_COMPACTION,
+            self._fingerprint,
+            self._sample,
+        )
 
     @abc.abstractmethod
     def fetch(self, partition: typing.Optional[lazy.Partition]) -> PayloadT:
@@ -74,8 +669,24 @@ class Origin(typing.Generic[PartitionT, PayloadT], lazy.Origin[PartitionT], meta
             Data content object in a generic PayloadT to be parsed.
         """
 
+    async def afetch(self, partition: typing.Optional[lazy.Partition]) -> PayloadT:
+        """Asynchronous version of the :meth:`fetch` method.
+
+        The default implementation offloads the blocking fetch to a thread - fetchers capable of
+        native asynchronous I/O should override it.
+
+        Args:
+            partition: Partition identifiers to be fetched.
+
+        Returns:
+            Data content object in a generic PayloadT to be parsed.
+        """
+        return await asyncio.to_thread(self.fetch, partition)
+
     @abc.abstractmethod
-    def parse(self, partition: typing.Optional[lazy.Partition], content: PayloadT) -> pandas.DataFrame:
+    def parse(
+        self, partition: typing.Optional[lazy.Partition], content: PayloadT
+    ) -> typing.Union[pandas.DataFrame, pyarrow.Table]:
         """Parse the origin dataset.
 
         Args:
@@ -83,9 +694,103 @@ class Origin(typing.Generic[PartitionT, PayloadT], lazy.Origin[PartitionT], meta
             content: The data content object as returned by `.fetch()`.
 
         Returns:
-            Data in Pandas DataFrame format.
+            Data in Pandas DataFrame (or Arrow table) format.
         """
 
+    def stream(
+        self, partition: typing.Optional[lazy.Partition], content: PayloadT
+    ) -> typing.Iterable[typing.Union[pandas.DataFrame, pyarrow.Table]]:
+        """Parse the origin dataset as a stream of chunks.
+
+        Unless overridden, the entire dataset is parsed in a single chunk.
+
+        Args:
+            partition: Partition identifier representing the content.
+            content: The data content object as returned by `.fetch()`.
+
+        Returns:
+            Iterable of data chunks in Pandas DataFrame (or Arrow table) format.
+        """
+        yield self.parse(partition, content)
+
+
+class Lazy(lazy.Origin):
+    """Proxy of an origin referenced by its import path to be imported only once actually used.
+
+    Only the (lightweight) source schema gets imported upfront so that the proxy can be registered
+    with a feed - the origin module (with all of its dependencies) is imported upon the first
+    access to any of the origin attributes (see :func:`resolve`).
+
+    Args:
+        origin: Import path of the origin class (``<module>:<qualified.ClassName>``).
+        source: Import path of the origin source schema.
+    """
+
+    def __init__(self, origin: str, source: str):
+        self._origin: str = origin
+        self._source: str = source
+        self._sample: typing.Optional[cache.Sample] = None
+
+    def __repr__(self):
+        return f'Lazy({self._origin})'
+
+    def __getattr__(self, item: str):
+        if item.startswith('_'):
+            raise AttributeError(item)
+        return getattr(self.origin, item)
+
+    @property
+    def name(self) -> str:
+        """Name of the origin class."""
+        return self._origin.rsplit(':', 1)[-1].rsplit('.', 1)[-1]
+
+    @functools.cached_property
+    def source(self) -> dsl.Source:
+        return pkgutil.resolve_name(self._source)
+
+    @functools.cached_property
+    def origin(self) -> lazy.Origin:
+        """The actual origin instance (imported upon the first access)."""
+        LOGGER.debug('Importing origin %s', self._origin)
+        origin = pkgutil.resolve_name(self._origin)()
+        if self._sample is not None:
+            origin = origin.sampled(self._sample)
+        assert origin.source == self.source and origin.key == self.key, f'Origin {self._origin} source mismatch'
+        return origin
+
+    def sampled(self, sample: typing.Optional[cache.Sample]) -> 'Lazy':
+        """Get a copy of this proxy resolving to the origin sampled using the given sample.
+
+        Args:
+            sample: Sampling specification (None for the full data).
+
+        Returns:
+            Sampled origin proxy.
+        """
+        proxy = Lazy(self._origin, self._source)
+        proxy._sample = sample  # pylint: disable=protected-access
+        return proxy
+
+    def load(self, partition: typing.Optional[lazy.Partition]) -> pandas.DataFrame:
+        return self.origin.load(partition)
+
+    def partitions(
+        self, columns: typing.Collection[dsl.Column], predicate: typing.Optional[dsl.Predicate]
+    ) -> typing.Iterable[lazy.Partition]:
+        return self.origin.partitions(columns, predicate)
+
+
+def resolve(origin: lazy.Origin) -> lazy.Origin:
+    """Get the actual origin behind the (potentially lazy) origin reference.
+
+    Args:
+        origin: Origin or its lazy proxy.
+
+    Returns:
+        The actual origin instance.
+    """
+    return origin.origin if isinstance(origin, Lazy) else origin
+
 
 class Unavailable(types.ModuleType):
     """Placeholder for missing provider functionality that raises upon access."""
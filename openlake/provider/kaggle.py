@@ -21,16 +21,14 @@ import abc
 import collections
 import functools
 import logging
-import os
 import pathlib
 import typing
 
 import forml
-from forml import setup
 from forml.io import dsl
 from openschema import kaggle as schema
 
-from openlake import fetcher, parser, provider
+from openlake import cache, fetcher, parser, provider
 
 try:
     import kaggle
@@ -41,44 +39,128 @@ except Exception as err:  # pylint: disable=broad-except
 LOGGER = logging.getLogger(__name__)
 
 
-class Partition(provider.Partition, collections.namedtuple('Partition', 'columns, filename')):
+class Partition(provider.Partition, collections.namedtuple('Partition', 'columns, filename, fragment')):
     """Kaggle data partition representation."""
 
     columns: tuple[dsl.Column]
     filename: str
+    fragment: typing.Optional[str]
 
-    def __new__(cls, columns: typing.Sequence[dsl.Column], filename: str):
-        return super().__new__(cls, tuple(columns), filename)
+    def __new__(cls, columns: typing.Sequence[dsl.Column], filename: str, fragment: typing.Optional[str] = None):
+        return super().__new__(cls, tuple(columns), filename, fragment)
 
     @functools.cached_property
     def key(self) -> str:
         return pathlib.Path(self.filename).with_suffix('').name
 
+    @property
+    def fragment(self) -> typing.Optional[str]:
+        return self[2]
+
 
 class File(fetcher.Mixin[Partition, typing.IO], metaclass=abc.ABCMeta):
     """Kaggle file provider."""
 
     COMPETITION: str = abc.abstractmethod
+    DOWNLOAD_CHUNKSIZE: int = 1 << 20
     PARTITIONS: tuple[Partition] = abc.abstractmethod
 
     def partitions(
         self, columns: typing.Collection[dsl.Column], predicate: typing.Optional[dsl.Predicate]
     ) -> typing.Iterable[Partition]:
+        return self.explain(columns, predicate).partitions
+
+    def explain(
+        self, columns: typing.Collection[dsl.Column], predicate: typing.Optional[dsl.Predicate]
+    ) -> provider.Plan:
+        """Get the plan of the partitions selection explaining why each of them was selected or pruned.
+
+        The first partition having all the required columns gets selected and its hive-style
+        fragments (if cached) pruned according to their value ranges.
+
+        Args:
+            columns: Iterable of required columns (more can be returned).
+            predicate: Optional push-down row filter (mismatching rows can still be returned).
+
+        Returns:
+            Partition pruning plan.
+
+        Raises:
+            forml.MissingError: If no partition has all the required columns.
+        """
         columns = set(columns)
+        decisions = []
+        selected = None
         for partition in self.PARTITIONS:
-            if columns.issubset(partition.columns):
-                return tuple([partition])
-        raise forml.MissingError('No partition satisfy the column requirement')
+            if selected:
+                decisions.append(provider.Decision(partition, False, f'superseded by {selected.key}'))
+            elif missing := columns.difference(partition.columns):
+                missing = ', '.join(sorted(c.name for c in missing))
+                decisions.append(provider.Decision(partition, False, f'missing {missing}'))
+            else:
+                selected = partition
+                decisions.extend(self._prune(partition, predicate))  # pylint: disable=no-member
+        if not selected:
+            raise forml.MissingError('No partition satisfy the column requirement')
+        return provider.Plan(decisions)
+
+    def inventory(self) -> typing.Sequence[Partition]:
+        """Get all the competition file partitions.
+
+        Returns:
+            Sequence of the competition file partitions.
+        """
+        return self.PARTITIONS
+
+    def cached(self) -> list[cache.Entry]:
+        """List the existing cache entries of this origin including the raw downloaded files.
+
+        Returns:
+            Cache entries ordered from the least recently used.
+        """
+        artifacts = self._cachedir / cache.ARTIFACTS / self.COMPETITION  # pylint: disable=no-member
+        return sorted(super().cached() + cache.stats(artifacts), key=lambda e: e.accessed)  # pylint: disable=no-member
 
     def fetch(self, partition: typing.Optional[Partition]) -> typing.IO:
-        LOGGER.info('Fetching %s from %s', partition.filename, self.COMPETITION)
-        kaggle.api.competition_download_file(self.COMPETITION, partition.filename, setup.tmpdir, force=True, quiet=True)
-        return open(os.path.join(setup.tmpdir, partition.filename), 'rb')
+        path = cache.artifact(
+            f'{self.COMPETITION}/{partition.filename}',
+            functools.partial(self._download, partition.filename),
+            self._cachedir,  # pylint: disable=no-member
+        )
+        return open(path, 'rb')
+
+    def _download(self, filename: str, target: typing.BinaryIO, offset: int) -> None:
+        """Download the competition file (or its remainder starting at the given offset) into the target file."""
+        LOGGER.info('Fetching %s from %s', filename, self.COMPETITION)
+        response = kaggle.api.process_response(
+            kaggle.api.competitions_data_download_file_with_http_info(
+                id=self.COMPETITION, file_name=filename, _preload_content=False
+            )
+        )
+        if offset:  # repeating the request against the (signed) storage location with the range header
+            history = response.retries.history if response.retries else ()
+            location = history[0].redirect_location if history else response.geturl()
+            response.release_conn()
+            response = kaggle.api.api_client.rest_client.pool_manager.request(
+                'GET', location, headers={'Range': f'bytes={offset}-'}, preload_content=False
+            )
+            if response.status == 200:
+                LOGGER.warning('Resuming %s download not supported - restarting', filename)
+                target.truncate(0)
+            elif response.status != 206:
+                response.release_conn()
+                raise ConnectionError(f'Resuming {filename} download failed (HTTP {response.status})')
+        try:
+            while chunk := response.read(self.DOWNLOAD_CHUNKSIZE):
+                target.write(chunk)
+        finally:
+            response.release_conn()
 
 
 class Titanic(File, parser.CSV, provider.Origin):
     """Titanic dataset."""
 
+    CACHE_FORMAT = cache.ARROW
     COMPETITION = 'titanic'
     PARTITIONS = (
         Partition(
@@ -142,9 +224,13 @@ class Avazu(File, parser.CSV, provider.Origin):
     )
     CSV_PARAMS = {
         'compression': 'gzip',
+        'dtype': {'id': 'uint64'},
         'parse_dates': ['hour'],
         'date_format': '%y%m%d%H',
     }
+    CSV_CHUNKSIZE = 1_000_000
+    CSV_ENGINE = 'arrow'
+    CACHE_LAYOUT = cache.Hive('hour', 'day')
 
     @property
     def source(self) -> dsl.Source:
@@ -20,12 +20,11 @@ Scikit-learn datasets providers.
 import abc
 import typing
 
-import numpy
 import pandas
 from forml.io import dsl
 from openschema import sklearn as schema
 
-from openlake import provider
+from openlake import cache, provider
 
 try:
     from sklearn import datasets
@@ -39,14 +38,16 @@ if typing.TYPE_CHECKING:
 class Bunch(provider.Origin[None, 'utils.Bunch'], metaclass=abc.ABCMeta):
     """Base class for sklearn dataset origins."""
 
+    CACHE_FORMAT = cache.ARROW
+
     def partitions(
         self, columns: typing.Collection[dsl.Column], predicate: typing.Optional[dsl.Predicate]
     ) -> typing.Iterable[None]:
         return ()
 
     def parse(self, partition: None, content: 'utils.Bunch') -> pandas.DataFrame:
-        data = numpy.column_stack([content['data'], content['target']])
-        return pandas.DataFrame(data, columns=[f.name for f in self.source.features])  # pylint: disable=not-an-iterable
+        *features, target = [f.name for f in self.source.features]  # pylint: disable=not-an-iterable
+        return pandas.DataFrame(content['data'], columns=features).assign(**{target: content['target']})
 
 
 class BreastCancer(Bunch):
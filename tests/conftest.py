@@ -21,6 +21,7 @@ import datetime
 
 import pandas
 import pytest
+from forml.io import dsl
 
 
 @pytest.fixture(scope='function')
@@ -33,3 +34,18 @@ def frame() -> pandas.DataFrame:
             'baz': [datetime.datetime(2021, 10, 30), datetime.datetime(2021, 10, 31), datetime.datetime(2021, 11, 1)],
         }
     )
+
+
+@pytest.fixture(scope='session')
+def schema() -> dsl.Table:
+    """Schema fixture matching the frame fixture."""
+
+    class Schema(dsl.Schema):
+        """Test schema."""
+
+        # pylint: disable=disallowed-name
+        foo = dsl.Field(dsl.Integer())
+        bar = dsl.Field(dsl.String())
+        baz = dsl.Field(dsl.Timestamp())
+
+    return Schema
@@ -0,0 +1,97 @@
+# Licensed to the Apache Software Foundation (ASF) under one
+# or more contributor license agreements.  See the NOTICE file
+# distributed with this work for additional information
+# regarding copyright ownership.  The ASF licenses this file
+# to you under the Apache License, Version 2.0 (the
+# "License"); you may not use this file except in compliance
+# with the License.  You may obtain a copy of the License at
+#
+#   http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing,
+# software distributed under the License is distributed on an
+# "AS IS" BASIS, WITHOUT WARRANTIES OR CONDITIONS OF ANY
+# KIND, either express or implied.  See the License for the
+# specific language governing permissions and limitations
+# under the License.
+"""
+Kaggle provider unit tests.
+"""
+import pathlib
+from unittest import mock
+
+import pytest
+from openschema import kaggle as schema
+
+from openlake import cache
+from openlake.provider import kaggle
+
+
+class TestPartition:
+    """Kaggle partition unit tests."""
+
+    def test_fragment(self):
+        """Partition fragment test."""
+        partition = kaggle.Partition([schema.Titanic.Name], 'train.csv')
+        fragment = partition._replace(fragment='foo=bar')
+        assert partition.key == fragment.key == 'train'
+        assert partition.fragment is None
+        assert fragment.fragment == 'foo=bar'
+        assert partition != fragment
+
+
+class TestFile:
+    """Kaggle file fetcher unit tests."""
+
+    def test_explain(self, tmp_path: pathlib.Path):
+        """Partition selection plan test."""
+        test, train = kaggle.Titanic.PARTITIONS
+        with mock.patch.object(cache, 'DIR', tmp_path):
+            plan = kaggle.Titanic().explain([schema.Titanic.Name], schema.Titanic.Age > 10)
+            assert plan.partitions == (test,)
+            assert str(plan) == '+ test: not cached (no statistics)\n- train: superseded by test'
+            plan = kaggle.Titanic().explain([schema.Titanic.Survived], None)
+            assert plan.partitions == (train,)
+            assert [d.reason for d in plan] == ['missing Survived', 'not cached (no statistics)']
+
+    def test_fetch(self, tmp_path: pathlib.Path):
+        """Resumable fetching test."""
+        partition = kaggle.Titanic.PARTITIONS[0]
+        api = mock.MagicMock()
+        api.process_response.side_effect = lambda r: r
+        resumed = api.api_client.rest_client.pool_manager.request.return_value = mock.MagicMock(status=206)
+        resumed.read.side_effect = [b'bar', b'']
+        partial = tmp_path / 'kaggle' / cache.ARTIFACTS / 'titanic' / f'.{partition.filename}.part'
+        partial.parent.mkdir(parents=True)
+        partial.write_bytes(b'foo')
+        with mock.patch.object(kaggle, 'kaggle', mock.MagicMock(api=api)), mock.patch.object(cache, 'DIR', tmp_path):
+            origin = kaggle.Titanic()
+            with origin.fetch(partition) as content:
+                assert content.read() == b'foobar'
+            api.api_client.rest_client.pool_manager.request.assert_called_once()
+            assert api.api_client.rest_client.pool_manager.request.call_args.kwargs['headers'] == {'Range': 'bytes=3-'}
+            api.reset_mock()
+            with origin.fetch(partition) as content:
+                assert content.read() == b'foobar'
+            api.competitions_data_download_file_with_http_info.assert_not_called()
+
+    def test_resume(self, tmp_path: pathlib.Path):
+        """Failed resumption test."""
+        partition = kaggle.Titanic.PARTITIONS[0]
+        api = mock.MagicMock()
+        api.process_response.side_effect = lambda r: r
+        initial = api.competitions_data_download_file_with_http_info.return_value
+        initial.retries.history = []  # no redirect
+        initial.geturl.return_value = 'https://storage/test.csv'
+        request = api.api_client.rest_client.pool_manager.request
+        request.return_value = mock.MagicMock(status=416)
+        request.return_value.read.side_effect = [b'<Error>InvalidRange</Error>', b'']
+        partial = tmp_path / 'kaggle' / cache.ARTIFACTS / 'titanic' / f'.{partition.filename}.part'
+        partial.parent.mkdir(parents=True)
+        partial.write_bytes(b'foo')
+        with mock.patch.object(kaggle, 'kaggle', mock.MagicMock(api=api)), mock.patch.object(cache, 'DIR', tmp_path):
+            with pytest.raises(ConnectionError, match='HTTP 416'):
+                kaggle.Titanic().fetch(partition)
+        assert request.call_args.args[1] == 'https://storage/test.csv'
+        assert partial.read_bytes() == b'foo'
+        assert not (partial.parent / partition.filename).exists()
@@ -18,11 +18,246 @@
 Provider unit tests.
 """
 # pylint: disable=no-self-use
+import asyncio
+import collections
+import pathlib
+import threading
+import typing
+from unittest import mock
+
+import pandas
+import pyarrow
 import pytest
+from forml.io import dsl
+from openschema import sklearn as schema
+from pyarrow import parquet
 
+from openlake import cache
 from openlake import provider as provmod
 
 
+class Partition(provmod.Partition, collections.namedtuple('Partition', 'name')):
+    """Test partition."""
+
+    @property
+    def key(self) -> str:
+        return self.name
+
+
+class Origin(provmod.Origin[Partition, pandas.DataFrame]):
+    """Test origin returning the frame fixture."""
+
+    def __init__(self, schema: dsl.Table, frame: pandas.DataFrame):
+        self._table: dsl.Table = schema
+        self._frame: pandas.DataFrame = frame
+        self.fetched: list[tuple[Partition, str]] = []
+
+    @property
+    def source(self) -> dsl.Source:
+        return self._table
+
+    def fetch(self, partition: typing.Optional[Partition]) -> pandas.DataFrame:
+        self.fetched.append((partition, threading.current_thread().name))
+        return self._frame
+
+    def parse(self, partition: typing.Optional[Partition], content: pandas.DataFrame) -> pandas.DataFrame:
+        return content
+
+
+class Fragment(provmod.Partition, collections.namedtuple('Fragment', 'name, fragment', defaults=[None])):
+    """Test partition of the hive-style cache entry."""
+
+    @property
+    def key(self) -> str:
+        return self.name
+
+    @property
+    def fragment(self) -> typing.Optional[str]:
+        return self[1]
+
+
+class Hive(Origin):
+    """Test origin using the hive-style cache layout."""
+
+    CACHE_LAYOUT = cache.Hive('baz', 'month')
+    CACHE_MEMORY = None
+
+
+class TestOrigin:
+    """Origin unit tests."""
+
+    @staticmethod
+    @pytest.fixture(scope='function')
+    def origin(schema: dsl.Table, frame: pandas.DataFrame, tmp_path: pathlib.Path) -> Origin:
+        """Origin fixture."""
+        with mock.patch.object(cache, 'DIR', tmp_path):
+            yield Origin(schema, frame)
+
+    def test_load_many(self, origin: Origin, frame: pandas.DataFrame):
+        """Concurrent loading test."""
+        partitions = [Partition('foo'), Partition('bar'), Partition('baz')]
+        loaded = origin.load_many(partitions, [origin.source.foo], origin.source.foo > 1)
+        expected = frame[frame['foo'] > 1][['foo']].reset_index(drop=True)
+        assert all(f.equals(expected) for f in loaded)
+        assert {p for p, _ in origin.fetched} == set(partitions)
+        assert all(t.startswith('openlake-fetch') for _, t in origin.fetched)
+        origin.fetched.clear()
+        origin.load_many(partitions)
+        assert not origin.fetched
+
+    def test_table(self, origin: Origin, frame: pandas.DataFrame):
+        """Arrow-native loading test."""
+        table = origin.table([Partition('foo')], [origin.source.bar])
+        assert isinstance(table, pyarrow.Table)
+        assert table.schema == pyarrow.schema([('bar', pyarrow.string())])
+        assert origin([Partition('foo')]).equals(frame)  # compaction is storage-only
+        assert pyarrow.types.is_int8(parquet.read_schema(origin.cachefiles([Partition('foo')])[0]).field('foo').type)
+        first, second = (origin._load(Partition('foo'), None, None, lambda: frame) for _ in range(2))
+        assert pyarrow.types.is_int8(first.schema.field('foo').type)  # memory tier hits share the cached buffers
+        assert first.column('foo').chunk(0).buffers()[1].address == second.column('foo').chunk(0).buffers()[1].address
+        origin.CACHE_COMPACTION = False
+        assert origin([Partition('baz'), Partition('foo')])['foo'].dtype == 'int64'
+
+    def test_prune(self, origin: Origin):
+        """Partition pruning test."""
+        assert origin._prune(Partition('foo'), origin.source.foo > 5)[0].reason == 'not cached (no statistics)'
+        origin.load(Partition('foo'))
+        assert origin._prune(Partition('foo'), None) == [provmod.Decision(Partition('foo'), True, 'no predicate')]
+        (decision,) = origin._prune(Partition('foo'), origin.source.foo > 2)
+        assert decision.selected and decision.reason.startswith('foo in [1, 3] may satisfy')
+        (decision,) = origin._prune(Partition('foo'), origin.source.foo > 5)
+        assert decision.selected and decision.reason.endswith('(kept for the schema)')
+        assert 'can not satisfy' in decision.reason
+
+    def test_fingerprint(self, origin: Origin, schema: dsl.Table, frame: pandas.DataFrame):
+        """Cache versioning test."""
+        assert origin._fingerprint == Origin(schema, frame)._fingerprint
+        origin.load(Partition('foo'))
+        origin.CACHE_COMPACTION = False
+        assert origin._fingerprint != Origin(schema, frame)._fingerprint
+        origin.fetched.clear()
+        assert origin.load(Partition('foo'))['foo'].dtype == 'int64'
+        assert origin.fetched
+
+    def test_sampled(self, origin: Origin, frame: pandas.DataFrame):
+        """Sampled loading test."""
+        sampled = origin.sampled(cache.Sample(limit=2))
+        partitions = [Partition('foo'), Partition('bar')]
+        assert all(len(f) == 2 for f in sampled.load_many(partitions))
+        assert origin._sample is None and len(origin.load(Partition('foo'))) == len(frame)
+        origin.fetched.clear()
+        sampled.load_many(partitions)
+        assert not origin.fetched
+
+    @pytest.mark.parametrize('sample', [cache.Sample(limit=100), cache.Sample(fraction=0.3)])
+    def test_sampled_hive(self, schema: dsl.Table, tmp_path: pathlib.Path, sample: cache.Sample):
+        """Sampled loading of the hive-style cache entries test (independent of the cache state)."""
+        frame = pandas.DataFrame(
+            {'foo': range(300), 'bar': 'x', 'baz': pandas.date_range('2021-10-01', periods=300, freq='8H')}
+        )
+        with mock.patch.object(cache, 'DIR', tmp_path):
+            origin = Hive(schema, frame)
+            sampled = origin.sampled(sample)
+            cold = sampled.load(Fragment('foo'))
+            origin.load(Fragment('foo'))
+            fragments = [d.partition for d in origin._prune(Fragment('foo'), None)]
+            assert len(fragments) > 1
+            warm = pandas.concat(sampled.load_many(fragments), ignore_index=True)
+            cache.remove(origin.CACHE_FORMAT.path(sample.key(origin._cachekey(Fragment('foo'))), tmp_path))
+            derived = pandas.concat(sampled.load_many(fragments), ignore_index=True)
+        assert 0 < len(cold) < len(frame)
+        assert warm.equals(cold) and derived.equals(cold)
+
+    def test_warm(self, origin: Origin):
+        """Cache warm-up test."""
+        assert origin.warm() == [None]
+        assert origin.warm([Partition('foo')]) == [Partition('foo')]
+        assert sorted(e.path.name for e in origin.cached()) == [f'{origin.key}.parquet', f'{origin.key}:foo.parquet']
+        origin.fetched.clear()
+        origin.load(Partition('foo'))
+        assert not origin.fetched
+
+    def test_iter_batches(self, origin: Origin, frame: pandas.DataFrame):
+        """Out-of-core loading test."""
+        cold = list(origin.iter_batches(Partition('foo'), batch_size=2))
+        assert [len(b) for b in cold] == [2, 1]
+        origin.fetched.clear()
+        warm = list(origin.iter_batches(Partition('foo'), [origin.source.foo], origin.source.foo > 1, batch_size=2))
+        assert not origin.fetched
+        assert pandas.concat(cold, ignore_index=True).equals(frame)
+        assert pandas.concat(warm, ignore_index=True).equals(frame[frame['foo'] > 1][['foo']].reset_index(drop=True))
+
+    def test_aload(self, origin: Origin, frame: pandas.DataFrame):
+        """Asynchronous loading test."""
+
+        async def load() -> list[pandas.DataFrame]:
+            return await asyncio.gather(
+                origin.aload(Partition('foo'), [origin.source.foo]), origin.aload_many([Partition('bar'), None])
+            )
+
+        foo, (bar, none) = asyncio.run(load())
+        assert foo.equals(frame[['foo']]) and bar.equals(none)
+        assert {p for p, _ in origin.fetched} == {Partition('foo'), Partition('bar'), None}
+        assert all(t.startswith('asyncio') for _, t in origin.fetched)
+        origin.fetched.clear()
+        asyncio.run(load())
+        assert not origin.fetched
+
+    def test_load_many_unused(self, origin: Origin):
+        """Closing the prefetched payload test."""
+        partitions = [Partition('foo'), Partition('bar')]
+        origin.load_many(partitions)
+        payload = mock.MagicMock()
+        with mock.patch.object(origin, '_cached', return_value=False), mock.patch.object(
+            origin, 'fetch', return_value=payload
+        ):
+            origin.load_many(partitions)  # entries filled concurrently (after the check)
+        assert payload.close.call_count == 2
+
+    def test_aload_many(self, origin: Origin):
+        """Asynchronous loading concurrency test."""
+        active, peak = 0, 0
+
+        async def afetch(partition: Partition) -> pandas.DataFrame:
+            nonlocal active, peak
+            active += 1
+            peak = max(peak, active)
+            await asyncio.sleep(0.01)
+            active -= 1
+            return origin.fetch(partition)
+
+        with mock.patch.object(origin, 'afetch', afetch):
+            asyncio.run(origin.aload_many([Partition('foo'), Partition('bar'), Partition('baz')], concurrency=2))
+        assert peak == 2
+        payload = mock.MagicMock()
+        with mock.patch.object(origin, '_cached', return_value=False), mock.patch.object(
+            origin, 'afetch', mock.AsyncMock(return_value=payload)
+        ):
+            asyncio.run(origin.aload(Partition('foo')))  # entry filled concurrently (after the check)
+        payload.close.assert_called_once()
+
+
+class TestLazy:
+    """Lazy origin proxy tests."""
+
+    @staticmethod
+    @pytest.fixture(scope='function')
+    def proxy() -> provmod.Lazy:
+        """Lazy origin fixture."""
+        return provmod.Lazy('openlake.provider.sklearn:Iris', 'openschema.sklearn:Iris')
+
+    def test_resolve(self, proxy: provmod.Lazy):
+        """Origin resolution test."""
+        assert 'origin' not in vars(proxy) and proxy.name == 'Iris'
+        assert proxy.source == schema.Iris and proxy.key == provmod.resolve(proxy).key
+        assert provmod.resolve(proxy) is proxy.origin and provmod.resolve(proxy.origin) is proxy.origin
+        assert proxy.CACHE_FORMAT is cache.ARROW  # delegated attribute
+        sampled = proxy.sampled(cache.Sample(limit=2))
+        assert sampled.origin._sample == cache.Sample(limit=2) and proxy.origin._sample is None
+        with pytest.raises(AttributeError):
+            _ = proxy._unknown
+
+
 class TestUnavailable:
     """Unavailable provider tests."""
 
@@ -17,10 +17,20 @@
 """
 Caching unit tests.
 """
+import datetime
+import multiprocessing
+import os
 import pathlib
+import tarfile
+import threading
+import time
+from concurrent import futures
 from unittest import mock
 
 import pandas
+import pyarrow
+import pytest
+from forml.io import dsl
 
 from openlake import cache
 
@@ -34,3 +44,249 @@ def test_dataframe(tmp_path: pathlib.Path, frame: pandas.DataFrame):
     loader.reset_mock()
     assert cache.dataframe('foobar', loader, tmp_path).equals(frame)
     loader.assert_not_called()
+
+
+def test_pushdown(tmp_path: pathlib.Path, frame: pandas.DataFrame, schema: dsl.Table):
+    """Test the column projection and predicate push-down."""
+    cache.dataframe('foobar', lambda: frame, tmp_path)
+    loaded = cache.dataframe('foobar', mock.MagicMock(), tmp_path, {'foo', 'bar', 'missing'}, schema.foo > 1)
+    assert list(loaded.columns) == ['foo', 'bar']
+    assert loaded.equals(frame[frame['foo'] > 1][['foo', 'bar']].reset_index(drop=True))
+
+
+def test_arrow(tmp_path: pathlib.Path, frame: pandas.DataFrame, schema: dsl.Table):
+    """Test the Arrow IPC cache format."""
+    cache.dataframe('foobar', lambda: frame, tmp_path, fmt=cache.ARROW)
+    assert (tmp_path / 'foobar.arrow').is_file()
+    assert not (tmp_path / 'foobar.parquet').exists()
+    loaded = cache.dataframe('foobar', mock.MagicMock(), tmp_path, {'foo'}, schema.foo <= 2, fmt=cache.ARROW)
+    assert loaded.equals(frame[frame['foo'] <= 2][['foo']])
+    layout = cache.Hive('baz', 'month')
+    cache.table('hive', lambda: frame, tmp_path, layout=layout, fmt=cache.ARROW)
+    assert (tmp_path / 'hive.arrow' / 'baz_month=2021-11-01' / 'part-0.arrow').is_file()
+
+
+def test_memory(tmp_path: pathlib.Path, frame: pandas.DataFrame):
+    """Test the in-process memory cache."""
+    memory = cache.Memory(frame.memory_usage(index=False).sum() * 2)
+    table = cache.table('foo', lambda: frame, tmp_path, memory=memory)
+    assert cache.table('foo', mock.MagicMock(), tmp_path, memory=memory) is table
+    assert len(memory) == 1 and memory.size == table.nbytes
+    cache.table('foo', mock.MagicMock(), tmp_path, {'foo'}, memory=memory)
+    assert len(memory) == 2
+    cache.table('bar', lambda: frame, tmp_path, memory=memory)  # evicting the least recently used
+    assert len(memory) == 2 and memory.size <= memory.capacity
+    cache.remove(tmp_path / 'foo.parquet')
+    assert cache.table('foo', lambda: frame.iloc[:1], tmp_path, memory=memory).num_rows == 1
+    memory.clear()
+    assert len(memory) == 0 and memory.size == 0
+
+
+def test_compaction(tmp_path: pathlib.Path, frame: pandas.DataFrame):
+    """Test the compact schema storage."""
+    frame = pandas.concat([frame, frame], ignore_index=True).assign(big=[1, 1 << 16, 3, 4, 5, 6])
+    for fmt in cache.PARQUET, cache.ARROW:
+        table = cache.table('foobar', lambda: frame, tmp_path, fmt=fmt, memory=None, compaction=True)
+        assert table.schema.field('foo').type == pyarrow.int8()
+        assert table.schema.field('big').type == pyarrow.int32()
+        assert table.schema.field('bar').type == pyarrow.dictionary(pyarrow.int32(), pyarrow.string())
+        assert table.to_pandas().astype({'foo': 'int64', 'big': 'int64', 'bar': 'object'}).equals(frame)
+    assert cache.compact(pyarrow.schema([('foo', pyarrow.int64())]), cache.Stats()).field('foo').type == pyarrow.int64()
+
+
+def test_artifact(tmp_path: pathlib.Path):
+    """Test the raw artifact caching."""
+
+    def interrupted(target, _):
+        target.write(b'foo')
+        raise ConnectionError('Interrupted')
+
+    download = mock.MagicMock(side_effect=lambda t, o: t.write(b'foobar'[o:]))
+    with pytest.raises(ConnectionError):
+        cache.artifact('foo/bar.gz', interrupted, tmp_path)
+    stored = cache.artifact('foo/bar.gz', download, tmp_path)
+    download.assert_called_once_with(mock.ANY, 3)
+    assert stored.read_bytes() == b'foobar' and cache.intact(stored)
+    download.reset_mock()
+    assert cache.artifact('foo/bar.gz', download, tmp_path) == stored
+    download.assert_not_called()
+    stored.write_bytes(b'foobaz')  # corrupted
+    assert not cache.intact(stored)
+    stored.unlink()
+    assert cache.artifact('foo/bar.gz', download, tmp_path).read_bytes() == b'foobar'
+    download.assert_called_once_with(mock.ANY, 0)
+    slow = mock.MagicMock(side_effect=lambda t, _: time.sleep(0.1) or t.write(b'foobar'))
+    with futures.ThreadPoolExecutor(4) as pool:  # revalidated artifacts are also downloaded just once
+        list(pool.map(lambda _: cache.artifact('foo/baz.gz', slow, tmp_path, lambda r: True), range(4)))
+    slow.assert_called_once()
+
+
+def test_fingerprint(tmp_path: pathlib.Path, frame: pandas.DataFrame):
+    """Test the cache entry invalidation."""
+    loader = mock.MagicMock(return_value=frame)
+    cache.table('foobar', loader, tmp_path, memory=None, fingerprint='foo')
+    assert cache.exists('foobar', tmp_path, fingerprint='foo')
+    assert not cache.exists('foobar', tmp_path, fingerprint='bar')
+    cache.table('foobar', loader, tmp_path, memory=None, fingerprint='foo')
+    loader.assert_called_once()
+    cache.table('foobar', loader, tmp_path, memory=None, fingerprint='bar')
+    assert loader.call_count == 2
+    assert cache.describe(tmp_path / 'foobar.parquet')['fingerprint'] == 'bar'
+
+
+def test_purge(tmp_path: pathlib.Path, frame: pandas.DataFrame):
+    """Test the cache eviction."""
+    for age, key in enumerate(['baz', 'bar', 'foo'], start=1):
+        cache.table(key, lambda: frame, tmp_path, memory=None)
+        os.utime(cache.metadata(tmp_path / f'{key}.parquet'), (time.time() - age * 10,) * 2)
+    cache.table('foo', mock.MagicMock(), tmp_path, memory=None)  # making foo most recently used
+    entries = cache.stats(tmp_path)
+    assert [e.path.name for e in entries] == ['bar.parquet', 'baz.parquet', 'foo.parquet']
+    assert all(e.size == (tmp_path / e.path.name).stat().st_size for e in entries)
+    assert cache.purge(tmp_path, older=datetime.timedelta(days=1)) == []
+    assert [e.path.name for e in cache.purge(tmp_path, budget=entries[0].size * 2)] == ['bar.parquet']
+    with mock.patch.object(cache, 'BUDGET', entries[0].size * 2):
+        cache.table('bar', lambda: frame, tmp_path, memory=None)
+    assert [e.path.name for e in cache.stats(tmp_path)] == ['foo.parquet', 'bar.parquet']
+    assert len(cache.purge(tmp_path)) == 2
+    assert not cache.stats(tmp_path) and not cache.exists('foo', tmp_path)
+
+
+def test_publish(tmp_path: pathlib.Path):
+    """Test the cache entry publishing."""
+    stored, staging = tmp_path / 'foo', tmp_path / '.foo'
+    stored.write_text('old')
+    staging.write_text('new')
+    with mock.patch.object(cache, 'remove', wraps=cache.remove) as remove:
+        cache.publish(staging, stored)
+        remove.assert_not_called()  # replaced atomically
+        staging.mkdir()
+        (staging / 'bar').write_text('new')
+        cache.publish(staging, stored)
+        remove.assert_called_once_with(stored)
+    assert (stored / 'bar').read_text() == 'new' and not staging.exists()
+
+
+def test_stream(tmp_path: pathlib.Path, frame: pandas.DataFrame):
+    """Test the chunked dataframe caching."""
+    schema = pyarrow.schema([('bar', pyarrow.string())])
+    chunks = [frame.iloc[:2], frame.iloc[2:].assign(bar=None)]
+    loaded = cache.dataframe('foobar', lambda: iter(chunks), tmp_path, schema=schema)
+    assert loaded.equals(frame.assign(bar=['a', 'b', None]))
+
+
+def test_hive(tmp_path: pathlib.Path, frame: pandas.DataFrame):
+    """Test the hive-style cache layout."""
+    layout = cache.Hive('baz', 'month')
+    assert cache.dataframe('foobar', lambda: frame, tmp_path, layout=layout).equals(frame)
+    index = cache.manifest(tmp_path / 'foobar.parquet')
+    assert list(index['fragment']) == ['baz_month=2021-10-01', 'baz_month=2021-11-01']
+    assert cache.Stats.from_record(index.iloc[0]) == {
+        'foo': (1, 2),
+        'bar': ('a', 'b'),
+        'baz': (datetime.datetime(2021, 10, 30), datetime.datetime(2021, 10, 31)),
+    }
+    loaded = cache.dataframe('foobar', mock.MagicMock(), tmp_path, layout=layout, fragment='baz_month=2021-11-01')
+    assert loaded.equals(frame.iloc[2:].reset_index(drop=True))
+
+
+def test_sample(tmp_path: pathlib.Path, frame: pandas.DataFrame):
+    """Test the sampled loading."""
+    chunks = [frame.iloc[:2], frame.iloc[2:]]
+    loader = mock.MagicMock(side_effect=lambda: iter(chunks))
+    head = cache.Sample(limit=1)
+    assert cache.dataframe('foobar', loader, tmp_path, sample=head).equals(frame.iloc[:1])
+    assert (tmp_path / 'foobar~head1.parquet').is_file() and not cache.exists('foobar', tmp_path)
+    sample = cache.Sample(fraction=0.5)
+    cold = cache.dataframe('foobar', loader, tmp_path, sample=sample, memory=None)
+    cache.dataframe('foobar', loader, tmp_path)  # full entry to derive the new samples from
+    loader.reset_mock()
+    cache.remove(tmp_path / 'foobar~sample0.5.parquet')
+    warm = cache.dataframe('foobar', loader, tmp_path, sample=sample, memory=None)
+    loader.assert_not_called()
+    assert warm.equals(cold) and len(warm) < len(frame)
+    with pytest.raises(ValueError):
+        cache.Sample(limit=1, fraction=0.5)
+    with pytest.raises(ValueError):
+        cache.Sample(fraction=0)
+
+
+def test_bundle(tmp_path: pathlib.Path, frame: pandas.DataFrame):
+    """Test the cache export and import."""
+    source, target = tmp_path / 'source', tmp_path / 'target'
+    cache.table('foo', lambda: frame, source / 'sub', layout=cache.Hive('baz', 'month'), fingerprint='v1')
+    cache.artifact('bar/baz.csv', lambda h, _: h.write(b'baz'), source)
+    assert len(cache.export(tmp_path / 'bundle.tar.gz', source)) == 2
+    assert sorted(p.name for p in cache.restore(tmp_path / 'bundle.tar.gz', target)) == ['baz.csv', 'foo.parquet']
+    assert cache.exists('foo', target / 'sub', cache.Hive('baz', 'month'), fingerprint='v1')
+    assert cache.intact(target / cache.ARTIFACTS / 'bar' / 'baz.csv')
+    assert not list(target.glob('.restore-*'))
+    with tarfile.open(tmp_path / 'evil.tar', 'w') as archive:
+        archive.add(tmp_path / 'bundle.tar.gz', '../evil.json')
+    with pytest.raises(ValueError, match='Unsafe'):
+        cache.restore(tmp_path / 'evil.tar', target)
+
+
+def test_singleflight(tmp_path: pathlib.Path, frame: pandas.DataFrame):
+    """Test the concurrent cache filling."""
+    loader = mock.MagicMock(side_effect=lambda: time.sleep(0.1) or frame)
+    with futures.ThreadPoolExecutor(4) as pool:
+        loaded = list(pool.map(lambda _: cache.dataframe('foobar', loader, tmp_path), range(4)))
+    loader.assert_called_once()
+    assert all(f.equals(frame) for f in loaded)
+    assert [p.name for p in tmp_path.iterdir() if p.suffix not in {'.lock', '.json'}] == ['foobar.parquet']
+
+
+def test_batches(tmp_path: pathlib.Path, frame: pandas.DataFrame, schema: dsl.Table):
+    """Test the out-of-core batch streaming."""
+    chunks = [frame.iloc[:2], frame.iloc[2:]]
+    loader = mock.MagicMock(side_effect=lambda: iter(chunks))
+    streaming = cache.batches('foobar', loader, tmp_path, size=1)
+    assert len(next(streaming)) == 1 and not cache.exists('foobar', tmp_path)
+    streaming.close()
+    assert not cache.exists('foobar', tmp_path) and not list(tmp_path.glob('.*.tmp'))
+    cold = list(cache.batches('foobar', loader, tmp_path, ['foo'], schema.foo > 1))
+    assert [b.num_rows for b in cold] == [1, 1] and cold[0].schema.names == ['foo']
+    assert cache.exists('foobar', tmp_path)
+    loader.reset_mock()
+    warm = pyarrow.Table.from_batches(cache.batches('foobar', loader, tmp_path, size=2))
+    loader.assert_not_called()
+    assert warm.to_pandas().equals(frame)
+    cache.purge(tmp_path)
+    memory = mock.MagicMock()
+    paused = cache.batches('foobar', loader, tmp_path, size=1, memory=memory)
+    next(paused)
+    concurrent = threading.Thread(target=lambda: list(cache.batches('foobar', loader, tmp_path, memory=memory)))
+    concurrent.daemon = True  # the paused stream must not hold the entry lock
+    concurrent.start()
+    concurrent.join(5)
+    assert not concurrent.is_alive() and cache.exists('foobar', tmp_path)
+    memory.discard.assert_called_once_with(tmp_path / 'foobar.parquet')
+    assert len(list(paused)) == 2  # filled concurrently so not published again
+    memory.discard.assert_called_once()
+    assert not list(tmp_path.glob('.*.tmp'))
+
+
+def test_shared(tmp_path: pathlib.Path, frame: pandas.DataFrame):
+    """Test the host-level shared memory cache."""
+    store = cache.Shared(1 << 20, tmp_path / 'shm')
+    key = cache.Memory.Key(tmp_path / 'foobar.parquet', None, None, None, None)
+    table = pyarrow.Table.from_pandas(frame.astype({'bar': 'category'}), preserve_index=False)
+    shared = store.put(key, table)
+    assert shared.equals(table) and store.get(key) is shared
+    (segment,) = (tmp_path / 'shm').glob('*.arrow')
+    assert store.references(segment) == 1
+    with multiprocessing.get_context('fork').Pool(1) as pool:  # other process attaching without releasing
+        assert pool.apply(attach, (tmp_path / 'shm', key)) == len(frame)
+    assert store.references(segment) == 1  # dead process reference dropped
+    store.release()
+    assert not segment.exists() and store.get(key) is None
+    store.put(key, table)
+    store.discard(key.stored)
+    assert not list((tmp_path / 'shm').glob('*.arrow'))
+    assert cache.Shared(10, tmp_path / 'shm').put(key, table) is table  # exceeding capacity
+
+
+def attach(directory: pathlib.Path, key: cache.Memory.Key) -> int:
+    """Attach the shared table from another process."""
+    return cache.Shared(1 << 20, directory).get(key).num_rows
@@ -0,0 +1,170 @@
+# Licensed to the Apache Software Foundation (ASF) under one
+# or more contributor license agreements.  See the NOTICE file
+# distributed with this work for additional information
+# regarding copyright ownership.  The ASF licenses this file
+# to you under the Apache License, Version 2.0 (the
+# "License"); you may not use this file except in compliance
+# with the License.  You may obtain a copy of the License at
+#
+#   http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing,
+# software distributed under the License is distributed on an
+# "AS IS" BASIS, WITHOUT WARRANTIES OR CONDITIONS OF ANY
+# KIND, either express or implied.  See the License for the
+# specific language governing permissions and limitations
+# under the License.
+"""
+Fetcher unit tests.
+"""
+import asyncio
+import pathlib
+import threading
+import typing
+from http import server
+from unittest import mock
+
+import forml
+import pytest
+
+from openlake import cache, fetcher
+
+
+class Handler(server.BaseHTTPRequestHandler):
+    """HTTP handler serving the content with range requests and conditional revalidation support."""
+
+    CONTENT: bytes = b''
+    ETAG: str = ''
+    REQUESTS: list[tuple[str, typing.Optional[str]]] = []
+
+    def do_HEAD(self):  # pylint: disable=invalid-name
+        """Handle the HEAD request."""
+        self.REQUESTS.append(('HEAD', None))
+        self._respond(head=True)
+
+    def do_GET(self):  # pylint: disable=invalid-name
+        """Handle the GET request."""
+        self.REQUESTS.append(('GET', self.headers.get('Range')))
+        self._respond(head=False)
+
+    def _respond(self, head: bool) -> None:
+        path, _, query = self.path.partition('?')
+        if path != '/data.csv':
+            self.send_error(404)
+            return
+        if self.headers.get('If-None-Match') == self.ETAG:
+            self.send_response(304)
+            self.end_headers()
+            return
+        content, status = self.CONTENT + query.encode(), 200
+        if (ranged := self.headers.get('Range')) and self.headers.get('If-Range', self.ETAG) == self.ETAG:
+            start, end = (int(b) for b in ranged.removeprefix('bytes=').split('-'))
+            end += 1
+            content, status = content[start:end], 206
+        self.send_response(status)
+        self.send_header('ETag', self.ETAG)
+        self.send_header('Accept-Ranges', 'bytes')
+        self.send_header('Content-Length', str(len(content)))
+        self.end_headers()
+        if not head:
+            self.wfile.write(content)
+
+    def log_message(self, *_):
+        pass
+
+
+class Fetcher(fetcher.URL[str]):
+    """Test fetcher."""
+
+    HTTP_BLOCKSIZE = 4
+
+    def __init__(self, cachedir: pathlib.Path):
+        self._cachedir: pathlib.Path = cachedir
+
+    def partitions(self, *_) -> typing.Iterable[str]:
+        return ()
+
+    def url(self, partition: str) -> str:
+        return partition
+
+
+@pytest.fixture(scope='module')
+def address() -> str:
+    """HTTP server fixture."""
+    httpd = server.ThreadingHTTPServer(('127.0.0.1', 0), Handler)
+    threading.Thread(target=httpd.serve_forever, daemon=True).start()
+    yield f'http://127.0.0.1:{httpd.server_port}'
+    httpd.shutdown()
+
+
+class TestURL:
+    """URL fetcher unit tests."""
+
+    @staticmethod
+    @pytest.fixture(scope='function', autouse=True)
+    def content() -> None:
+        """Served content fixture."""
+        with mock.patch.multiple(Handler, CONTENT=b'0123456789', ETAG='"v1"', REQUESTS=[]):
+            yield
+
+    def test_file(self, tmp_path: pathlib.Path):
+        """Local file stand-in test."""
+        (tmp_path / 'data.csv').write_bytes(b'foo')
+        with Fetcher(tmp_path).fetch((tmp_path / 'data.csv').as_uri()) as content:
+            assert content.read() == b'foo'
+        assert not (tmp_path / cache.ARTIFACTS).exists()
+
+    def test_http(self, tmp_path: pathlib.Path, address: str):
+        """HTTP fetching test."""
+        origin, url = Fetcher(tmp_path), f'{address}/data.csv'
+        with origin.fetch(url) as content:
+            assert content.read() == Handler.CONTENT
+        assert ('GET', 'bytes=8-9') in Handler.REQUESTS and len(Handler.REQUESTS) == 4  # HEAD + 3 ranges
+        Handler.REQUESTS.clear()
+        with origin.fetch(url) as content:
+            assert content.read() == Handler.CONTENT
+        assert Handler.REQUESTS == [('HEAD', None)]  # revalidated
+        Handler.CONTENT, Handler.ETAG = b'abcdef', '"v2"'
+        with origin.fetch(url) as content:
+            assert content.read() == b'abcdef'
+        with origin.fetch(f'{url}?v=1') as content:  # query distinguishes the artifacts
+            assert content.read() == b'abcdefv=1'
+        with pytest.raises(forml.MissingError):
+            origin.fetch(f'{address}/missing.csv')
+
+    def test_afetch(self, tmp_path: pathlib.Path, address: str):
+        """Native asynchronous fetching test."""
+        origin, url = Fetcher(tmp_path), f'{address}/data.csv'
+        sessions = set()
+
+        async def fetch(*urls: str) -> list[bytes]:
+            contents = await asyncio.gather(*(origin.afetch(u) for u in urls))
+            sessions.add(await fetcher.session())
+            try:
+                return [c.read() for c in contents]
+            finally:
+                for content in contents:
+                    content.close()
+
+        with mock.patch.object(fetcher, 'pool', side_effect=AssertionError('blocking fetch')):
+            assert asyncio.run(fetch(url, f'{url}?v=1')) == [Handler.CONTENT, Handler.CONTENT + b'v=1']
+            assert ('GET', 'bytes=8-9') in Handler.REQUESTS
+            Handler.REQUESTS.clear()
+            assert asyncio.run(fetch(url)) == [Handler.CONTENT]
+            assert Handler.REQUESTS == [('HEAD', None)]  # revalidated
+            with pytest.raises(forml.MissingError):
+                asyncio.run(fetch(f'{address}/missing.csv'))
+        assert len(sessions) == 2 and all(s.closed for s in sessions)  # one per event loop closed upon shutdown
+        assert not fetcher._SESSIONS  # pylint: disable=protected-access
+        with origin.fetch(url) as content:  # sharing the artifacts with the blocking fetch
+            assert content.read() == Handler.CONTENT
+
+    def test_resume(self, tmp_path: pathlib.Path, address: str):
+        """Interrupted download resuming test."""
+        partial = tmp_path / cache.ARTIFACTS / address.removeprefix('http://') / '.data.csv.part'
+        partial.parent.mkdir(parents=True)
+        partial.write_bytes(Handler.CONTENT[:5])
+        pathlib.Path(f'{partial}.validator').write_text(Handler.ETAG, 'utf-8')
+        with Fetcher(tmp_path).fetch(f'{address}/data.csv') as content:
+            assert content.read() == Handler.CONTENT
+        assert sorted(r for _, r in Handler.REQUESTS if r) == ['bytes=5-8', 'bytes=9-9']  # fetched in parallel
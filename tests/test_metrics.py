@@ -0,0 +1,74 @@
+# Licensed to the Apache Software Foundation (ASF) under one
+# or more contributor license agreements.  See the NOTICE file
+# distributed with this work for additional information
+# regarding copyright ownership.  The ASF licenses this file
+# to you under the Apache License, Version 2.0 (the
+# "License"); you may not use this file except in compliance
+# with the License.  You may obtain a copy of the License at
+#
+#   http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing,
+# software distributed under the License is distributed on an
+# "AS IS" BASIS, WITHOUT WARRANTIES OR CONDITIONS OF ANY
+# KIND, either express or implied.  See the License for the
+# specific language governing permissions and limitations
+# under the License.
+"""
+Metrics unit tests.
+"""
+import json
+import pathlib
+import time
+from unittest import mock
+
+import pandas
+import pytest
+
+from openlake import cache, metrics
+
+
+@pytest.fixture(scope='function')
+def registry() -> metrics.Registry:
+    """Registry fixture replacing the global one."""
+    registry = metrics.Registry()
+    with mock.patch.object(metrics, 'REGISTRY', registry):
+        yield registry
+
+
+def test_stage(registry: metrics.Registry):
+    """Test the nested stage measurements."""
+    events = []
+    registry.subscribe(events.append)
+    registry.subscribe(mock.MagicMock(side_effect=RuntimeError('ignored')))
+
+    def chunks():
+        with metrics.stage('fetch', 'foo'):
+            time.sleep(0.05)
+        yield [1, 2]
+        yield [3]
+
+    with metrics.stage('write', 'foo') as span:
+        assert sum(len(c) for c in span.iterate('parse', chunks())) == 3
+        span.rows, span.size = 3, 10
+    assert [e.stage for e in events] == ['fetch', 'parse', 'write']
+    assert events[0].seconds >= 0.05 > max(events[1].seconds, events[2].seconds)
+    assert (events[1].rows, events[2].rows, events[2].size) == (3, 3, 10)
+
+
+def test_registry(tmp_path: pathlib.Path, frame: pandas.DataFrame, registry: metrics.Registry):
+    """Test the cache instrumentation and the registry dumps."""
+    memory = cache.Memory(1 << 20)
+    for _ in range(3):
+        cache.table('foo', lambda: frame, tmp_path, memory=memory)
+    memory.clear()
+    cache.table('foo', lambda: frame, tmp_path, memory=memory)
+    snapshot = registry.snapshot()['foo']
+    assert snapshot['lookups'] == {'memory': 2, 'disk': 1, 'miss': 1, 'ratio': 0.75}
+    assert snapshot['stages']['write']['rows'] == snapshot['stages']['parse']['rows'] == len(frame)
+    assert snapshot['stages']['read']['count'] == 2
+    assert 'openlake_cache_lookups_total{key="foo",result="memory"} 2' in registry.to_prometheus().splitlines()
+    registry.dump(tmp_path / 'metrics.json')
+    assert json.loads((tmp_path / 'metrics.json').read_text())['foo']['lookups']['miss'] == 1
+    registry.reset()
+    assert not registry.snapshot()
@@ -17,11 +17,37 @@
 """
 Openlake unit tests.
 """
+import pathlib
 import pickle
+import subprocess
+import sys
+import typing
+from unittest import mock
 
+import pandas
 import pytest
+from forml.io import dsl
 
 import openlake
+from openlake import cache, provider
+
+
+class Origin(provider.Origin[None, pandas.DataFrame]):
+    """Test origin returning the frame fixture."""
+
+    def __init__(self, schema: dsl.Table, frame: pandas.DataFrame):
+        self._table: dsl.Table = schema
+        self._frame: pandas.DataFrame = frame
+
+    @property
+    def source(self) -> dsl.Source:
+        return self._table
+
+    def fetch(self, partition: None) -> pandas.DataFrame:
+        return self._frame
+
+    def parse(self, partition: typing.Optional[None], content: pandas.DataFrame) -> pandas.DataFrame:
+        return content
 
 
 class TestLocal:
@@ -36,3 +62,88 @@ class TestLocal:
     def test_serializable(self, feed: openlake.Lite):
         """Feed serializability test."""
         assert pickle.loads(pickle.dumps(feed)).__class__ == feed.__class__
+
+
+def test_lazy():
+    """Lazy provider imports test."""
+    code = 'import sys, openlake; print(sorted(m for m in sys.modules if m.startswith("openlake.provider.")))'
+    assert subprocess.run([sys.executable, '-c', code], check=True, capture_output=True, text=True).stdout == '[]\n'
+
+
+def test_warm():
+    """Cache warm-up test."""
+    good, bad = mock.MagicMock(spec=provider.Origin), mock.MagicMock(spec=provider.Origin)
+    good.inventory.return_value = bad.inventory.return_value = [None]
+    bad.warm.side_effect = RuntimeError('unavailable')
+    progress = mock.MagicMock()
+    reports = openlake.warm([good, bad], progress=progress)
+    assert progress.call_count == 2 and [r.done for r in reports] == [1, 2]
+    assert {r.origin: type(r.error) for r in reports} == {good: type(None), bad: RuntimeError}
+    good.warm.assert_called_once_with([None], concurrency=1)
+
+
+def test_duck(schema: dsl.Table, frame: pandas.DataFrame, tmp_path: pathlib.Path):
+    """DuckDB feed test."""
+    origin = Origin(schema, frame)
+    feed = openlake.Duck(origin)
+    reader = feed.producer(feed.sources, feed.features, **feed._readerkw)  # pylint: disable=protected-access
+    with mock.patch.object(cache, 'DIR', tmp_path), mock.patch.object(
+        openlake.Duck.Reader, 'RESULTS', openlake.Results(tmp_path / 'results')
+    ):
+        result = reader(schema.select(schema.bar).where(schema.foo > 1)).to_columns()
+        assert list(result[0]) == ['b', 'c']
+        assert [f.name for f in origin.cachefiles([None])] == [f'{origin.key}.parquet']
+
+
+def test_results(schema: dsl.Table, frame: pandas.DataFrame, tmp_path: pathlib.Path):
+    """Feed result cache test."""
+    origin = Origin(schema, frame)
+    feed = openlake.Lite(origin)
+    reader = feed.producer(feed.sources, feed.features, **feed._readerkw)  # pylint: disable=protected-access
+    statement = schema.select(schema.foo).where(schema.foo > 1)
+    results = openlake.Results(tmp_path / 'results', budget=1 << 20)
+    with mock.patch.object(cache, 'DIR', tmp_path), mock.patch.object(openlake.Lite.Reader, 'RESULTS', results):
+        assert list(reader(statement).to_columns()[0]) == [2, 3]
+        with mock.patch.object(openlake.Lite.Reader, '_register') as register:
+            assert list(reader(statement).to_columns()[0]) == [2, 3]
+        register.assert_not_called()
+        origin._frame = frame.assign(foo=[4, 5, 6])  # pylint: disable=protected-access
+        cache.purge(tmp_path / origin._cachedir.name)  # pylint: disable=protected-access
+        assert list(reader(statement).to_columns()[0]) == [4, 5, 6]
+        assert len(cache.stats(tmp_path / 'results')) == 2
+        results.budget = 0
+        reader(schema.select(schema.bar))
+        assert len(cache.stats(tmp_path / 'results')) == 1
+        assert len(results._memory) == 1  # pylint: disable=protected-access
+
+
+def test_isolated(schema: dsl.Table, frame: pandas.DataFrame, tmp_path: pathlib.Path):
+    """Readers of different selections test."""
+    feed = openlake.Lite(Origin(schema, frame))
+    first, second = (
+        feed.producer(feed.sources, feed.features, **feed._readerkw)  # pylint: disable=protected-access
+        for _ in range(2)
+    )
+    assert first.BACKEND is not second.BACKEND
+    with mock.patch.object(cache, 'DIR', tmp_path), mock.patch.object(
+        openlake.Lite.Reader, 'RESULTS', openlake.Results(tmp_path / 'results')
+    ):
+        assert list(first(schema.select(schema.foo).where(schema.foo > 1)).to_columns()[0]) == [2, 3]
+        assert list(second(schema.select(schema.foo).where(schema.foo <= 2)).to_columns()[0]) == [1, 2]
+        with mock.patch.object(openlake.Lite.Reader, '_register') as register:
+            result = first(schema.select(schema.foo.alias('bar')).where(schema.foo > 1)).to_columns()
+        register.assert_not_called()
+    assert list(result[0]) == [2, 3]
+
+
+@pytest.mark.parametrize('feed', [openlake.Lite, openlake.Duck])
+def test_compacted(feed: type[openlake.Lite], schema: dsl.Table, frame: pandas.DataFrame, tmp_path: pathlib.Path):
+    """Arithmetic over the compacted columns test."""
+    origin = Origin(schema, frame.assign(foo=[1, 2, 100]))
+    feed = feed(origin)
+    reader = feed.producer(feed.sources, feed.features, **feed._readerkw)  # pylint: disable=protected-access
+    with mock.patch.object(cache, 'DIR', tmp_path), mock.patch.object(
+        feed.Reader, 'RESULTS', openlake.Results(tmp_path / 'results')
+    ):
+        result = reader(schema.select((schema.foo * schema.foo).alias('sq'))).to_columns()
+    assert list(result[0]) == [1, 4, 10000]
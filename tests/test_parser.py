@@ -0,0 +1,121 @@
+# Licensed to the Apache Software Foundation (ASF) under one
+# or more contributor license agreements.  See the NOTICE file
+# distributed with this work for additional information
+# regarding copyright ownership.  The ASF licenses this file
+# to you under the Apache License, Version 2.0 (the
+# "License"); you may not use this file except in compliance
+# with the License.  You may obtain a copy of the License at
+#
+#   http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing,
+# software distributed under the License is distributed on an
+# "AS IS" BASIS, WITHOUT WARRANTIES OR CONDITIONS OF ANY
+# KIND, either express or implied.  See the License for the
+# specific language governing permissions and limitations
+# under the License.
+"""
+Parser unit tests.
+"""
+import bz2
+import gzip
+import io
+import lzma
+from unittest import mock
+
+import pandas
+import pyarrow
+import pytest
+
+from openlake import parser
+
+
+class TestDecompressor:
+    """Decompressor unit tests."""
+
+    def test_read(self):
+        """Pipelined decompression test."""
+        content = gzip.compress(b'foo') + gzip.compress(b'bar' * 1000)  # multi-member
+        with io.BufferedReader(parser.Decompressor(io.BytesIO(content), 'gzip', blocksize=7, depth=2)) as stream:
+            assert stream.read() == b'foo' + b'bar' * 1000
+            assert stream.read() == b''
+
+    def test_codecs(self):
+        """Supported codecs test."""
+        for codec, compress in ('bz2', bz2.compress), ('xz', lzma.compress):
+            assert parser.Decompressor(io.BytesIO(compress(b'foo')), codec).read() == b'foo'
+
+    def test_error(self):
+        """Decompression error test."""
+        stream = parser.Decompressor(io.BytesIO(b'foo'), 'gzip')
+        for _ in range(2):
+            with pytest.raises(gzip.BadGzipFile):
+                stream.read()
+
+    def test_close(self):
+        """Premature close test."""
+        stream = parser.Decompressor(io.BytesIO(gzip.compress(b'foo' * 1000)), 'gzip', blocksize=3, depth=1)
+        assert stream.read(3) == b'foo'
+        stream.close()
+        assert stream.closed
+
+
+class TestCSV:
+    """CSV parser unit tests."""
+
+    class Parser(parser.CSV):
+        """Chunked CSV parser."""
+
+        CSV_PARAMS = {'parse_dates': ['baz']}
+        CSV_CHUNKSIZE = 2
+
+    def test_stream(self, frame: pandas.DataFrame):
+        """Chunked parsing test."""
+        chunks = list(self.Parser().stream(None, io.StringIO(frame.to_csv(index=False))))
+        assert [len(c) for c in chunks] == [2, 1]
+        assert pandas.concat(chunks, ignore_index=True).equals(frame)
+
+    def test_decompress(self, frame: pandas.DataFrame):
+        """Pipelined decompression parsing test."""
+        content = io.BytesIO(gzip.compress(frame.to_csv(index=False).encode()))
+        content.name = 'foo.csv.gz'
+        chunks = list(self.Parser().stream(None, content))
+        assert pandas.concat(chunks, ignore_index=True).equals(frame)
+        assert content.closed
+
+    def test_arrow(self, frame: pandas.DataFrame):
+        """Arrow engine parsing test."""
+
+        class Parser(self.Parser):
+            """Arrow engine CSV parser."""
+
+            CSV_PARAMS = {
+                'compression': 'gzip',
+                'sep': ';',
+                'dtype': {'foo': 'uint8'},
+                'parse_dates': ['baz'],
+                'date_format': '%Y%m%d',
+            }
+            CSV_ENGINE = 'arrow'
+
+        content = gzip.compress(frame.to_csv(index=False, sep=';', date_format='%Y%m%d').encode())
+        source = io.BytesIO(content)
+        table = Parser().parse(None, source)
+        assert source.closed
+        assert isinstance(table, pyarrow.Table)
+        assert table.schema.field('foo').type == pyarrow.uint8()
+        assert table.to_pandas().astype({'foo': 'int64'}).equals(frame)
+        source = io.BytesIO(content)
+        chunks = list(Parser().stream(None, source))
+        assert source.closed
+        assert pyarrow.concat_tables(chunks).equals(table)
+        Parser.CSV_BLOCKSIZE = 16
+        frame = pandas.concat([frame] * 10, ignore_index=True)
+        content = gzip.compress(frame.to_csv(index=False, sep=';', date_format='%Y%m%d').encode())
+        with mock.patch.object(parser.csv, 'read_csv', side_effect=pyarrow.csv.read_csv) as read_csv:
+            chunks = list(Parser().stream(None, io.BytesIO(content)))
+        assert all(len(c) >= 2 for c in chunks[:-1])
+        assert pyarrow.concat_tables(chunks).equals(pyarrow.concat_tables([table] * 10))
+        assert read_csv.call_count > 10  # parsed in many blocks
+        with pytest.raises(ValueError, match='thousands'):
+            parser.CSV.arrow(io.BytesIO(content), {'thousands': ','})
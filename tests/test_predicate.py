@@ -0,0 +1,83 @@
+# Licensed to the Apache Software Foundation (ASF) under one
+# or more contributor license agreements.  See the NOTICE file
+# distributed with this work for additional information
+# regarding copyright ownership.  The ASF licenses this file
+# to you under the Apache License, Version 2.0 (the
+# "License"); you may not use this file except in compliance
+# with the License.  You may obtain a copy of the License at
+#
+#   http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing,
+# software distributed under the License is distributed on an
+# "AS IS" BASIS, WITHOUT WARRANTIES OR CONDITIONS OF ANY
+# KIND, either express or implied.  See the License for the
+# specific language governing permissions and limitations
+# under the License.
+
+"""
+Predicate utilities unit tests.
+"""
+import pyarrow
+import pytest
+from forml.io import dsl
+from forml.io.dsl import function
+
+from openlake import predicate
+
+
+class TestArrow:
+    """Arrow translation unit tests."""
+
+    @staticmethod
+    @pytest.fixture(scope='session')
+    def fields() -> frozenset[str]:
+        """Available fields fixture."""
+        return frozenset({'foo', 'bar', 'baz'})
+
+    @staticmethod
+    @pytest.fixture(scope='function')
+    def table(frame) -> pyarrow.Table:
+        """Arrow table fixture."""
+        return pyarrow.Table.from_pandas(frame)
+
+    @pytest.mark.parametrize(
+        'build, expected',
+        [
+            (lambda s: s.foo > 1, [2, 3]),
+            (lambda s: 2 >= s.foo, [1, 2]),
+            (lambda s: (s.foo == 1) | (s.foo == 3), [1, 3]),
+            (lambda s: ~(s.foo != 2), [2]),
+            (lambda s: (s.foo > 1) & (s.bar == 'c'), [3]),
+            (lambda s: (s.foo > 1) & (function.Abs(s.foo) == 3), [2, 3]),
+        ],
+    )
+    def test_translate(self, schema: dsl.Table, fields, table: pyarrow.Table, build, expected):
+        """Predicate translation test."""
+        assert table.filter(predicate.arrow(build(schema), fields))['foo'].to_pylist() == expected
+
+    def test_untranslatable(self, schema: dsl.Table, fields):
+        """Untranslatable predicate test."""
+        relaxed = (schema.foo > 1) | (function.Abs(schema.foo) == 3)
+        assert predicate.arrow(relaxed, fields) is None
+        assert predicate.arrow(schema.foo > 1, {'bar'}) is None
+        with pytest.raises(predicate.Untranslatable):
+            predicate.arrow(~relaxed, fields, exact=True)
+
+
+@pytest.mark.parametrize(
+    'build, expected',
+    [
+        (lambda s: s.foo > 3, False),
+        (lambda s: s.foo >= 3, True),
+        (lambda s: (s.foo == 0) | (s.foo == 5), False),
+        (lambda s: (s.foo == 0) | (s.bar == 'b'), True),
+        (lambda s: (s.foo < 3) & (s.bar > 'x'), False),
+        (lambda s: ~(s.foo < 4), False),
+        (lambda s: ~((s.foo < 4) & (s.bar == 'x')), True),
+        (lambda s: function.Abs(s.foo) > 10, True),
+    ],
+)
+def test_satisfiable(schema: dsl.Table, build, expected: bool):
+    """Predicate satisfiability test."""
+    assert predicate.satisfiable(build(schema), {'foo': (1, 3), 'bar': ('a', 'c')}) is expected